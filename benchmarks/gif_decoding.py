@@ -0,0 +1,71 @@
+"""Compares the single pass GIF decoder against decoding every frame through tkinter's
+`gif -index` format, on the sprites shipped with the project.
+
+Run from the project root (needs a display for tkinter):
+    python -m benchmarks.gif_decoding [pet_name] [--repeat N]
+"""
+import argparse
+import glob
+import os
+import time
+import tkinter as tk
+from typing import Callable, List, Tuple
+from PIL import Image
+from src.animation import Animation
+
+
+def load_gif_to_frames_per_index(path: str) -> Tuple[List[tk.PhotoImage], List[int]]:
+    """The previous loader, kept for comparison: tkinter re-reads the file for every frame."""
+    file = Image.open(path)
+    frames = []
+    durations = []
+    for i in range(file.n_frames):
+        file.seek(i)
+        durations.append(int(file.info.get("duration", 100)))
+        frames.append(tk.PhotoImage(file=path, format="gif -index %i" % i))
+    file.close()
+    return frames, durations
+
+
+def time_loader(loader: Callable[[str], Tuple[list, List[int]]], path: str, repeat: int) -> float:
+    """Best of `repeat` runs, in ms"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        frames, _ = loader(path)
+        elapsed = (time.perf_counter() - start) * 1000
+        del frames
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("pet_name", nargs="?", default="totoro")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per file, the best one is reported")
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(os.path.join("src", "sprites", args.pet_name, "*.gif")))
+    if not paths:
+        raise SystemExit(f"No gifs found for pet '{args.pet_name}'")
+
+    window = tk.Tk()
+    window.withdraw()
+
+    print(f"{'file':<28}{'frames':>7}{'per index ms':>14}{'single pass ms':>16}{'speedup':>9}")
+    total_old = total_new = 0
+    for path in paths:
+        with Image.open(path) as file:
+            frame_count = file.n_frames
+        old = time_loader(load_gif_to_frames_per_index, path, args.repeat)
+        new = time_loader(Animation.load_gif_to_frames, path, args.repeat)
+        total_old += old
+        total_new += new
+        print(f"{os.path.basename(path):<28}{frame_count:>7}{old:>14.1f}{new:>16.1f}{old / new:>8.1f}x")
+    print(f"{'total':<28}{'':>7}{total_old:>14.1f}{total_new:>16.1f}{total_old / total_new:>8.1f}x")
+
+    window.destroy()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""Measures how the cost of running more pets grows, with the pets in one PetGroup sharing their
+frames and timers, against as many separate pets that each have their own. Pets run headless
+on a simulated clock, so no display is needed; frame memory is what tkinter would hold for the
+loaded frames.
+
+Run from the project root:
+    python -m benchmarks.multi_pet [pet_name] [--pets 1 5 10 25 50] [--seconds 60]
+"""
+import argparse
+import random
+import time
+from typing import Dict, List
+from src.animation import Animation, AnimationStates, Animator, FrameCache, FrameInterner, FrameStore, get_animations
+from src.pets import Pet, PetGroup
+from src.simulation import HeadlessImage, HeadlessToplevel, HeadlessWidget, HeadlessWindow, VirtualClock
+from src.simulation.headless import headless_toolkit
+from src.window_utils import Canvas, TimerService
+from src.window_utils.active_window import FakeActiveWindowBackend
+
+RESOLUTION = {"width": 1920, "height": 1080}
+
+
+def make_canvas(root: HeadlessWindow) -> Canvas:
+    window = HeadlessToplevel(root)
+    window.title(root.title())
+    return Canvas(window, HeadlessWidget(window), RESOLUTION, toolkit=headless_toolkit)
+
+
+def load(pet_name: str, target_resolution, frame_cache: FrameCache):
+    animations = get_animations(
+        pet_name, target_resolution, False, frame_cache=frame_cache, frame_interner=FrameInterner()
+    )
+    # Load everything up front, so memory compares full frame sets and loading is not in the run
+    for animation in animations.animations.values():
+        animation.load()
+    return animations
+
+
+def run(root: HeadlessWindow, clock: VirtualClock, seconds: float):
+    end = clock.now + seconds
+    while True:
+        due = root.get_next_timer()
+        if due is None or due > end:
+            break
+        root.run_next_timer()
+    clock.advance_to(end)
+
+
+def measure(pet_name: str, target_resolution, count: int, grouped: bool, seconds: float) -> Dict[str, float]:
+    """Load and run `count` pets, either in one PetGroup or each on its own"""
+    random.seed(0)
+    clock = VirtualClock()
+    root = HeadlessWindow(clock, title=pet_name)
+    frame_cache = FrameCache()
+    pets: List[Pet] = []
+    all_animations = []
+
+    start = time.perf_counter()
+    if grouped:
+        group = PetGroup(root, timers=TimerService(root, clock=clock), active_window=FakeActiveWindowBackend())
+        for index in range(count):
+
+            def load_shared():
+                all_animations.append(load(pet_name, target_resolution, frame_cache))
+                return all_animations[-1]
+
+            animations = group.get_animations(pet_name, target_resolution, load_shared)
+            animator = Animator(state=AnimationStates.IDLE, frame_number=0, animations=animations)
+            pets.append(group.add_pet(int(RESOLUTION["width"] * (index + 1) / (count + 1)), 1080, make_canvas(root), animator))
+        timers = [group.timers]
+        group.start()
+    else:
+        timers = []
+        for index in range(count):
+            all_animations.append(load(pet_name, target_resolution, frame_cache))
+            animator = Animator(state=AnimationStates.IDLE, frame_number=0, animations=all_animations[-1])
+            timers.append(TimerService(root, clock=clock))
+            pet = Pet(
+                int(RESOLUTION["width"] * (index + 1) / (count + 1)),
+                1080,
+                canvas=make_canvas(root),
+                animator=animator,
+                timers=timers[-1],
+                active_window=FakeActiveWindowBackend(),
+            )
+            pet.scheduler.start()
+            pets.append(pet)
+    load_seconds = time.perf_counter() - start
+
+    cpu_start = time.process_time()
+    run(root, clock, seconds)
+    cpu_seconds = time.process_time() - cpu_start
+
+    frames = [
+        frame for animations in all_animations for animation in animations.animations.values() for frame in animation.frames
+    ]
+    wakeups = sum(timer.wakeups for timer in timers)
+    ticks = sum(pet.scheduler.ticks for pet in pets)
+    for timer in timers:
+        timer.stop()
+    for animations in all_animations:
+        animations.close()
+    return {
+        "load_ms": load_seconds * 1000,
+        "frame_mb": FrameStore.get_frames_bytes(frames) / 1024 / 1024,
+        "wakeups_per_second": wakeups / seconds,
+        "ticks_per_wakeup": ticks / wakeups if wakeups else 0,
+        "cpu_ms_per_second": cpu_seconds * 1000 / seconds,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("pet_name", nargs="?", default="totoro")
+    parser.add_argument("--pets", type=int, nargs="+", default=[1, 5, 10, 25, 50], help="numbers of pets to try")
+    parser.add_argument("--seconds", type=float, default=60, help="simulated seconds to run the pets for")
+    parser.add_argument("--resolution", type=int, nargs=2, default=(100, 100))
+    args = parser.parse_args()
+
+    photo_image = Animation.photo_image
+    Animation.photo_image = HeadlessImage
+    try:
+        print(f"{'pets':>5} {'mode':>9} {'load':>9} {'frames':>9} {'wakeups':>10} {'ticks':>8} {'cpu':>14}")
+        for count in args.pets:
+            for grouped in (True, False):
+                stats = measure(args.pet_name, tuple(args.resolution), count, grouped, args.seconds)
+                print(
+                    f"{count:>5} {'group' if grouped else 'separate':>9} {stats['load_ms']:>7.0f}ms "
+                    f"{stats['frame_mb']:>7.1f}MB {stats['wakeups_per_second']:>8.1f}/s "
+                    f"{stats['ticks_per_wakeup']:>6.1f}/w {stats['cpu_ms_per_second']:>7.2f}ms/sim s"
+                )
+    finally:
+        Animation.photo_image = photo_image
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Measures how long decoding and scaling every animation of a pet takes with different
+numbers of decoding threads. Only the decoding is measured, which is the part that runs off
+the tkinter thread, so no display is needed.
+
+Run from the project root:
+    python -m benchmarks.parallel_decoding [pet_name] [--workers 1 2 4 8]
+"""
+import argparse
+import os
+import pathlib
+import time
+from src.animation import Animation, FrameInterner, LazyAnimations
+from src.animation.load_animations import get_pet_animations
+
+
+def time_decoding(pet_name: str, target_resolution, workers: int) -> float:
+    """Seconds to decode every animation of the pet from its gifs with the given number of threads"""
+    Animation.frame_cache = None
+    Animation.frame_store = None
+    Animation.frame_interner = FrameInterner()
+    impath = os.path.join(pathlib.Path().resolve(), "src", "sprites")
+    animations = LazyAnimations(get_pet_animations(pet_name, impath, target_resolution), workers=workers)
+
+    start = time.perf_counter()
+    animations.prefetch_all()
+    animations.wait()
+    elapsed = time.perf_counter() - start
+    animations.close()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("pet_name", nargs="?", default="totoro")
+    parser.add_argument("--workers", type=int, nargs="+", default=None, help="thread counts to try")
+    parser.add_argument("--resolution", type=int, nargs=2, default=(100, 100))
+    args = parser.parse_args()
+
+    cores = os.cpu_count() or 1
+    worker_counts = args.workers or sorted({1, 2, 4, cores})
+    print(f"{cores} cores")
+    baseline = None
+    for workers in worker_counts:
+        elapsed = time_decoding(args.pet_name, tuple(args.resolution), workers)
+        baseline = elapsed if baseline is None else baseline
+        print(f"{workers:>3} workers: {elapsed * 1000:>8.1f}ms ({baseline / elapsed:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Measures the resident memory of several pet processes running side by side, loading their frames
+from the pet's gifs (through the frame cache) or from its memory mapped sprite pack, whose pages
+the processes share. Reports what each process holds privately, which is what one more pet
+process costs, and what it shares with the others.
+
+Each process loads every animation of the pet and then waits until all of them are measured.
+With a display the frames are real tkinter images, without one only the decoding is done.
+
+Run from the project root:
+    python -m benchmarks.process_memory [pet_name] [--processes 4]
+"""
+import argparse
+import subprocess
+import sys
+from typing import Dict, List
+from src.animation import Animation, FrameCache, FrameInterner, get_animations
+from src.animation.sprite_pack import SpritePack
+from src.process_memory import get_process_memory
+
+
+def run_child(pet_name: str, target_resolution, source: str):
+    """Load every frame of a pet, tell the parent, and stay alive until it closes stdin"""
+    try:
+        import tkinter as tk
+
+        root = tk.Tk()
+        root.withdraw()
+        frames = "tkinter"
+    except Exception:
+        from src.simulation import HeadlessImage
+
+        Animation.photo_image = HeadlessImage
+        frames = "headless"
+
+    animations = get_animations(
+        pet_name,
+        target_resolution,
+        False,
+        frame_cache=FrameCache() if source == "gifs" else None,
+        frame_interner=FrameInterner(),
+        use_sprite_pack=source == "pack",
+    )
+    for animation in animations.animations.values():
+        animation.load()
+    animations.close()
+    print(f"ready {frames}", flush=True)
+    sys.stdin.read()
+
+
+def measure(pet_name: str, target_resolution, source: str, processes: int) -> List[Dict[str, int]]:
+    """Start the processes, measure each once all have loaded their frames"""
+    command = [sys.executable, "-m", "benchmarks.process_memory", pet_name, "--child", source]
+    command += ["--resolution", *map(str, target_resolution)]
+    children = [
+        subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True) for _ in range(processes)
+    ]
+    try:
+        frames = {child.stdout.readline().split()[-1] for child in children}
+        print(f"{source}: frames made with {', '.join(frames)}")
+        return [get_process_memory(child.pid) for child in children]
+    finally:
+        for child in children:
+            child.stdin.close()
+            child.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("pet_name", nargs="?", default="totoro")
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--resolution", type=int, nargs=2, default=(100, 100))
+    parser.add_argument("--child", choices=["gifs", "pack"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    target_resolution = tuple(args.resolution)
+
+    if args.child is not None:
+        run_child(args.pet_name, target_resolution, args.child)
+        return
+
+    if not get_process_memory():
+        print("Measuring the memory of other processes is not supported on this platform")
+        return
+    # Make sure both the frame cache and the sprite pack are there, so only loading is measured
+    frame_cache = FrameCache()
+    animations = get_animations(args.pet_name, target_resolution, False, frame_cache=frame_cache, use_sprite_pack=False)
+    animations.prefetch_all()
+    animations.wait()
+    animations.close()
+    frame_cache.flush()
+    get_animations(args.pet_name, target_resolution, False, compile_sprite_pack=True).close()
+    SpritePack.wait_for_compiles()
+
+    mb = 1024 * 1024
+    for source in ("gifs", "pack"):
+        memory = measure(args.pet_name, target_resolution, source, args.processes)
+        for index, process in enumerate(memory):
+            print(
+                f"    process {index + 1}: {process['rss'] / mb:>6.1f}MB resident, "
+                f"{process.get('shared', 0) / mb:>6.1f}MB shared, {process.get('private', 0) / mb:>6.1f}MB private"
+            )
+        extra = memory[1:] or memory
+        print(
+            f"    each additional process: {sum(process.get('private', 0) for process in extra) / len(extra) / mb:.1f}MB "
+            f"private, total {sum(process.get('pss', process['rss']) for process in memory) / mb:.1f}MB proportional"
+        )
+
+
+if __name__ == "__main__":
+    main()
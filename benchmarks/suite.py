@@ -0,0 +1,360 @@
+"""Benchmark suite covering config parsing, animation loading, tick cost, frame memory and idle
+wakeups, checked against a JSON baseline.
+
+Run from the project root:
+    python -m benchmarks.suite [pet_name] [--baseline benchmarks/baseline.json] [--threshold 0.25] [--update]
+
+Every metric is a cost, lower is better. A run fails (exits with 1) when a metric is more than
+`threshold` (a fraction, 0.25 is 25%) worse than its baseline. Per metric thresholds can be set in
+the "thresholds" of the baseline file, by name or pattern (ie "load.*"). `--update` writes the results as the new baseline.
+
+Metrics that need tkinter run under Xvfb when there is no display and Xvfb is installed, and are
+skipped otherwise. Baselines are only comparable on the same machine.
+"""
+import argparse
+import fnmatch
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+import tkinter as tk
+
+from src.animation import (
+    Animation,
+    AnimationStates,
+    Animator,
+    FrameInterner,
+    FrameStore,
+    LazyAnimations,
+    get_animations,
+)
+from src.animation.load_animations import get_pet_animations
+from src.config_reader import Config, load_config
+from src.pets import Pet
+from src.simulation import HeadlessImage, Simulation
+from src.window_utils import Canvas, TimerService
+from src.window_utils.active_window import FakeActiveWindowBackend
+
+Metrics = Dict[str, Dict[str, any]]
+"""Metric name to its "value" and "unit\""""
+
+DEFAULT_BASELINE = os.path.join("benchmarks", "baseline.json")
+DEFAULT_THRESHOLD = 0.25
+DEFAULT_THRESHOLDS = {"default": DEFAULT_THRESHOLD, "load.*": 0.5}
+"""Thresholds of a new baseline. Decoding times of single files are short, and so relatively noisy"""
+NOISE_FLOORS = {"ms": 0.05, "us": 1, "kb": 1, "per_s": 0.5}
+"""Differences smaller than this never count as a regression, whatever the threshold"""
+
+
+def metric(value: float, unit: str) -> Dict[str, any]:
+    return {"value": round(value, 4), "unit": unit}
+
+
+def time_median(function: Callable[[], None], repeats: int) -> float:
+    """Median seconds one call of `function` takes"""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def get_sprites_path() -> str:
+    return os.path.join(os.getcwd(), "src", "sprites")
+
+
+def reset_animation_settings():
+    """Undo the class wide settings an earlier benchmark left on Animation"""
+    Animation.should_run_preprocessing = False
+    Animation.preserve_aspect_ratio = False
+    Animation.frame_cache = None
+    Animation.frame_store = None
+    Animation.frame_interner = None
+
+
+def bench_config(repeats: int = 50) -> Metrics:
+    return {"config.parse_ms": metric(time_median(Config.read, repeats) * 1000, "ms")}
+
+
+def bench_loading(pet_name: str, target_resolution: Tuple[int, int]) -> Metrics:
+    """Decoding time per gif, and the time to load every animation of the pet, without any cache"""
+    results = {}
+    reset_animation_settings()
+    animations = get_pet_animations(pet_name, get_sprites_path(), target_resolution)
+    seen = set()
+    for animation in animations.values():
+        if animation.gif_location in seen:
+            continue
+        seen.add(animation.gif_location)
+        seconds = time_median(lambda: Animation.load_gif_to_images(animation.gif_location, target_resolution), 5)
+        results[f"load.file.{os.path.basename(animation.gif_location)}_ms"] = metric(seconds * 1000, "ms")
+
+    photo_image = Animation.photo_image
+    Animation.photo_image = HeadlessImage
+    try:
+        start = time.perf_counter()
+        animations = get_animations(
+            pet_name, target_resolution, False, frame_interner=FrameInterner(), use_sprite_pack=False
+        )
+        for animation in animations.values():
+            animation.load()
+        results["load.total_ms"] = metric((time.perf_counter() - start) * 1000, "ms")
+        animations.close()
+    finally:
+        Animation.photo_image = photo_image
+    return results
+
+
+def bench_tk_frames(pet_name: str, target_resolution: Tuple[int, int], window: tk.Tk) -> Metrics:
+    """Time to hand every decoded frame of the pet to tkinter, on top of decoding"""
+    reset_animation_settings()
+    Animation.frame_interner = FrameInterner()
+    animations = LazyAnimations(get_pet_animations(pet_name, get_sprites_path(), target_resolution))
+    animations.prefetch_all()
+    animations.wait()
+    start = time.perf_counter()
+    for animation in animations.values():
+        animation.load()
+    elapsed = time.perf_counter() - start
+    animations.close()
+    return {"load.tk_frames_ms": metric(elapsed * 1000, "ms")}
+
+
+def bench_memory(pet_name: str, target_resolution: Tuple[int, int]) -> Metrics:
+    """Steady state frame memory of every animation, once all of them are loaded. Frames shared
+    between animations count towards each of them, but only once towards the total
+    """
+    reset_animation_settings()
+    photo_image = Animation.photo_image
+    Animation.photo_image = HeadlessImage
+    store = FrameStore()
+    try:
+        animations = get_animations(
+            pet_name,
+            target_resolution,
+            False,
+            frame_store=store,
+            frame_interner=FrameInterner(),
+            use_sprite_pack=False,
+        )
+        results = {}
+        for state, animation in animations.items():
+            results[f"memory.{state.name}_kb"] = metric(FrameStore.get_frames_bytes(animation.frames) / 1024, "kb")
+        animations.close()
+    finally:
+        Animation.photo_image = photo_image
+    results["memory.total_kb"] = metric(store.total_bytes / 1024, "kb")
+    return results
+
+
+def time_ticks(pet, ticks: int, after_tick: Callable[[], None] = None) -> float:
+    """Median microseconds per call of pet.on_tick, at 60 ticks per simulated second"""
+    timings = []
+    for _ in range(ticks):
+        start = time.perf_counter()
+        pet.on_tick(1 / 60)
+        if after_tick is not None:
+            after_tick()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000000
+
+
+def bench_tick_headless(pet_name: str, target_resolution: Tuple[int, int], ticks: int = 3000) -> Metrics:
+    reset_animation_settings()
+    simulation = Simulation(pet_name, target_resolution, use_sprite_pack=False)
+    simulation.animations.prefetch_all()
+    simulation.animations.wait()
+    try:
+        return {"tick.headless_us": metric(time_ticks(simulation.pet, ticks), "us")}
+    finally:
+        simulation.close()
+
+
+def bench_tick_tk(pet_name: str, target_resolution: Tuple[int, int], window: tk.Tk, ticks: int = 3000) -> Metrics:
+    """Cost of InteractablePet.on_tick against a real window, including tkinter's idle work"""
+    reset_animation_settings()
+    animations = get_animations(
+        pet_name, target_resolution, False, frame_interner=FrameInterner(), use_sprite_pack=False
+    )
+    animations.prefetch_all()
+    animations.wait()
+    label = tk.Label(window, bd=0)
+    label.pack()
+    canvas = Canvas(window, label, {"width": 1920, "height": 1080})
+    animator = Animator(state=AnimationStates.IDLE, frame_number=0, animations=animations)
+    timers = TimerService(window)
+    pet = Pet(960, 1000, canvas=canvas, animator=animator, timers=timers, active_window=FakeActiveWindowBackend())
+    try:
+        return {"tick.tk_us": metric(time_ticks(pet, ticks, window.update_idletasks), "us")}
+    finally:
+        timers.stop()
+        animations.close()
+        pet.tooltip.destroy()
+        label.destroy()
+
+
+def bench_wakeups(pet_name: str, target_resolution: Tuple[int, int], seconds: float = 300) -> Metrics:
+    """Wakeups per second in each power mode, on a simulated clock"""
+    results = {}
+
+    def measure(name: str, setup: Callable[[Simulation], None]):
+        reset_animation_settings()
+        simulation = Simulation(pet_name, target_resolution, use_sprite_pack=False)
+        setup(simulation)
+        simulation.run(0)
+        wakeups = simulation.timers.wakeups
+        simulation.run(seconds)
+        results[f"wakeups.{name}_per_s"] = metric((simulation.timers.wakeups - wakeups) / seconds, "per_s")
+        simulation.close()
+
+    measure("active", lambda simulation: None)
+    measure("background", lambda simulation: simulation.active_window.set_active_window("Editor", "editor"))
+    measure("hidden", lambda simulation: simulation.hide())
+    return results
+
+
+def start_xvfb(display: str = ":99") -> Optional[subprocess.Popen]:
+    """Start a virtual X server if there is no display but Xvfb is installed, None if not started"""
+    if sys.platform != "linux" or os.environ.get("DISPLAY") or shutil.which("Xvfb") is None:
+        return None
+    process = subprocess.Popen(
+        ["Xvfb", display, "-screen", "0", "1920x1080x24", "-nolisten", "tcp"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    socket = f"/tmp/.X11-unix/X{display.lstrip(':')}"
+    for _ in range(50):
+        if os.path.exists(socket):
+            break
+        time.sleep(0.1)
+    os.environ["DISPLAY"] = display
+    return process
+
+
+def open_window() -> Optional[tk.Tk]:
+    try:
+        window = tk.Tk()
+    except tk.TclError:
+        return None
+    window.overrideredirect(True)
+    return window
+
+
+def run_suite(pet_name: str) -> Tuple[Metrics, List[str]]:
+    """Run every benchmark
+
+    Returns:
+        Tuple[Metrics, List[str]]: the results and the names of benchmarks that were skipped
+    """
+    target_resolution = load_config().get_pet(pet_name).target_resolution
+    results: Metrics = {}
+    skipped = []
+    results.update(bench_config())
+    results.update(bench_loading(pet_name, target_resolution))
+    results.update(bench_memory(pet_name, target_resolution))
+    results.update(bench_tick_headless(pet_name, target_resolution))
+    results.update(bench_wakeups(pet_name, target_resolution))
+
+    xvfb = start_xvfb()
+    try:
+        window = open_window()
+        if window is None:
+            skipped += ["load.tk_frames_ms", "tick.tk_us"]
+        else:
+            results.update(bench_tk_frames(pet_name, target_resolution, window))
+            results.update(bench_tick_tk(pet_name, target_resolution, window))
+            window.destroy()
+    finally:
+        if xvfb is not None:
+            xvfb.terminate()
+    return results, skipped
+
+
+def get_threshold(name: str, thresholds: Dict[str, float], default: float) -> float:
+    """Threshold of a metric: set for its name, else for the longest pattern matching it, else the default"""
+    if name in thresholds:
+        return thresholds[name]
+    patterns = [pattern for pattern in thresholds if pattern != "default" and fnmatch.fnmatchcase(name, pattern)]
+    if patterns:
+        return thresholds[max(patterns, key=len)]
+    return default
+
+
+def compare(results: Metrics, baseline: Dict[str, any], threshold: float) -> List[str]:
+    """Describe every metric that regressed past its threshold"""
+    thresholds = baseline.get("thresholds", {})
+    regressions = []
+    for name, result in sorted(results.items()):
+        base = baseline.get("metrics", {}).get(name)
+        if base is None:
+            continue
+        allowed = get_threshold(name, thresholds, threshold)
+        difference = result["value"] - base["value"]
+        if difference > base["value"] * allowed and difference > NOISE_FLOORS.get(result["unit"], 0):
+            percent = difference / base["value"] * 100 if base["value"] else float("inf")
+            regressions.append(
+                f"{name}: {result['value']:.3f}{result['unit']} vs {base['value']:.3f}{result['unit']} "
+                f"(+{percent:.0f}%, allowed {allowed * 100:.0f}%)"
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("pet_name", nargs="?", default="totoro")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="JSON file with the baseline results")
+    parser.add_argument("--threshold", type=float, default=None, help="default allowed regression as a fraction, ie 0.25")
+    parser.add_argument("--update", action="store_true", help="save the results as the new baseline")
+    parser.add_argument("--output", default=None, help="also write the results to this JSON file")
+    args = parser.parse_args()
+
+    results, skipped = run_suite(args.pet_name)
+    for name, result in sorted(results.items()):
+        print(f"{name:<56}{result['value']:>12.3f} {result['unit']}")
+    for name in skipped:
+        print(f"{name:<56}{'skipped':>12} (no display and no Xvfb)")
+
+    baseline = {}
+    if os.path.isfile(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    threshold = args.threshold
+    if threshold is None:
+        threshold = baseline.get("thresholds", {}).get("default", DEFAULT_THRESHOLD)
+
+    report = {
+        "version": 1,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "machine": {"platform": platform.platform(), "python": platform.python_version(), "cpus": os.cpu_count()},
+        "thresholds": baseline.get("thresholds", DEFAULT_THRESHOLDS),
+        "metrics": results,
+    }
+    if args.output is not None:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=1)
+    if args.update:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=1)
+        print(f"Saved the baseline to {args.baseline}")
+        return
+
+    if not baseline:
+        print(f"No baseline at {args.baseline}, run with --update to create one")
+        return
+    regressions = compare(results, baseline, threshold)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if regressions:
+        sys.exit(1)
+    print(f"No regressions past {threshold * 100:.0f}% against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Measures finding the window a falling pet lands on and following windows that move, with the
+column index pets use (WindowEdgeIndex) against scanning every window, for different numbers of
+windows. Windows come from the fake backend, so no display is needed.
+
+Run from the project root:
+    python -m benchmarks.window_edges [--windows 10 100 500 1000] [--lookups 100000]
+"""
+import argparse
+import random
+import time
+from typing import Dict, List, Optional, Tuple
+from src.window_utils import WindowEdgeIndex
+from src.window_utils.window_list import FakeWindowListBackend, WindowRect
+
+DESKTOP = (3840, 2160)
+FALL = 24
+"""Pixels a pet falls in a tick at most, see InteractablePet.MAX_FALL_SPEED"""
+
+
+def find_landing_naive(windows: Dict[int, WindowRect], x: int, top: int, bottom: int) -> Optional[WindowRect]:
+    """What the index answers, by looking at every window"""
+    landing = None
+    for rect in windows.values():
+        if rect.x <= x < rect.right and top <= rect.y <= bottom and (landing is None or rect.y < landing.y):
+            landing = rect
+    return landing
+
+
+def random_window(rng: random.Random) -> Tuple[int, int, int, int]:
+    width, height = rng.randint(200, 1600), rng.randint(150, 1000)
+    return rng.randint(0, DESKTOP[0] - width), rng.randint(0, DESKTOP[1] - height), width, height
+
+
+def measure(count: int, lookups: int, moves: int) -> Dict[str, float]:
+    rng = random.Random(0)
+    backend = FakeWindowListBackend()
+    for handle in range(count):
+        backend.set_window(handle, *random_window(rng))
+
+    start = time.perf_counter()
+    index = WindowEdgeIndex(backend)
+    build_seconds = time.perf_counter() - start
+
+    falls: List[Tuple[int, int, int]] = []
+    for _ in range(lookups):
+        top = rng.randint(0, DESKTOP[1] - FALL)
+        falls.append((rng.randint(0, DESKTOP[0] - 1), top, top + rng.randint(1, FALL)))
+    windows = backend.get_windows()
+    for x, top, bottom in falls[:1000]:
+        expected = find_landing_naive(windows, x, top, bottom)
+        landing = index.find_landing(x, top, bottom)
+        if (landing and landing.y) != (expected and expected.y):
+            raise Exception(f"Index and scan disagree at x={x} from {top} to {bottom}")
+
+    start = time.perf_counter()
+    for x, top, bottom in falls:
+        index.find_landing(x, top, bottom)
+    index_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for x, top, bottom in falls:
+        find_landing_naive(windows, x, top, bottom)
+    naive_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(moves):
+        rect = windows[rng.randrange(count)]
+        backend.set_window(rect.handle, rect.x + rng.randint(-20, 20), rect.y + rng.randint(-20, 20), rect.width, rect.height)
+    move_seconds = time.perf_counter() - start
+    index.close()
+    return {
+        "build_ms": build_seconds * 1000,
+        "index_us": index_seconds * 1e6 / lookups,
+        "naive_us": naive_seconds * 1e6 / lookups,
+        "move_us": move_seconds * 1e6 / moves,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--windows", type=int, nargs="+", default=[10, 100, 500, 1000], help="numbers of windows to try")
+    parser.add_argument("--lookups", type=int, default=100000, help="falling steps to look up")
+    parser.add_argument("--moves", type=int, default=10000, help="window moves to apply")
+    args = parser.parse_args()
+
+    print(f"{'windows':>8} {'build':>9} {'index':>10} {'scan':>10} {'speedup':>8} {'move':>10}")
+    for count in args.windows:
+        stats = measure(count, args.lookups, args.moves)
+        print(
+            f"{count:>8} {stats['build_ms']:>7.1f}ms {stats['index_us']:>8.2f}us {stats['naive_us']:>8.2f}us "
+            f"{stats['naive_us'] / stats['index_us']:>7.1f}x {stats['move_us']:>8.2f}us"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
-from src.main import start_program
+from src.main import start_pets, start_program
 import os
 import sys
 
@@ -15,4 +15,15 @@ os.chdir(os.path.dirname(os.path.realpath(__file__)))
 # elif len(sys.argv) > 3:
 #     raise Exception(f"Expected 0 or 1 positional arguments, not {len(sys.argv) - 1}")
 # else:
-start_program('totoro')
+if len(sys.argv) > 1:
+    # Several pets in one process, ie `python run.py totoro:5` for five totoros
+    pet_names = []
+    for arg in sys.argv[1:]:
+        name, _, count = arg.partition(":")
+        count = count or "1"
+        if not name or not count.isdigit() or int(count) < 1:
+            sys.exit(f'Cannot read "{arg}": give a pet name and optionally how many of it, ie totoro or totoro:5')
+        pet_names.extend([name] * int(count))
+    start_pets(pet_names)
+else:
+    start_program('totoro')
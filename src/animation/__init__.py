@@ -1,4 +1,9 @@
 from .animation import Animation
 from .animator import Animator
 from .animation_states import AnimationStates
+from .frame_cache import FrameCache
+from .frame_store import FrameStore
+from .frame_interner import FrameInterner
+from .lazy_animations import AnimationsView, LazyAnimations
 from .load_animations import get_animations
+from .state_graph import StateGraph
@@ -0,0 +1,37 @@
+"""Shows where a pet spends its time in the long run, from its state graph: the share of visits
+each animation gets, how many times it plays per visit, how long a visit takes and the share
+of all time spent in it. Leaves out the transitions the user causes, ie by grabbing the pet.
+
+Run from the project root:
+    python -m src.animation.analyze totoro
+"""
+import argparse
+from src.config_reader import load_config
+from .load_animations import get_animations
+from .state_graph import StateGraph
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("pet_name")
+    args = parser.parse_args()
+
+    pet_config = load_config().get_pet(args.pet_name)
+    animations = get_animations(args.pet_name, pet_config.target_resolution, False)
+    graph = animations.graph
+    play_seconds = StateGraph.get_play_seconds(animations.animations)
+    visits = graph.get_stationary_distribution()
+    dwell_times = graph.get_dwell_times(play_seconds)
+    time_shares = graph.get_time_shares(play_seconds)
+    animations.close()
+
+    print(f"{'state':<20} {'visits':>7} {'plays':>6} {'dwell':>8} {'time':>7}")
+    for state in sorted(graph.states, key=lambda state: -time_shares[state]):
+        print(
+            f"{state.name:<20} {visits[state] * 100:>6.1f}% {graph.get_expected_plays(state):>6.1f} "
+            f"{dwell_times[state]:>7.1f}s {time_shares[state] * 100:>6.1f}%"
+        )
+
+
+if __name__ == "__main__":
+    main()
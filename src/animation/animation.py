@@ -1,12 +1,18 @@
 import tkinter as tk
 import random
+import threading
+import time
+from collections import Counter
 from itertools import repeat
 from os import listdir
 from os.path import isfile, join
-from typing import Tuple, List
-from PIL import Image
+from typing import Callable, Tuple, List, Dict, Union
+from PIL import Image, ImageTk
 from src import logger
 from .animation_states import AnimationStates
+from .frame_cache import DecodedFrames, FrameCache
+from .frame_store import FrameStore
+from .frame_interner import DecodedSource, FrameInterner
 
 
 class Animation:
@@ -14,16 +20,17 @@ class Animation:
 
     next_animation_states: List[AnimationStates]
     """possible animations for after this animation"""
-    frames: List[tk.PhotoImage]
-    """List of frames in the animation"""
+    transition_weights: Dict[AnimationStates, float]
+    """Relative chance of each of the `next_animation_states` following this animation"""
     frame_durations: List[int]
-    """List of durations (in ms) for each frame, replacing frame_timer to preserve GIF timing"""
+    """List of durations (in ms) for each frame, replacing frame_timer to preserve GIF timing. None until decoded"""
     v_x: float
     v_y: float
     a_x: float
     a_y: float
-    repititions: int
-    """How many times to repeat given animation before moving onto the next animation"""
+    repitition_range: Tuple[int, int]
+    """Inclusive range of how many times to repeat the animation before moving onto the next
+    one, picked from anew on every visit"""
     target_resolution: Tuple[int, int]
     list_message: List[str]  # Thêm danh sách message cho mỗi animation
     """List of messages to display in tooltip"""
@@ -31,6 +38,19 @@ class Animation:
 
     should_run_preprocessing = False
     """Whether or not to run preprocessing, overwrites saved images. Defaults to False"""
+    preserve_aspect_ratio = False
+    """Whether gif frames keep their aspect ratio when scaled to the target resolution. Defaults to False"""
+    frame_cache: FrameCache = None
+    """On-disk cache of decoded and scaled frames, gifs are always decoded when None"""
+    frame_store: FrameStore = None
+    """Keeps loaded frames within a memory budget, frames are never unloaded when None"""
+    frame_interner: FrameInterner = None
+    """Shares decoded sources and identical frames between animations, nothing is shared when None"""
+    photo_image: Callable[[Image.Image], tk.PhotoImage] = ImageTk.PhotoImage
+    """Turns decoded images into the frames handed to the window, swapped out to run without a display"""
+    min_frame_duration = 20
+    """Shortest time (in ms) a frame is shown for. Some gifs have 0ms frames, which would otherwise
+    be played as fast as the pet can tick"""
 
     def __init__(
         self,
@@ -43,16 +63,19 @@ class Animation:
         v_y: float = 0,
         a_x: float = 0,
         a_y: float = 0,
-        repititions: int = 0,
+        repititions: Union[int, Tuple[int, int]] = 0,
         frame_multiplier: int = 1,
         target_resolution: Tuple[int, int] = (100, 100),
         reverse: bool = False,
         list_message: List[str] = ["Hi Lu Xinh!", "Tớ là Totoro!", "Love you 3000"],  # Thêm tham số list_message
         show_tooltip: bool = True,       # Thêm tham số để bật/tắt tooltip
+        pack=None,
     ):
         """
         Args:
-            next_animation_states (List[AnimationStates]): Possible animations for this animation to transition to.
+            next_animation_states (Union[List[AnimationStates], Dict[AnimationStates, float]]): Possible animations
+                for this animation to transition to, with their relative weights, or as a list in which a state
+                appearing n times has weight n.
             name (str, optional): The verbose name of this animation.
             frames (List[tk.PhotoImage], optional): Frames of images that can be rendered by tkinter.
             gif_location (str, optional): Absolute path to the gif to convert into frames.
@@ -62,18 +85,26 @@ class Animation:
             v_y (float, optional): Change in y for every frame of the animation.
             a_x (float, optional): Change in v_x for every frame of the animation.
             a_y (float, optional): Change in v_y for every frame of the animation.
-            repititions (int, optional): How many times this animation should repeat.
+            repititions (Union[int, Tuple[int, int]], optional): How many times this animation should repeat,
+                or the inclusive range to randomly pick that from.
             frame_multiplier (int, optional): How many times to duplicate frames (for non-GIF sources).
             reverse (bool, optional): Whether or not to reverse the loaded frames.
             list_message (List[str], optional): List of messages for tooltip display.
             show_tooltip (bool, optional): Whether to show tooltip or not. Defaults to True.
+            pack (SpritePack, optional): Compiled sprite pack holding the frames of the animation named `name`.
         """
-        self.next_animation_states = next_animation_states
+        if isinstance(next_animation_states, dict):
+            self.transition_weights = dict(next_animation_states)
+        else:
+            self.transition_weights = dict(Counter(next_animation_states))
+        self.next_animation_states = list(self.transition_weights)
         self.v_x = v_x
         self.v_y = v_y
         self.a_x = a_x
         self.a_y = a_y
-        self.repititions = repititions
+        if isinstance(repititions, int):
+            repititions = (repititions, repititions)
+        self.repitition_range = tuple(repititions)
         self.list_message = list_message if list_message is not None else []  # Khởi tạo list_message
         self.show_tooltip = show_tooltip  # Khởi tạo biến bật/tắt tooltip
 
@@ -82,50 +113,146 @@ class Animation:
             name = gif_location.split("src").pop() if gif_location is not None else name
             name = images_location.split("src").pop() if images_location is not None else name
         self.name = name
-        # logger.info(f"Loading Animation: {self.name}")
+        self.gif_location = gif_location
+        self.pack = pack
+        self.target_resolution = target_resolution
+        self.reverse = reverse
+        self._frames = None
+        self._source = None
+        self._load_lock = threading.Lock()
 
         if frames is None:
-            if gif_location is not None:
-                frames, durations = Animation.load_gif_to_frames(gif_location)
-                self.frame_durations = durations  # Lưu thời gian gốc của GIF
-            else:
+            if gif_location is None and pack is None:
                 raise Exception("Received neither frames nor locations to load the frames.")
-        else:
-            self.frame_durations = [100] * len(frames)
+            # Gifs are only decoded once the frames are first needed, see `load`
+            self.frame_durations = None
+            return
 
         if len(frames) == 0:
             raise Exception("There must be at least one frame in the frames list")
 
-        self.target_resolution = target_resolution
+        self.frame_durations = [100] * len(frames)
         frames = Animation.apply_target_resolution(frames, target_resolution)
 
         if reverse:
             frames.reverse()
-            self.frame_durations.reverse()
 
-        if gif_location is None and frame_multiplier > 1:
-            self.frames = [x for item in frames for x in repeat(item, frame_multiplier)]
+        if frame_multiplier > 1:
+            frames = [x for item in frames for x in repeat(item, frame_multiplier)]
             self.frame_durations = [d for d in self.frame_durations for _ in range(frame_multiplier)]
-        else:
-            self.frames = frames
+        self._frames = frames
+
+    @property
+    def frames(self) -> List[tk.PhotoImage]:
+        """List of frames in the animation, loaded on first use"""
+        if self._frames is None:
+            self.load()
+        elif Animation.frame_store is not None:
+            Animation.frame_store.touch(self)
+        return self._frames
+
+    @property
+    def is_loaded(self) -> bool:
+        """Whether the tkinter frames of this animation exist"""
+        return self._frames is not None
+
+    @property
+    def can_unload(self) -> bool:
+        """Whether the frames can be loaded again after `unload`, i.e. they came from a gif or sprite pack"""
+        return self.gif_location is not None or self.pack is not None
+
+    def prefetch(self):
+        """Decode the frames of the gif without creating any tkinter images, so this is safe
+        to run on a background thread. `load` then only has to hand the pixels to tkinter.
+        """
+        with self._load_lock:
+            if self._frames is not None or self._source is not None:
+                return
+            start = time.perf_counter()
+            source = self.decode_source()
+            durations = list(source.durations)  # Lưu thời gian gốc của GIF
+            if self.reverse:
+                durations.reverse()
+            self._source = source
+            self.frame_durations = durations
+            cache_report = f" ({Animation.frame_cache.report()})" if Animation.frame_cache is not None else ""
+            logger.debug(
+                f"Decoded {self.name}: {len(durations)} frames in {(time.perf_counter() - start) * 1000:.1f}ms{cache_report}"
+            )
+
+    def decode_source(self) -> DecodedSource:
+        """Decode the gif, through the frame cache and frame interner when they are set"""
+        if Animation.frame_interner is not None:
+            source_id = self.pack.get_source_id(self.name) if self.pack is not None else self.gif_location
+            return Animation.frame_interner.decode(source_id, self.target_resolution, self.decode_frames)
+        return DecodedSource(*self.decode_frames())
+
+    def decode_frames(self) -> DecodedFrames:
+        """Decode the frames through the frame cache, but not the frame interner, so the images
+        are this call's own rather than shared with other animations. Safe to call from any thread.
+        """
+        if self.pack is not None:
+            # Packs hold frames that are already scaled, so there is nothing to cache
+            return self.pack.load_frames(self.name)
+        load = lambda: Animation.load_gif_to_images(self.gif_location, self.target_resolution)
+        if Animation.frame_cache is not None:
+            return Animation.frame_cache.load(
+                self.gif_location, self.target_resolution, Animation.get_preprocessing_options(), load
+            )
+        return load()
+
+    def load(self):
+        """Create the tkinter frames of this animation. Must be called from the tkinter thread."""
+        self.prefetch()
+        with self._load_lock:
+            if self._frames is not None:
+                return
+            if Animation.frame_interner is not None:
+                frames = self._source.realize(
+                    lambda images: Animation.frame_interner.to_frames(images, Animation.photo_image)
+                )
+            else:
+                frames = self._source.realize(Animation.images_to_frames)
+            self._frames = list(reversed(frames)) if self.reverse else frames
+        if Animation.frame_store is not None:
+            Animation.frame_store.add(self, self._frames)
+
+    def unload(self):
+        """Drop the frames of this animation, they are loaded again when next needed"""
+        if not self.can_unload:
+            raise Exception("Cannot unload frames that were not loaded from a gif or sprite pack")
+        with self._load_lock:
+            self._frames = None
+            self._source = None
+
+    def discard_prefetched(self):
+        """Drop frames decoded by `prefetch` that have not been handed to tkinter yet"""
+        with self._load_lock:
+            if self._frames is None:
+                self._source = None
 
     @staticmethod
     def load_gif_to_frames(path: str) -> Tuple[List[tk.PhotoImage], List[int]]:
         """Load frames and their durations from a GIF file."""
-        file = Image.open(path)
-        number_of_frames = file.n_frames
-        frames = []
-        durations = []
+        images, durations = Animation.decode_gif(path)
+        return Animation.images_to_frames(images), durations
 
-        for i in range(number_of_frames):
-            file.seek(i)
-            duration = file.info.get('duration', 100)
-            frame = tk.PhotoImage(file=path, format="gif -index %i" % i)
-            frames.append(frame)
-            durations.append(int(duration))
+    @staticmethod
+    def decode_gif(path: str) -> Tuple[List[Image.Image], List[int]]:
+        """Decode every frame of a GIF in a single pass over the file.
 
-        file.close()
-        return frames, durations
+        Each returned image is the full composited RGBA canvas for that frame, i.e. the frame
+        drawn over whatever the previous frame's disposal method left behind, with the GIF's
+        transparent index turned into alpha 0.
+        """
+        images = []
+        durations = []
+        with Image.open(path) as file:
+            for i in range(file.n_frames):
+                file.seek(i)
+                durations.append(int(file.info.get('duration', 100)))
+                images.append(file.convert("RGBA"))
+        return images, durations
 
     @staticmethod
     def apply_target_resolution(frames: List[tk.PhotoImage], target_resolution: Tuple[int, int]) -> List[tk.PhotoImage]:
@@ -146,31 +273,78 @@ class Animation:
         return frames
 
     @staticmethod
-    def remove_partial_transparency_png(path: str) -> Image:
+    def load_gif_to_images(path: str, target_resolution: Tuple[int, int]) -> Tuple[List[Image.Image], List[int]]:
+        """Decode a GIF into RGBA images scaled to the target resolution, and their durations."""
+        images, durations = Animation.decode_gif(path)
+        images = [
+            Animation.scale_image(image, target_resolution, Animation.preserve_aspect_ratio) for image in images
+        ]
+        return images, durations
+
+    @staticmethod
+    def scale_image(
+        image: Image.Image, target_resolution: Tuple[int, int], preserve_aspect_ratio: bool = False
+    ) -> Image.Image:
+        """Resize an RGBA image to exactly the target resolution with a Lanczos filter.
+
+        Args:
+            image (Image.Image): RGBA image to scale.
+            target_resolution (Tuple[int, int]): Size of the returned image.
+            preserve_aspect_ratio (bool, optional): Fit the image inside the target resolution instead of
+                stretching it, the rest is left transparent with the image resting on the bottom edge.
+
+        Returns:
+            Image.Image
+        """
+        target_resolution = tuple(target_resolution)
+        if image.size == target_resolution:
+            return image
+
+        if preserve_aspect_ratio:
+            scale = min(target_resolution[0] / image.width, target_resolution[1] / image.height)
+            size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+            scaled = Image.new("RGBA", target_resolution, (0, 0, 0, 0))
+            # Centered horizontally and resting on the bottom edge, which is where the pet stands
+            scaled.paste(
+                image.resize(size, Image.LANCZOS),
+                ((target_resolution[0] - size[0]) // 2, target_resolution[1] - size[1]),
+            )
+        else:
+            scaled = image.resize(target_resolution, Image.LANCZOS)
+
+        # The window keys out a single background color, so pixels the filter made partially
+        # transparent would show up as a fringe of that color. Snap them back to on or off.
+        scaled.putalpha(scaled.getchannel("A").point(lambda alpha: 255 if alpha >= 128 else 0))
+        return scaled
+
+    @staticmethod
+    def images_to_frames(images: List[Image.Image]) -> List[tk.PhotoImage]:
+        """Hand decoded images over to tkinter."""
+        return [Animation.photo_image(image) for image in images]
+
+    @staticmethod
+    def get_preprocessing_options() -> Dict[str, any]:
+        """Settings that change the decoded pixels, part of the frame cache key."""
+        return {"scaling": "lanczos", "preserve_aspect_ratio": Animation.preserve_aspect_ratio}
+
+    @staticmethod
+    def remove_partial_transparency_png(path: str, bg_color: str = "#000") -> Image:
         """Force PNG transparency to fully opaque or fully transparent."""
         # logger.info("START:remove_partial_transparency_png -> " + path)
         png = Image.open(path)
         if path.split(".").pop().lower() != "png":
             return png
 
-        png = png.convert("RGBA")
-        datas = png.getdata()
-        new_data = [
-            (item[0], item[1], item[2], round(item[3] / 255) * 255) if item[3] != 255 else item
-            for item in datas
-        ]
-        png.putdata(new_data)
+        # Imported here as the preprocessing module builds on Animation
+        from .preprocessing import clean_alpha
+
+        png = clean_alpha(png, bg_color)
         png.save(path, path.split(".").pop())
         return png
 
     def next(self, animator) -> AnimationStates:
-        """Determine the next animation state."""
-        if animator.repititions < self.repititions:
-            animator.repititions += 1
-            return animator.state
-        else:
-            animator.repititions = 0
-        return random.choice(self.next_animation_states)
+        """Determine the next animation state, see Animator.next_state"""
+        return animator.next_state()
 
     def get_velocity(self) -> Tuple[float, float]:
         """Return the change in position for this animation."""
@@ -182,7 +356,9 @@ class Animation:
 
     def get_frame_duration(self, frame_index: int) -> int:
         """Return the duration of the frame at the given index."""
-        return self.frame_durations[frame_index % len(self.frame_durations)]
+        if self.frame_durations is None:
+            self.prefetch()
+        return max(self.frame_durations[frame_index % len(self.frame_durations)], Animation.min_frame_duration)
 
     def get_random_message(self) -> str:
         """Return a random message from the list_message."""
@@ -191,4 +367,6 @@ class Animation:
         return ""
 
     def __repr__(self):
-        return f"<Animation: {len(self.frames)} frames with variable durations>"
\ No newline at end of file
+        if self.frame_durations is None:
+            return f"<Animation: {self.name} not loaded yet>"
+        return f"<Animation: {len(self.frame_durations)} frames with variable durations>"
\ No newline at end of file
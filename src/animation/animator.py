@@ -2,41 +2,105 @@ from typing import Dict
 from src import logger
 from .animation_states import AnimationStates
 from .animation import Animation
+from .state_graph import StateGraph
 
 class Animator:
-    def __init__(self, frame_number: int, state: AnimationStates, animations: Dict[AnimationStates, Animation], repititions=0):
+    max_catch_up: float = 1000
+    """Most time (in ms) a single update catches up on. Anything beyond that, ie after the
+    computer slept, is dropped instead of fast forwarding through it"""
+
+    def __init__(
+        self,
+        frame_number: int,
+        state: AnimationStates,
+        animations: Dict[AnimationStates, Animation],
+        repititions=0,
+        graph: StateGraph = None,
+    ):
         self.frame_number = frame_number
         self.state = state
         self.animations = animations
+        self.graph = graph if graph is not None else StateGraph.of(animations)
+        """Picks the animations that follow each other"""
         self.repititions = repititions
+        self.repititions_target = self.graph.draw_repititions(state)
+        """How many times the current animation repeats on this visit"""
         self.time_accumulator = 0  # Theo dõi thời gian tích lũy
+        self.dropped_frames = 0
+        """Frames skipped over because an update came late"""
+
+    def update(self, delta_time: float) -> int:
+        """Cập nhật frame dựa trên thời gian thực tế.
+
+        Args:
+            delta_time (float): Seconds since the last update.
 
-    def update(self, delta_time: float) -> None:
-        """Cập nhật frame dựa trên thời gian thực tế."""
-        current_animation = self.animations[self.state]
-        self.time_accumulator += delta_time * 1000  # Chuyển sang ms
+        Returns:
+            int: How many frames the animation moved forward, more than one when the update came late
+        """
+        self.time_accumulator = min(self.time_accumulator + delta_time * 1000, Animator.max_catch_up)  # Chuyển sang ms
+        frames_advanced = 0
 
-        # Lấy thời gian của khung hình hiện tại
-        frame_duration = current_animation.get_frame_duration(self.frame_number)
+        while True:
+            # Lấy thời gian của khung hình hiện tại
+            current_animation = self.animations[self.state]
+            frame_duration = current_animation.get_frame_duration(self.frame_number)
+            if self.time_accumulator < frame_duration:
+                break
 
-        # Nếu thời gian tích lũy vượt quá thời gian khung hình, chuyển sang khung tiếp theo
-        while self.time_accumulator >= frame_duration:
+            # Nếu thời gian tích lũy vượt quá thời gian khung hình, chuyển sang khung tiếp theo
             self.time_accumulator -= frame_duration
+            frames_advanced += 1
             self.frame_number += 1
 
             # Kiểm tra nếu hết chu kỳ hoạt ảnh
-            if self.frame_number >= len(current_animation.frames):
+            if self.frame_number >= len(current_animation.frame_durations):
                 self.frame_number = 0
-                self.state = current_animation.next(self)
+                self.state = self.next_state()
+
+        if frames_advanced > 1:
+            self.dropped_frames += frames_advanced - 1
+        return frames_advanced
+
+    def get_time_to_next_frame(self) -> float:
+        """Seconds until the current frame has been shown for its full duration"""
+        frame_duration = self.animations[self.state].get_frame_duration(self.frame_number)
+        return max(frame_duration - self.time_accumulator, 0) / 1000
+
+    def next_state(self) -> AnimationStates:
+        """The state to play once the current animation ended: the same one until it repeated
+        enough times, then one picked by the state graph
+        """
+        if self.repititions < self.repititions_target:
+            self.repititions += 1
+            return self.state
+        state = self.graph.next_state(self.state)
+        self.repititions = 0
+        self.repititions_target = self.graph.draw_repititions(state)
+        return state
 
     def set_animation_state(self, state: AnimationStates) -> bool:
         if state == self.state:
             return False
         self.frame_number = 0
         self.repititions = 0
+        self.repititions_target = self.graph.draw_repititions(state)
         self.time_accumulator = 0
         self.state = state
         return True
 
+    def set_animations(self, animations: Dict[AnimationStates, Animation]):
+        """Play other animations from now on, ie the same ones at another size. Carries on in the
+        same state and frame, or starts over in the initial state when the state is not in them.
+        """
+        self.animations = animations
+        self.graph = StateGraph.of(animations)
+        if self.state not in animations:
+            self.set_animation_state(self.graph.states[self.graph.initial])
+            return
+        frame_durations = animations[self.state].frame_durations
+        if frame_durations is None or self.frame_number >= len(frame_durations):
+            self.frame_number = 0
+
     def __repr__(self):
-        return f"<Animator: {str(self.state)} on frame {self.frame_number}>"
\ No newline at end of file
+        return f"<Animator: {str(self.state)} on frame {self.frame_number}>"
@@ -0,0 +1,44 @@
+"""Compiles the animations of a pet into a sprite pack, one atlas file plus a manifest, that
+the pet is then loaded from instead of its gifs.
+
+Run from the project root:
+    python -m src.animation.compile totoro
+"""
+import argparse
+import os
+import pathlib
+import time
+from src.config_reader import load_config
+from .animation import Animation
+from .frame_cache import FrameCache
+from .load_animations import get_pet_animations
+from .sprite_pack import SpritePack
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("pet_name")
+    args = parser.parse_args()
+
+    pet_config = load_config().get_pet(args.pet_name)
+    Animation.preserve_aspect_ratio = pet_config.preserve_aspect_ratio
+    Animation.frame_cache = FrameCache()
+
+    start = time.perf_counter()
+    impath = os.path.join(pathlib.Path().resolve(), "src", "sprites")
+    animations = get_pet_animations(args.pet_name, impath, pet_config.target_resolution)
+    pack_path = SpritePack.compile(
+        args.pet_name, animations, pet_config.target_resolution, Animation.get_preprocessing_options()
+    )
+    Animation.frame_cache.flush()
+
+    pack = SpritePack.open(args.pet_name, pet_config.target_resolution, Animation.get_preprocessing_options())
+    print(
+        f"Compiled {len(pack.manifest['animations'])} animations with {len(pack.manifest['frames'])} unique frames "
+        f"({os.path.getsize(pack_path) / 1024 / 1024:.1f}MB) into {pack_path} in {time.perf_counter() - start:.1f}s"
+    )
+    pack.close()
+
+
+if __name__ == "__main__":
+    main()
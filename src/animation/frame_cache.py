@@ -0,0 +1,211 @@
+import hashlib
+import json
+import os
+import pathlib
+import struct
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+from PIL import Image
+from src import logger
+
+DecodedFrames = Tuple[List[Image.Image], List[int]]
+
+
+class FrameCache:
+    """Content addressed on-disk store of decoded and scaled animation frames.
+
+    Entries are keyed by the digest of the source file, the target resolution and the
+    options used to produce the frames, so a changed gif or a changed `<resolution>` in
+    the config.xml simply maps to a new entry instead of a stale one. Safe to share between
+    threads.
+    """
+
+    FORMAT_VERSION = 1
+    """Bump whenever the on-disk layout or the meaning of the stored pixels changes"""
+    MAGIC = b"DPFC"
+    INDEX_FILE = "index.json"
+
+    path: str
+    """Folder the cache entries are stored in"""
+    hits: int
+    misses: int
+
+    def __init__(self, path: str = None):
+        """
+        Args:
+            path (str, optional): Folder to keep the cache in. Defaults to `cache/frames` in the working directory.
+        """
+        if path is None:
+            path = os.path.join(pathlib.Path().resolve(), "cache", "frames")
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._digests = self._read_index()
+        self._index_dirty = False
+        self._lock = threading.RLock()
+
+    def key(self, source: str, target_resolution: Tuple[int, int], options: Dict[str, any]) -> str:
+        """Build the cache key for a source file as it would be loaded with the given settings
+
+        Args:
+            source (str): Path to the source gif/image.
+            target_resolution (Tuple[int, int]): Resolution the frames are scaled to.
+            options (Dict[str, any]): Any other preprocessing options that change the output pixels.
+
+        Returns:
+            str: hex digest identifying the entry
+        """
+        description = json.dumps(
+            {
+                "version": FrameCache.FORMAT_VERSION,
+                "source": self.source_digest(source),
+                "resolution": list(target_resolution),
+                "options": options,
+            },
+            sort_keys=True,
+        )
+        return hashlib.sha1(description.encode("utf-8")).hexdigest()
+
+    def source_digest(self, source: str) -> str:
+        """Hash of the contents of the source file. The hash is only recomputed when the
+        file's mtime or size changed since it was last seen.
+        """
+        source = os.path.abspath(source)
+        stat = os.stat(source)
+        with self._lock:
+            known = self._digests.get(source)
+        if known is not None and known["mtime_ns"] == stat.st_mtime_ns and known["size"] == stat.st_size:
+            return known["sha1"]
+
+        with open(source, "rb") as f:
+            digest = hashlib.sha1(f.read()).hexdigest()
+        with self._lock:
+            self._digests[source] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "sha1": digest}
+            self._index_dirty = True
+        return digest
+
+    def load(
+        self,
+        source: str,
+        target_resolution: Tuple[int, int],
+        options: Dict[str, any],
+        loader: Callable[[], DecodedFrames],
+    ) -> DecodedFrames:
+        """Get the frames for a source from the cache, or produce them with `loader` and store them
+
+        Args:
+            source (str): Path to the source gif/image.
+            target_resolution (Tuple[int, int]): Resolution the frames are scaled to.
+            options (Dict[str, any]): Any other preprocessing options that change the output pixels.
+            loader (Callable[[], DecodedFrames]): Decodes and scales the source on a miss.
+
+        Returns:
+            DecodedFrames: the RGBA frames and their durations (in ms)
+        """
+        key = self.key(source, target_resolution, options)
+        cached = self.get(key)
+        if cached is not None:
+            with self._lock:
+                self.hits += 1
+            self.flush()
+            return cached
+
+        with self._lock:
+            self.misses += 1
+        images, durations = loader()
+        self.put(key, images, durations)
+        self.flush()
+        return images, durations
+
+    def get(self, key: str) -> Optional[DecodedFrames]:
+        """Read an entry, returns None if it does not exist or cannot be read"""
+        entry_path = self._entry_path(key)
+        if not os.path.isfile(entry_path):
+            return None
+
+        try:
+            with open(entry_path, "rb") as f:
+                data = f.read()
+            if data[:4] != FrameCache.MAGIC:
+                raise ValueError("bad magic")
+            (header_length,) = struct.unpack_from("<I", data, 4)
+            offset = 8 + header_length
+            header = json.loads(data[8:offset].decode("utf-8"))
+            images = []
+            for width, height in header["sizes"]:
+                length = width * height * 4
+                images.append(Image.frombytes("RGBA", (width, height), data[offset : offset + length]))
+                offset += length
+            if offset != len(data):
+                raise ValueError("truncated pixel data")
+            return images, header["durations"]
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable frame cache entry {entry_path}: {str(e)}")
+            return None
+
+    def put(self, key: str, images: List[Image.Image], durations: List[int]):
+        """Write an entry. Failing to write only costs us the cache, so errors are logged and swallowed"""
+        header = json.dumps(
+            {"sizes": [list(image.size) for image in images], "durations": list(durations)}
+        ).encode("utf-8")
+        entry_path = self._entry_path(key)
+        try:
+            os.makedirs(self.path, exist_ok=True)
+            tmp_path = f"{entry_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(FrameCache.MAGIC)
+                f.write(struct.pack("<I", len(header)))
+                f.write(header)
+                for image in images:
+                    f.write(image.convert("RGBA").tobytes())
+            os.replace(tmp_path, entry_path)
+        except OSError as e:
+            logger.warning(f"Could not write frame cache entry {entry_path}: {str(e)}")
+
+    def flush(self):
+        """Persist the source digest index so unchanged files are not re-hashed next run"""
+        with self._lock:
+            if not self._index_dirty:
+                return
+            try:
+                os.makedirs(self.path, exist_ok=True)
+                index_path = os.path.join(self.path, FrameCache.INDEX_FILE)
+                tmp_path = f"{index_path}.{os.getpid()}.tmp"
+                with open(tmp_path, "w") as f:
+                    json.dump(self._digests, f)
+                os.replace(tmp_path, index_path)
+                self._index_dirty = False
+            except OSError as e:
+                logger.warning(f"Could not write frame cache index: {str(e)}")
+
+    def clear(self):
+        """Remove every entry from the cache"""
+        if not os.path.isdir(self.path):
+            return
+        with self._lock:
+            for file_name in os.listdir(self.path):
+                os.remove(os.path.join(self.path, file_name))
+            self._digests = {}
+            self._index_dirty = False
+
+    def report(self) -> str:
+        total = self.hits + self.misses
+        rate = self.hits / total * 100 if total else 0
+        return f"Frame cache: {self.hits} hits, {self.misses} misses ({rate:.0f}% hit rate)"
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.path, key + ".bin")
+
+    def _read_index(self) -> Dict[str, Dict[str, any]]:
+        index_path = os.path.join(self.path, FrameCache.INDEX_FILE)
+        if not os.path.isfile(index_path):
+            return {}
+        try:
+            with open(index_path) as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable frame cache index: {str(e)}")
+            return {}
+
+    def __repr__(self):
+        return f"<FrameCache at {self.path}: {self.hits} hits, {self.misses} misses>"
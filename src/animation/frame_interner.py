@@ -0,0 +1,123 @@
+import hashlib
+import os
+import threading
+import time
+import weakref
+from collections import defaultdict
+from typing import Callable, List, Tuple
+from PIL import Image, ImageTk
+import tkinter as tk
+from .frame_cache import DecodedFrames
+
+
+class DecodedSource:
+    """Decoded frames of one source file at one resolution, shared by every animation using it.
+
+    Holds the raw `images` until they are handed to tkinter, after which only `frames` is kept.
+    """
+
+    __slots__ = ("images", "durations", "frames", "decode_seconds", "__weakref__")
+
+    def __init__(self, images: List[Image.Image], durations: List[int], decode_seconds: float = 0):
+        self.images = images
+        self.durations = durations
+        self.frames = None
+        self.decode_seconds = decode_seconds
+
+    def realize(self, to_frames: Callable[[List[Image.Image]], List[tk.PhotoImage]]) -> List[tk.PhotoImage]:
+        """Create the tkinter frames if that has not happened yet. Must be called from the tkinter thread."""
+        if self.frames is None:
+            self.frames = to_frames(self.images)
+            self.images = None
+        return self.frames
+
+
+class FrameInterner:
+    """Shares decoded sources and identical frames between animations.
+
+    Sources are interned by path and target resolution, so two animations using the same gif
+    only decode it once. Frames are interned by a hash of their pixels, so identical frames,
+    within one gif or across gifs, share one tkinter image. Everything is held weakly, frames
+    are freed as soon as no animation uses them anymore.
+    """
+
+    sources_decoded: int
+    sources_shared: int
+    decode_seconds_saved: float
+    frames_created: int
+    frames_shared: int
+    bytes_saved: int
+
+    def __init__(self):
+        self._sources = weakref.WeakValueDictionary()
+        self._frames = weakref.WeakValueDictionary()
+        self._source_locks = defaultdict(threading.Lock)
+        self._lock = threading.Lock()
+        self.sources_decoded = 0
+        self.sources_shared = 0
+        self.decode_seconds_saved = 0
+        self.frames_created = 0
+        self.frames_shared = 0
+        self.bytes_saved = 0
+
+    def decode(self, path: str, target_resolution: Tuple[int, int], load: Callable[[], DecodedFrames]) -> DecodedSource:
+        """Get the decoded source for a path and resolution, decoding it with `load` only if no
+        animation currently holds it. Safe to call from any thread.
+        """
+        key = (os.path.abspath(path), tuple(target_resolution))
+        with self._lock:
+            source_lock = self._source_locks[key]
+        with source_lock:
+            source = self._sources.get(key)
+            if source is not None:
+                with self._lock:
+                    self.sources_shared += 1
+                    self.decode_seconds_saved += source.decode_seconds
+                return source
+
+            start = time.perf_counter()
+            images, durations = load()
+            source = DecodedSource(images, durations, time.perf_counter() - start)
+            with self._lock:
+                self._sources[key] = source
+                self.sources_decoded += 1
+            return source
+
+    def to_frames(
+        self, images: List[Image.Image], photo_image: Callable[[Image.Image], tk.PhotoImage] = ImageTk.PhotoImage
+    ) -> List[tk.PhotoImage]:
+        """Hand images over to tkinter, reusing the tkinter image of any identical frame.
+        Must be called from the tkinter thread. Images with a `frame_key` in their info, ie
+        those read from a sprite pack, are told apart by that key instead of by their pixels.
+
+        Args:
+            images (List[Image.Image]): decoded frames
+            photo_image (Callable[[Image.Image], tk.PhotoImage], optional): makes a frame out of an image.
+                Defaults to ImageTk.PhotoImage.
+        """
+        frames = []
+        for image in images:
+            digest = image.info.get("frame_key")
+            if digest is None:
+                image = image.convert("RGBA")
+                digest = (image.size, hashlib.sha1(image.tobytes()).digest())
+            frame = self._frames.get(digest)
+            if frame is None:
+                frame = photo_image(image)
+                self._frames[digest] = frame
+                self.frames_created += 1
+            else:
+                self.frames_shared += 1
+                self.bytes_saved += image.width * image.height * 4
+            frames.append(frame)
+        return frames
+
+    def report(self) -> str:
+        return (
+            f"Frame interner: {self.sources_decoded} sources decoded, {self.sources_shared} shared "
+            f"(saved {self.decode_seconds_saved * 1000:.0f}ms of decoding), {self.frames_created} unique frames, "
+            f"{self.frames_shared} shared (saved {self.bytes_saved / 1024 / 1024:.1f}MB)"
+        )
+
+    def __repr__(self):
+        return f"<FrameInterner: {len(self._sources)} sources, {len(self._frames)} frames>"
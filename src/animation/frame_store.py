@@ -0,0 +1,134 @@
+from collections import OrderedDict
+from typing import Dict, Iterable, List
+from src import logger
+
+
+class FrameStore:
+    """Keeps the tkinter frames of loaded animations within a memory budget.
+
+    Animations are evicted least recently used first, and load their frames again (from the
+    frame cache if there is one) the next time they are needed. Pinned animations, i.e. the
+    current animation and the ones it can transition to, are never evicted. Only use from
+    the tkinter thread, as evicting deletes tkinter images.
+    """
+
+    BYTES_PER_PIXEL = 4
+    """tkinter keeps photo images as 32 bit RGBA"""
+
+    budget_bytes: int
+    """Memory the frames may use before animations get evicted, None for no limit"""
+    evictions: int
+
+    def __init__(self, budget_bytes: int = None):
+        """
+        Args:
+            budget_bytes (int, optional): Memory budget for all frames. Defaults to no limit.
+        """
+        self.budget_bytes = budget_bytes
+        self.evictions = 0
+        self._resident: "OrderedDict[object, int]" = OrderedDict()
+        self._frames: Dict[object, List[any]] = {}
+        self._pinned = set()
+        self._pins: Dict[int, set] = {}
+        self._warned_over_budget = False
+
+    @staticmethod
+    def from_megabytes(megabytes: float) -> "FrameStore":
+        """Make a store with a budget in MB, as used in the config.xml. 0 or None means no limit"""
+        if not megabytes:
+            return FrameStore()
+        return FrameStore(int(megabytes * 1024 * 1024))
+
+    @staticmethod
+    def get_frames_bytes(frames: List[any]) -> int:
+        """Memory used by a list of frames, counting frames that appear more than once only once"""
+        unique = {id(frame): frame for frame in frames}
+        return sum(
+            frame.width() * frame.height() * FrameStore.BYTES_PER_PIXEL for frame in unique.values()
+        )
+
+    @property
+    def total_bytes(self) -> int:
+        """Memory used by all loaded frames, frames shared between animations are counted once"""
+        return FrameStore.get_frames_bytes([frame for frames in self._frames.values() for frame in frames])
+
+    def add(self, animation, frames: List[any]):
+        """Record a freshly loaded animation and evict others if that goes over the budget"""
+        self._resident[animation] = FrameStore.get_frames_bytes(frames)
+        self._frames[animation] = frames
+        self._resident.move_to_end(animation)
+        self.evict(keep=animation)
+
+    def touch(self, animation):
+        """Mark an animation as most recently used"""
+        if animation in self._resident:
+            self._resident.move_to_end(animation)
+
+    def pin(self, animations: Iterable[any], owner=None):
+        """Replace the set of animations that must stay loaded
+
+        Args:
+            animations (Iterable[Animation]): Animations to keep loaded.
+            owner (optional): Whose pins to replace, when several sets of animations share the store.
+        """
+        # Owners may be mappings, which are not hashable
+        self._pins[id(owner)] = set(animations)
+        self._pinned = set().union(*self._pins.values())
+
+    def forget(self, animations: Iterable[any], owner=None):
+        """Stop tracking animations that are being dropped, along with the pins of their owner
+
+        Args:
+            animations (Iterable[Animation]): Animations no pet plays anymore.
+            owner (optional): Whose pins to drop.
+        """
+        self._pins.pop(id(owner), None)
+        self._pinned = set().union(*self._pins.values())
+        for animation in animations:
+            self._resident.pop(animation, None)
+            self._frames.pop(animation, None)
+
+    def evict(self, keep=None):
+        """Unload least recently used animations until the frames fit in the budget
+
+        Args:
+            keep (Animation, optional): An extra animation that must not be evicted.
+        """
+        if self.budget_bytes is None:
+            return
+        total = self.total_bytes
+        for animation in list(self._resident.keys()):
+            if total <= self.budget_bytes:
+                break
+            if animation is keep or animation in self._pinned or not animation.can_unload:
+                continue
+            self._resident.pop(animation)
+            self._frames.pop(animation)
+            animation.unload()
+            total = self.total_bytes
+            self.evictions += 1
+            logger.debug(f"Evicted {animation.name} from the frame store")
+
+        if total > self.budget_bytes and not self._warned_over_budget:
+            self._warned_over_budget = True
+            logger.warning(
+                f"Frames of the pinned animations alone use {total / 1024 / 1024:.1f}MB, "
+                f"over the {self.budget_bytes / 1024 / 1024:.1f}MB frame memory budget"
+            )
+
+    def get_usage(self) -> Dict[str, int]:
+        """Bytes used per loaded animation, by animation name. Shared frames count towards every animation using them"""
+        return {animation.name: size for animation, size in self._resident.items()}
+
+    def report(self) -> str:
+        budget = "no limit" if self.budget_bytes is None else f"{self.budget_bytes / 1024 / 1024:.1f}MB budget"
+        lines = [
+            f"Frame store: {self.total_bytes / 1024 / 1024:.1f}MB in {len(self._resident)} animations "
+            f"({budget}, {self.evictions} evictions)"
+        ]
+        for name, size in sorted(self.get_usage().items(), key=lambda usage: -usage[1]):
+            lines.append(f"    {name}: {size / 1024:.0f}KB")
+        return "\n".join(lines)
+
+    def __repr__(self):
+        return f"<FrameStore: {self.total_bytes} bytes in {len(self._resident)} animations>"
@@ -0,0 +1,196 @@
+import os
+from collections.abc import Mapping
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Dict, Iterable, Iterator, List, Tuple
+from src import logger
+from .animation_states import AnimationStates
+from .animation import Animation
+from .state_graph import StateGraph
+
+
+class LazyAnimations(Mapping):
+    """Mapping of animation states to animations whose frames are only decoded once needed.
+
+    Whenever a different state is looked up, the states that state is likely to transition
+    to next (by the weights in the pet's `graph`) are decoded on a background
+    threads, so switching to them does not have to wait on decoding. Those states and the
+    looked up one are also pinned in the `Animation.frame_store`, if there is one.
+
+    Several pets of the same kind can share one LazyAnimations, each looking it up through
+    its own `view()`, so the frames are decoded and kept once. The states every pet is in, and
+    their successors, then all stay pinned.
+
+    Decoding and scaling run on a pool of worker threads (Pillow releases the GIL while doing
+    so), only handing the decoded pixels to tkinter happens on the tkinter thread.
+    """
+
+    animations: Dict[AnimationStates, Animation]
+    graph: StateGraph
+    """The animations' state machine, compiled when the animations are loaded"""
+    should_prefetch: bool
+    workers: int
+    """Number of threads decoding animations in the background"""
+
+    def __init__(
+        self, animations: Dict[AnimationStates, Animation], should_prefetch: bool = True, workers: int = None
+    ):
+        """
+        Args:
+            animations (Dict[AnimationStates, Animation]): Animations that have not necessarily been loaded yet.
+            should_prefetch (bool, optional): Whether or not to decode likely next animations in the background.
+            workers (int, optional): Number of decoding threads. Defaults to one per core.
+        """
+        self.animations = animations
+        self.graph = StateGraph.compile(animations)
+        self.should_prefetch = should_prefetch
+        self.workers = workers if workers else (os.cpu_count() or 1)
+        self._last_state = None
+        self._current_states: Dict[int, AnimationStates] = {}
+        """State each view, or this mapping itself, is in, by id"""
+        self._pending: Dict[AnimationStates, Future] = {}
+        self._executor = None
+
+    def __getitem__(self, state: AnimationStates) -> Animation:
+        animation = self.animations[state]
+        if state != self._last_state:
+            self._last_state = state
+            self.on_state_changed(state)
+        return animation
+
+    def __contains__(self, state) -> bool:
+        return state in self.animations
+
+    def __iter__(self) -> Iterator[AnimationStates]:
+        return iter(self.animations)
+
+    def __len__(self) -> int:
+        return len(self.animations)
+
+    def get_successor_weights(self, state: AnimationStates) -> List[Tuple[AnimationStates, float]]:
+        """Probability of each state following the given state, most likely first
+
+        Args:
+            state (AnimationStates): state to get the successors of
+
+        Returns:
+            List[Tuple[AnimationStates, float]]
+        """
+        return self.graph.get_successor_weights(state)
+
+    def view(self) -> "AnimationsView":
+        """A mapping of the same animations for one more pet, see AnimationsView"""
+        return AnimationsView(self)
+
+    def on_state_changed(self, state: AnimationStates, viewer=None):
+        """Keep the new state and its successors resident and start decoding them
+
+        Args:
+            state (AnimationStates): state that was switched to
+            viewer (optional): view that switched, None when this mapping was used directly
+        """
+        self._current_states[id(self if viewer is None else viewer)] = state
+        successors = [next_state for next_state, _ in self.get_successor_weights(state)]
+        if Animation.frame_store is not None:
+            needed = set()
+            for current_state in set(self._current_states.values()):
+                needed.add(current_state)
+                needed.update(next_state for next_state, _ in self.get_successor_weights(current_state))
+            Animation.frame_store.pin((self.animations[needed_state] for needed_state in needed), owner=self)
+            # Decoded frames of states we are no longer heading towards only take up memory
+            for other_state, animation in self.animations.items():
+                if other_state not in needed and other_state not in self._pending:
+                    animation.discard_prefetched()
+        if self.should_prefetch:
+            # The new state itself first: while a worker decodes it the tkinter thread can
+            # carry on until it actually needs the frames
+            for next_state in [state, *successors]:
+                self.prefetch(next_state)
+
+    def prefetch_successors(self, state: AnimationStates):
+        """Decode the likely successors of a state in the background, most likely first"""
+        for next_state, _ in self.get_successor_weights(state):
+            self.prefetch(next_state)
+
+    def prefetch(self, state: AnimationStates):
+        """Decode the frames of an animation in the background if they are not loaded yet"""
+        animation = self.animations[state]
+        if animation.is_loaded or state in self._pending:
+            return
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="animation-prefetch")
+        future = self._executor.submit(animation.prefetch)
+        self._pending[state] = future
+        future.add_done_callback(lambda done: self._on_prefetched(state, done))
+
+    def prefetch_all(self, states: Iterable[AnimationStates] = None):
+        """Decode several animations, all of them by default, in parallel in the background"""
+        for state in self.animations.keys() if states is None else states:
+            self.prefetch(state)
+
+    def wait(self, timeout: float = None):
+        """Block until all animations queued for prefetching are decoded"""
+        wait(list(self._pending.values()), timeout=timeout)
+
+    def _on_prefetched(self, state: AnimationStates, future: Future):
+        self._pending.pop(state, None)
+        if not future.cancelled() and future.exception() is not None:
+            logger.error(f"Failed to prefetch {state}: {str(future.exception())}")
+
+    def close(self):
+        """Stop prefetching, anything not yet decoded will be decoded when it is needed"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def release(self):
+        """Stop prefetching and drop every frame, once no pet plays these animations anymore"""
+        self.close()
+        if Animation.frame_store is not None:
+            Animation.frame_store.forget(self.animations.values(), owner=self)
+        for animation in self.animations.values():
+            if animation.can_unload:
+                animation.unload()
+
+    def __repr__(self):
+        loaded = sum(1 for animation in self.animations.values() if animation.is_loaded)
+        return f"<LazyAnimations: {loaded}/{len(self.animations)} loaded, {len(self._current_states)} viewers>"
+
+
+class AnimationsView(Mapping):
+    """One pet's mapping of animations shared with other pets, made by `LazyAnimations.view()`.
+
+    Looks up the shared animations, but keeps track of the state of its own pet, so the
+    shared mapping keeps the animations of every pet loaded instead of just the last one.
+    """
+
+    shared: LazyAnimations
+
+    def __init__(self, shared: LazyAnimations):
+        self.shared = shared
+        self._last_state = None
+
+    @property
+    def graph(self) -> StateGraph:
+        return self.shared.graph
+
+    def __getitem__(self, state: AnimationStates) -> Animation:
+        animation = self.shared.animations[state]
+        if state != self._last_state:
+            self._last_state = state
+            self.shared.on_state_changed(state, viewer=self)
+        return animation
+
+    def __contains__(self, state) -> bool:
+        return state in self.shared.animations
+
+    def __iter__(self) -> Iterator[AnimationStates]:
+        return iter(self.shared.animations)
+
+    def __len__(self) -> int:
+        return len(self.shared.animations)
+
+    def get_successor_weights(self, state: AnimationStates) -> List[Tuple[AnimationStates, float]]:
+        return self.shared.get_successor_weights(state)
+
+    def __repr__(self):
+        return f"<AnimationsView: {self._last_state} of {self.shared}>"
@@ -1,32 +1,101 @@
-from itertools import repeat
 import pathlib
 import os
-import random
-from typing import Tuple, Dict
+from typing import Callable, Tuple, Dict
+from src import logger
 from .animation_states import AnimationStates
 from .animation import Animation
+from .frame_cache import FrameCache
+from .frame_store import FrameStore
+from .frame_interner import FrameInterner
+from .lazy_animations import LazyAnimations
+from .sprite_pack import SpritePack
 
 
 def get_animations(
-    pet_name: str, target_resolution: Tuple[int, int], should_run_preprocessing: bool
-) -> Dict[AnimationStates, Animation]:
-    """Loads all of the animations for a pet and their source files into a dictionary
+    pet_name: str,
+    target_resolution: Tuple[int, int],
+    should_run_preprocessing: bool,
+    frame_cache: FrameCache = None,
+    frame_store: FrameStore = None,
+    frame_interner: FrameInterner = None,
+    preserve_aspect_ratio: bool = False,
+    use_sprite_pack: bool = True,
+    decode_workers: int = None,
+    compile_sprite_pack: bool = False,
+) -> LazyAnimations:
+    """Loads all of the animations for a pet into a mapping, their source files are only
+    decoded once an animation is first used (or is likely to be used next)
     Args:
         pet_name (str): name of the pet, ie the name of folder its animations are in
         target_resolution (Tuple[int, int]): target size of the animations
+        frame_cache (FrameCache, optional): cache of decoded frames to load from and fill
+        frame_store (FrameStore, optional): keeps the loaded frames within a memory budget
+        frame_interner (FrameInterner, optional): shares gifs used by several animations and identical
+            frames, a new one is made when not given
+        preserve_aspect_ratio (bool, optional): fit frames inside the target size instead of stretching them
+        use_sprite_pack (bool, optional): load the pet from its compiled sprite pack when there is an up to date one
+        decode_workers (int, optional): number of threads decoding animations, defaults to one per core
+        compile_sprite_pack (bool, optional): compile the sprite pack in the background when there is no up to
+            date one, so later starts and other processes showing the pet share its frames. This start
+            loads the gifs meanwhile
     Returns:
-        Dict[AnimationStates, Animation]
+        LazyAnimations
     """
     # Load the animation gifs from the sprite folder and make each of the gifs into a list of frames
     # Path to sprites we want to use
     impath = pathlib.Path().resolve()
     impath = os.path.join(impath, "src", "sprites")
     Animation.should_run_preprocessing = should_run_preprocessing
-    # **** This can be whatever set of animations you want it to be
-    # **** I just like horses so I have set it to that
-    animations = get_totoro_animations(impath, target_resolution)
+    Animation.preserve_aspect_ratio = preserve_aspect_ratio
+    Animation.frame_cache = frame_cache
+    Animation.frame_store = frame_store
+    # Several animations use the same gif (ie IDLE_TO_SLEEP and SLEEP_TO_IDLE), and gifs
+    # repeat frames, so only decode and keep each of those once
+    Animation.frame_interner = frame_interner if frame_interner is not None else FrameInterner()
+
+    # What the code defines for the pet, without decoding anything. A pack compiled from other
+    # definitions is out of date even if its gifs are not
+    defined = get_pet_animations(pet_name, impath, target_resolution) if pet_name in PET_ANIMATIONS else None
+    definition = SpritePack.get_definition(defined) if defined is not None else None
+
+    pack = None
+    if use_sprite_pack:
+        pack = SpritePack.open(pet_name, target_resolution, Animation.get_preprocessing_options(), definition)
+    if pack is None and use_sprite_pack and compile_sprite_pack and defined is not None:
+        # Compiling decodes its own copy of the frames (see Animation.decode_frames), so it can share the
+        # animations this start decodes lazily
+        SpritePack.compile_in_background(
+            pet_name, target_resolution, Animation.get_preprocessing_options(), lambda: defined
+        )
+    if pack is not None:
+        logger.info(f"Loading {pet_name} from {pack.path}")
+        animations = pack.get_animations()
+    elif defined is not None:
+        animations = defined
+    else:
+        animations = get_pet_animations(pet_name, impath, target_resolution)
+
+    return LazyAnimations(animations, workers=decode_workers)
+
+
+def get_pet_animations(
+    pet_name: str, impath: str, target_resolution: Tuple[int, int]
+) -> Dict[AnimationStates, Animation]:
+    """Loads the animations of a pet from their gifs, using the pet's definition in `PET_ANIMATIONS`
+    Args:
+        pet_name (str): name of the pet, ie the name of folder its animations are in
+        impath (str): path to the folder the pets' sprite folders are in
+        target_resolution (Tuple[int, int]): target size of the animations
+    Returns:
+        Dict[AnimationStates, Animation]
+    """
+    if pet_name not in PET_ANIMATIONS:
+        raise Exception(
+            f"No animations are defined for '{pet_name}'. Either compile a sprite pack for it with "
+            f"'python -m src.animation.compile {pet_name}' or add it to PET_ANIMATIONS"
+        )
+    return PET_ANIMATIONS[pet_name](impath, target_resolution)
 
-    return animations
 
 def get_totoro_animations(impath: str, target_resolution: Tuple[int, int]):
     """Loads all of the animations for a totoro
@@ -38,26 +107,29 @@ def get_totoro_animations(impath: str, target_resolution: Tuple[int, int]):
     """
     pj = os.path.join
     impath = pj(impath, "totoro")
-    standing_actions = [AnimationStates.IDLE_TO_SLEEP]
-    standing_actions.extend(repeat(AnimationStates.IDLE, 2))
-    standing_actions.extend(repeat(AnimationStates.SLEEP_TO_IDLE, 3))
-    standing_actions.extend(repeat(AnimationStates.LANDED, 3))
-    standing_actions.extend(repeat(AnimationStates.DRUM, 2))
-    standing_actions.extend(repeat(AnimationStates.HERO, 3))
-    standing_actions.extend(repeat(AnimationStates.GUITAR, 2))
-    standing_actions.extend(repeat(AnimationStates.FALLING, 3))
-    standing_actions.extend(repeat(AnimationStates.DRUM_2, 3))
-    standing_actions.extend(repeat(AnimationStates.WORK, 3))
-    standing_actions.extend(repeat(AnimationStates.QUAY, 3))
-    standing_actions.extend(repeat(AnimationStates.AE_QUAY, 3))
-    standing_actions.extend(repeat(AnimationStates.TAP_TA, 3))
+    # Relative weights of what follows the standing animations
+    standing_actions = {
+        AnimationStates.IDLE_TO_SLEEP: 1,
+        AnimationStates.IDLE: 2,
+        AnimationStates.SLEEP_TO_IDLE: 3,
+        AnimationStates.LANDED: 3,
+        AnimationStates.DRUM: 2,
+        AnimationStates.HERO: 3,
+        AnimationStates.GUITAR: 2,
+        AnimationStates.FALLING: 3,
+        AnimationStates.DRUM_2: 3,
+        AnimationStates.WORK: 3,
+        AnimationStates.QUAY: 3,
+        AnimationStates.AE_QUAY: 3,
+        AnimationStates.TAP_TA: 3,
+    }
 
     animations: Dict[AnimationStates, Animation] = {
         AnimationStates.IDLE: Animation(
             standing_actions,
             gif_location=pj(impath, "tym_new.gif"),
             target_resolution=target_resolution,
-            repititions=random.randint(3, 6),
+            repititions=(3, 6),
             list_message=["Xin chào!", "Tớ là Totoro!", "Chào Lu xinh <3"],  # Danh sách message
         ),
         AnimationStates.IDLE_TO_SLEEP: Animation(
@@ -73,7 +145,7 @@ def get_totoro_animations(impath: str, target_resolution: Tuple[int, int]):
             ],
             gif_location=pj(impath, "ngu_new.gif"),
             target_resolution=target_resolution,
-            repititions=random.randint(4, 7),
+            repititions=(4, 7),
             list_message=["Đừng làm phiền", "Yên ngủ coii"]
         ),
         AnimationStates.SLEEP_TO_IDLE: Animation(
@@ -92,7 +164,7 @@ def get_totoro_animations(impath: str, target_resolution: Tuple[int, int]):
             gif_location=pj(impath, "di_bo_phai_new.gif"),
             v_x=2,
             target_resolution=target_resolution,
-            repititions=random.randint(3, 6),
+            repititions=(3, 6),
             list_message=["Mệt quóo", "Đi lại i"],  # Danh sách message
         ),      
         AnimationStates.WALK_RIGHT: Animation(
@@ -102,7 +174,7 @@ def get_totoro_animations(impath: str, target_resolution: Tuple[int, int]):
             gif_location=pj(impath, "bo_phai.gif"),
             v_x=1,
             target_resolution=target_resolution,
-            repititions=random.randint(3, 7),
+            repititions=(3, 7),
             list_message=["Đi lẹ lên"],  # Danh sách message
         ),
         AnimationStates.WALK_POSITIVE_MANY: Animation(
@@ -122,7 +194,7 @@ def get_totoro_animations(impath: str, target_resolution: Tuple[int, int]):
             gif_location=pj(impath, "chay_phai_new.gif"),
             v_x=4,
             target_resolution=target_resolution,
-            repititions=random.randint(3, 6),
+            repititions=(3, 6),
             list_message=["Đố deadline bắt được tui"],  # Danh sách message
         ),
         AnimationStates.RUN_POSITIVE_TIRED: Animation(
@@ -132,7 +204,7 @@ def get_totoro_animations(impath: str, target_resolution: Tuple[int, int]):
             gif_location=pj(impath, "chay_phai_met_new.gif"),
             v_x=3,
             target_resolution=target_resolution,
-            repititions=random.randint(3, 6),
+            repititions=(3, 6),
             list_message=["Cíu, mệt", "Mắc gì chạy?"],  # Danh sách message
         ),
         AnimationStates.WALK_POSITIVE_RAIN: Animation(
@@ -142,14 +214,14 @@ def get_totoro_animations(impath: str, target_resolution: Tuple[int, int]):
             gif_location=pj(impath, "che_o_phai_new.gif"),
             v_x=2,
             target_resolution=target_resolution,
-            repititions=random.randint(3, 6),
+            repititions=(3, 6),
             list_message=["Mưa ời"],  # Danh sách message
         ),
         AnimationStates.SWIM_RIGHT: Animation(
             standing_actions,
             gif_location=pj(impath, "boi_phai_new.gif"),
             target_resolution=target_resolution,
-            repititions=random.randint(2, 4),
+            repititions=(2, 4),
             v_x=2,
             list_message=["Không kịp mất", "Đuối rồi"],  # Danh sách message
         ),
@@ -163,7 +235,7 @@ def get_totoro_animations(impath: str, target_resolution: Tuple[int, int]):
             gif_location=pj(impath, "di_bo_trai_new.gif"),
             v_x=-2,
             target_resolution=target_resolution,
-            repititions=random.randint(3, 6),
+            repititions=(3, 6),
             list_message=["Mắc mệt thiệt á", "Đi lại chút i"],  # Danh sách message
         ),     
         AnimationStates.WALK_LEFT: Animation(
@@ -173,7 +245,7 @@ def get_totoro_animations(impath: str, target_resolution: Tuple[int, int]):
             gif_location=pj(impath, "bo_trai.gif"),
             v_x=-1,
             target_resolution=target_resolution,
-            repititions=random.randint(3, 7),
+            repititions=(3, 7),
             list_message=["Chậm chạp quó"],  # Danh sách message
         ),   
         AnimationStates.WALK_NEGATIVE_MANY: Animation(
@@ -193,7 +265,7 @@ def get_totoro_animations(impath: str, target_resolution: Tuple[int, int]):
             gif_location=pj(impath, "chay_trai_new.gif"),
             v_x=-4,
             target_resolution=target_resolution,
-            repititions=random.randint(3, 6),
+            repititions=(3, 6),
             list_message=["Trốn lẹ"],  # Danh sách message
         ),
         AnimationStates.RUN_NEGATIVE_TIRED: Animation(
@@ -203,7 +275,7 @@ def get_totoro_animations(impath: str, target_resolution: Tuple[int, int]):
             gif_location=pj(impath, "chay_trai_met_new.gif"),
             v_x=-3,
             target_resolution=target_resolution,
-            repititions=random.randint(3, 6),
+            repititions=(3, 6),
             list_message=["Cíu, mệt", "Ai bắt tui chạy?"],  # Danh sách message
         ),
         AnimationStates.WALK_NEGATIVE_RAIN: Animation(
@@ -213,14 +285,14 @@ def get_totoro_animations(impath: str, target_resolution: Tuple[int, int]):
             gif_location=pj(impath, "che_o_trai_new.gif"),
             v_x=-2,
             target_resolution=target_resolution,
-            repititions=random.randint(3, 6),
+            repititions=(3, 6),
             list_message=["Mưa nữa ờiii"],  # Danh sách message
         ),
         AnimationStates.SWIM_LEFT: Animation(
             standing_actions,
             gif_location=pj(impath, "boi_trai_new.gif"),
             target_resolution=target_resolution,
-            repititions=random.randint(2, 4),
+            repititions=(2, 4),
             v_x=-2,
             list_message=["Về bờ lẹ", "Sắp đuối rồi"],  
         ),
@@ -229,7 +301,7 @@ def get_totoro_animations(impath: str, target_resolution: Tuple[int, int]):
             standing_actions,
             gif_location=pj(impath, "quay_lung_new.gif"),
             target_resolution=target_resolution,
-            repititions=random.randint(2, 4),
+            repititions=(2, 4),
             list_message=["Cấm nhìn"],  # Danh sách message
         ),
         AnimationStates.DRUM: Animation(
@@ -238,69 +310,69 @@ def get_totoro_animations(impath: str, target_resolution: Tuple[int, int]):
             ],
             gif_location=pj(impath, "go_trong_new.gif"),
             target_resolution=target_resolution,
-            repititions=random.randint(3, 5),
+            repititions=(3, 5),
             list_message=["Hết giờ!!!"],  # Danh sách message
         ),
         AnimationStates.FALLING: Animation(
             standing_actions,
             gif_location=pj(impath, "nhun_nhay_new.gif"),
             target_resolution=target_resolution,
-            repititions=random.randint(2, 4),
+            repititions=(2, 4),
             list_message=["Vận động tý nào"],  # Danh sách message
         ),
         AnimationStates.DANCE: Animation(
             standing_actions,
             gif_location=pj(impath, "nhun_nhay_fail.gif"),
             target_resolution=target_resolution,
-            repititions=random.randint(2, 4),
+            repititions=(2, 4),
         ),
         AnimationStates.GUITAR: Animation(
             standing_actions,
             gif_location=pj(impath, "danh_dan_new.gif"),
             target_resolution=target_resolution,
-            repititions=random.randint(2, 4),
+            repititions=(2, 4),
             list_message=["🎸Tưng… tưng… tèng…"],  # Danh sách message
         ),
         AnimationStates.WORK: Animation(
             standing_actions,
             gif_location=pj(impath, "lam_viec.gif"),
             target_resolution=target_resolution,
-            repititions=random.randint(3, 6),
+            repititions=(3, 6),
             list_message=["Tập trung"],  # Danh sách message
         ),
         AnimationStates.QUAY: Animation(
             [AnimationStates.AE_QUAY],
             gif_location=pj(impath, "quay.gif"),
             target_resolution=target_resolution,
-            repititions=random.randint(3, 6),
+            repititions=(3, 6),
             list_message=["Vận động i"],  # Danh sách message
         ),
         AnimationStates.AE_QUAY: Animation(
             standing_actions,
             gif_location=pj(impath, "ae_quay.gif"),
             target_resolution=target_resolution,
-            repititions=random.randint(3, 6),
+            repititions=(3, 6),
             list_message=["Tadaaa..."],  # Danh sách message
         ),
         AnimationStates.TAP_TA: Animation(
             standing_actions,
             gif_location=pj(impath, "tap_ta.gif"),
             target_resolution=target_resolution,
-            repititions=random.randint(3, 6),
+            repititions=(3, 6),
             list_message=["🏋️Hự… Haa…!"],  # Danh sách message
         ),
         AnimationStates.HERO: Animation(
             standing_actions,
             gif_location=pj(impath, "sieu_nhan_new.gif"),
             target_resolution=target_resolution,
-            repititions=random.randint(3, 6),
+            repititions=(3, 6),
             list_message=["Cíu thế giới"],  # Danh sách message
         ),
         AnimationStates.DRUM_2: Animation(
             standing_actions,
             gif_location=pj(impath, "danh_trong.gif"),
             target_resolution=target_resolution,
-            repititions=random.randint(3, 6),
+            repititions=(3, 6),
             list_message=["Thùng... thình... thùng... 🎶🥁"],  # Danh sách message
         ),
         AnimationStates.LANDED: Animation(
@@ -310,8 +382,14 @@ def get_totoro_animations(impath: str, target_resolution: Tuple[int, int]):
             ],
             gif_location=pj(impath, "lac_vong_new.gif"),
             target_resolution=target_resolution,
-            repititions=random.randint(3, 5),
+            repititions=(3, 5),
             list_message=["Mê chưaaa", "Eo thon liềnn"],  # Danh sách message
         ),
     }
-    return animations
\ No newline at end of file
+    return animations
+
+
+PET_ANIMATIONS: Dict[str, Callable[[str, Tuple[int, int]], Dict[AnimationStates, Animation]]] = {
+    "totoro": get_totoro_animations,
+}
+"""Functions defining the animations of each pet, by pet name"""
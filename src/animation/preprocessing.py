@@ -0,0 +1,143 @@
+"""Cleans up the alpha channel of a pet's sprites so they key out cleanly.
+
+Run from the project root to process every sprite of a pet in parallel:
+    python -m src.animation.preprocessing totoro [--workers N] [--output DIR]
+"""
+import argparse
+import os
+import pathlib
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple
+from PIL import Image, ImageChops, ImageColor
+from .animation import Animation
+
+SPRITE_EXTENSIONS = (".gif", ".png")
+
+
+def clean_alpha(image: Image.Image, bg_color: str = "#000") -> Image.Image:
+    """Force every pixel to be fully opaque or fully transparent, using whole band operations.
+
+    Transparent pixels get the background color, and opaque pixels that happen to be exactly the
+    background color are nudged off of it, so the window does not key them out as holes.
+
+    Args:
+        image (Image.Image): image to clean, converted to RGBA.
+        bg_color (str, optional): background color the window keys out. Defaults to "#000".
+
+    Returns:
+        Image.Image: cleaned RGBA image
+    """
+    image = image.convert("RGBA")
+    red, green, blue, alpha = image.split()
+    alpha = alpha.point(lambda value: 255 if value >= 128 else 0)
+
+    key = ImageColor.getrgb(bg_color)[:3]
+    is_key = alpha
+    for band, key_value in zip((red, green, blue), key):
+        is_key = ImageChops.multiply(is_key, band.point(lambda value, key_value=key_value: 255 if value == key_value else 0))
+
+    rgb = Image.merge("RGB", (red, green, blue))
+    rgb.paste(tuple(value + 1 if value < 255 else value - 1 for value in key), mask=is_key)
+    rgb.paste(key, mask=ImageChops.invert(alpha))
+    rgb.putalpha(alpha)
+    return rgb
+
+
+def preprocess_file(path: str, bg_color: str = "#000", output_path: str = None) -> Tuple[str, float]:
+    """Clean the alpha of every frame of a gif or png and save it
+
+    Args:
+        path (str): gif or png to process.
+        bg_color (str, optional): background color the window keys out. Defaults to "#000".
+        output_path (str, optional): where to save the result. Defaults to overwriting `path`.
+
+    Returns:
+        Tuple[str, float]: the path and how long processing it took in seconds
+    """
+    start = time.perf_counter()
+    if output_path is None:
+        output_path = path
+
+    if path.lower().endswith(".gif"):
+        images, durations = Animation.decode_gif(path)
+        with Image.open(path) as file:
+            loop = file.info.get("loop", 0)
+        images = [clean_alpha(image, bg_color) for image in images]
+        # Decoded frames are full canvases already, so every frame replaces the previous one
+        images[0].save(
+            output_path,
+            "GIF",
+            save_all=True,
+            append_images=images[1:],
+            duration=durations,
+            loop=loop,
+            disposal=2,
+            optimize=False,
+        )
+    else:
+        with Image.open(path) as file:
+            image = clean_alpha(file, bg_color)
+        image.save(output_path, path.split(".").pop())
+
+    return path, time.perf_counter() - start
+
+
+def get_sprite_paths(pet_name: str) -> List[str]:
+    """All gifs and pngs in the `src/sprites/{pet_name}` folder"""
+    folder = os.path.join(pathlib.Path().resolve(), "src", "sprites", pet_name)
+    return sorted(
+        os.path.join(folder, file_name)
+        for file_name in os.listdir(folder)
+        if file_name.lower().endswith(SPRITE_EXTENSIONS)
+    )
+
+
+def preprocess_pet(pet_name: str, bg_color: str = "#000", workers: int = None, output: str = None) -> Dict[str, float]:
+    """Clean the alpha of every sprite of a pet, in parallel worker processes
+
+    Args:
+        pet_name (str): name of the pet, ie the name of folder its animations are in
+        bg_color (str, optional): background color the window keys out. Defaults to "#000".
+        workers (int, optional): worker processes to use, 1 processes in this process. Defaults to one per core.
+        output (str, optional): folder to save the results in. Defaults to overwriting the sprites.
+
+    Returns:
+        Dict[str, float]: seconds spent per file
+    """
+    paths = get_sprite_paths(pet_name)
+    output_paths = [None if output is None else os.path.join(output, os.path.basename(path)) for path in paths]
+    if output is not None:
+        os.makedirs(output, exist_ok=True)
+
+    if workers == 1:
+        results = map(preprocess_file, paths, [bg_color] * len(paths), output_paths)
+        return dict(results)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return dict(executor.map(preprocess_file, paths, [bg_color] * len(paths), output_paths))
+
+
+def main():
+    from src.config_reader import load_config
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("pet_name")
+    parser.add_argument("--bg-color", help="color keyed out by the window, defaults to the pet's bg_color in config.xml")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes, defaults to one per core")
+    parser.add_argument("--output", default=None, help="folder to write to instead of overwriting the sprites")
+    args = parser.parse_args()
+
+    bg_color = args.bg_color
+    if bg_color is None:
+        bg_color = load_config().get_pet(args.pet_name).bg_color
+
+    start = time.perf_counter()
+    timings = preprocess_pet(args.pet_name, bg_color, workers=args.workers, output=args.output)
+    for path, seconds in timings.items():
+        print(f"{os.path.basename(path):<32}{seconds * 1000:>9.1f}ms")
+    print(f"{len(timings)} files in {(time.perf_counter() - start) * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,410 @@
+import hashlib
+import json
+import mmap
+import os
+import pathlib
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+from PIL import Image
+from src import logger
+from .animation_states import AnimationStates
+from .animation import Animation
+from .frame_cache import DecodedFrames
+
+
+class SpritePack:
+    """Every frame of a pet in one atlas file, plus a manifest describing its animations.
+
+    The atlas is a single column of raw RGBA frames at the pet's target resolution, so each
+    frame is one contiguous block of bytes, and it is memory mapped: loading a pet is one
+    mapping instead of a file open and decode per gif. The manifest holds the frame rects in
+    the atlas, the frame durations, velocities, messages and the state graph of every
+    animation. Packs are made with `python -m src.animation.compile {pet_name}`, or in the
+    background by `compile_in_background` on a start without one. The manifest also keeps a hash of the animations' definitions in
+    `PET_ANIMATIONS`, so changing a velocity, weight or message there makes the pack out of date
+    just like changing a gif does. The atlas ends in a random id the manifest also holds, so an
+    atlas is never read with the manifest of another compile, or when it was cut short.
+
+    The atlas is mapped read only and frames are read straight out of the mapping, so every
+    process showing the same pet shares the atlas' pages through the OS. Each process only
+    holds its own tkinter images privately.
+    """
+
+    VERSION = 4
+    """Bump whenever the layout of the atlas or manifest changes"""
+    PACK_EXTENSION = ".pack"
+    MANIFEST_EXTENSION = ".manifest.json"
+    LOCK_EXTENSION = ".lock"
+    BUILD_ID_BYTES = 16
+    """Length of the random id ending the atlas"""
+    STALE_LOCK_AGE = 300
+    """Seconds after which a lock is assumed to be left behind by a process that died compiling"""
+    folder: str = None
+    """Folder the packs are read from and written to, None for the sprites folder"""
+    compiling: Dict[str, threading.Thread] = {}
+    """Threads compiling packs in the background, by path of the atlas"""
+
+    path: str
+    """Path to the atlas file"""
+    manifest: Dict[str, any]
+    build: Tuple[int, int]
+    """Tells this atlas apart from others compiled to the same path, ie at another resolution"""
+
+    def __init__(self, path: str, manifest: Dict[str, any]):
+        """
+        Args:
+            path (str): Path to the atlas file.
+            manifest (Dict[str, any]): The parsed manifest belonging to the atlas.
+        """
+        self.path = path
+        self.manifest = manifest
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        # Packs are replaced as a whole (see `compile`), so the file of the one opened is its identity
+        stat = os.fstat(self._file.fileno())
+        self.build = (stat.st_ino, stat.st_mtime_ns)
+
+    @staticmethod
+    def get_sprites_folder() -> str:
+        """Folder holding a folder of gifs for every pet"""
+        return os.path.join(pathlib.Path().resolve(), "src", "sprites")
+
+    @staticmethod
+    def get_paths(pet_name: str) -> Tuple[str, str]:
+        """Where the atlas and manifest of a pet live, next to its sprites folder unless `folder` says otherwise"""
+        folder = SpritePack.folder if SpritePack.folder is not None else SpritePack.get_sprites_folder()
+        return (
+            os.path.join(folder, pet_name + SpritePack.PACK_EXTENSION),
+            os.path.join(folder, pet_name + SpritePack.MANIFEST_EXTENSION),
+        )
+
+    @staticmethod
+    def open(
+        pet_name: str, target_resolution: Tuple[int, int], options: Dict[str, any], definition: str = None
+    ) -> Optional["SpritePack"]:
+        """Open the pack of a pet if it exists and was compiled with the given settings from the
+        current sprites, otherwise returns None
+
+        Args:
+            pet_name (str): name of the pet, ie the name of folder its animations are in
+            target_resolution (Tuple[int, int]): target size of the animations
+            options (Dict[str, any]): preprocessing options the frames must have been made with
+            definition (str, optional): `get_definition` of the animations the code defines for the pet.
+                Defaults to not checking, for pets that only exist as a pack.
+        """
+        pack_path, manifest_path = SpritePack.get_paths(pet_name)
+        if not os.path.isfile(pack_path) or not os.path.isfile(manifest_path):
+            return None
+
+        try:
+            with open(manifest_path, encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring the sprite pack of {pet_name} as its manifest cannot be read: {str(e)}")
+            return None
+        if (
+            not isinstance(manifest, dict)
+            or manifest.get("version") != SpritePack.VERSION
+            or tuple(manifest["target_resolution"]) != tuple(target_resolution)
+            or manifest["options"] != options
+        ):
+            logger.info(f"Ignoring the sprite pack of {pet_name} as it was compiled with other settings")
+            return None
+        if definition is not None and manifest.get("definition") != definition:
+            logger.info(f"Ignoring the sprite pack of {pet_name} as its animations were defined differently")
+            return None
+
+        # Only stat the gifs, reading them would defeat the point of the pack. A bundled
+        # executable may ship just the pack, so missing gifs are fine.
+        sprites_folder = os.path.join(SpritePack.get_sprites_folder(), pet_name)
+        for file_name, stamp in manifest["sources"].items():
+            source = os.path.join(sprites_folder, file_name)
+            if os.path.isfile(source) and SpritePack.get_file_stamp(source) != stamp:
+                logger.info(f"Ignoring the sprite pack of {pet_name} as {file_name} changed since it was compiled")
+                return None
+
+        try:
+            pack = SpritePack(pack_path, manifest)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring the sprite pack of {pet_name} as its atlas cannot be opened: {str(e)}")
+            return None
+        if not pack.matches_manifest():
+            # ie another process replaced the atlas and not yet the manifest
+            logger.info(f"Ignoring the sprite pack of {pet_name} as its atlas does not belong to its manifest")
+            pack.close()
+            return None
+        return pack
+
+    @staticmethod
+    def compile_in_background(
+        pet_name: str,
+        target_resolution: Tuple[int, int],
+        options: Dict[str, any],
+        load_animations: Callable[[], Dict[AnimationStates, Animation]],
+    ) -> bool:
+        """Compile the pack of a pet on a background thread, for later starts and other processes
+        to map. Compiling decodes every gif up front, so the pet starting meanwhile loads its gifs
+        lazily, through the frame cache, as if there were no pack. Only one process compiles a pack
+        at a time, nothing happens while another one does.
+
+        The thread is not a daemon, so a pet exiting meanwhile finishes the pack before the process ends.
+
+        Args:
+            pet_name (str): name of the pet, ie the name of folder its animations are in
+            target_resolution (Tuple[int, int]): target size of the animations
+            options (Dict[str, any]): preprocessing options the frames are made with
+            load_animations (Callable[[], Dict[AnimationStates, Animation]]): loads the pet's animations from its gifs
+
+        Returns:
+            bool: whether compiling started
+        """
+        pack_path, _ = SpritePack.get_paths(pet_name)
+        running = SpritePack.compiling.get(pack_path)
+        if running is not None and running.is_alive():
+            return False
+        lock_path = pack_path + SpritePack.LOCK_EXTENSION
+        lock = None
+        while lock is None:
+            try:
+                lock = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                # Another process is compiling, unless it died doing so
+                try:
+                    if time.time() - os.path.getmtime(lock_path) <= SpritePack.STALE_LOCK_AGE:
+                        return False
+                except OSError:
+                    # It just let go of the lock
+                    return False
+                SpritePack.remove_file(lock_path)
+            except OSError as e:
+                logger.warning(f"Not compiling a sprite pack for {pet_name}, could not create {lock_path}: {str(e)}")
+                return False
+
+        def compile_pack():
+            try:
+                start = time.perf_counter()
+                SpritePack.compile(pet_name, load_animations(), target_resolution, options)
+                logger.info(f"Compiled the sprite pack of {pet_name} in {time.perf_counter() - start:.1f}s")
+            except Exception as e:
+                # ie the sprites folder is read only, or Windows refuses to replace a pack another process has open
+                logger.warning(f"Could not compile the sprite pack of {pet_name}: {str(e)}")
+            finally:
+                os.close(lock)
+                SpritePack.remove_file(lock_path)
+
+        thread = threading.Thread(target=compile_pack, name=f"sprite-pack-{pet_name}")
+        SpritePack.compiling[pack_path] = thread
+        thread.start()
+        return True
+
+    @staticmethod
+    def wait_for_compiles(timeout: float = None):
+        """Wait for the packs this process compiles in the background, ie before measuring them"""
+        for thread in list(SpritePack.compiling.values()):
+            thread.join(timeout)
+
+    @staticmethod
+    def get_file_stamp(path: str) -> List[int]:
+        """Size and modification time of a file, to notice sprites changing after compiling"""
+        stat = os.stat(path)
+        return [stat.st_size, stat.st_mtime_ns]
+
+    @staticmethod
+    def get_definition(animations: Dict[AnimationStates, Animation]) -> str:
+        """Hash of everything about a pet's animations that does not come from their gifs, ie
+        velocities, repititions, transitions and messages. Only needs the animations, not their frames.
+        """
+        definition = {
+            state.name: {
+                "source": os.path.basename(animation.gif_location) if animation.gif_location is not None else None,
+                "reverse": animation.reverse,
+                "v_x": animation.v_x,
+                "v_y": animation.v_y,
+                "a_x": animation.a_x,
+                "a_y": animation.a_y,
+                "repititions": list(animation.repitition_range),
+                "next_animation_states": {
+                    next_state.name: weight for next_state, weight in animation.transition_weights.items()
+                },
+                "list_message": animation.list_message,
+                "show_tooltip": animation.show_tooltip,
+            }
+            for state, animation in animations.items()
+        }
+        return hashlib.sha1(json.dumps(definition, sort_keys=True).encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def compile(
+        pet_name: str,
+        animations: Dict[AnimationStates, Animation],
+        target_resolution: Tuple[int, int],
+        options: Dict[str, any],
+    ) -> str:
+        """Decode every animation of a pet and write them into its atlas and manifest
+
+        Args:
+            pet_name (str): name of the pet, ie the name of folder its animations are in
+            animations (Dict[AnimationStates, Animation]): the pet's animations, loaded from gifs
+            target_resolution (Tuple[int, int]): target size of the animations
+            options (Dict[str, any]): preprocessing options the frames were made with
+
+        Returns:
+            str: path to the written atlas
+        """
+        pack_path, manifest_path = SpritePack.get_paths(pet_name)
+        rects: List[List[int]] = []
+        frame_indices: Dict[bytes, int] = {}
+        sources: Dict[str, List[int]] = {}
+        manifest_animations: Dict[str, Dict[str, any]] = {}
+
+        tmp_path = f"{pack_path}.{os.getpid()}.tmp"
+        offset = 0
+        build_id = os.urandom(SpritePack.BUILD_ID_BYTES)
+        try:
+            with open(tmp_path, "wb") as atlas:
+                for state, animation in animations.items():
+                    if animation.gif_location is None and animation.pack is None:
+                        raise Exception(f"{animation.name} has neither a gif nor a pack to read its frames from")
+                    # Not through the frame interner, the frames of a source shown meanwhile are taken by tkinter
+                    images, durations = animation.decode_frames()
+                    if animation.reverse:
+                        images, durations = list(reversed(images)), list(reversed(durations))
+
+                    indices = []
+                    for image in images:
+                        if image.size != tuple(target_resolution):
+                            raise Exception(f"Frame of {animation.name} is {image.size}, not the target resolution")
+                        data = image.convert("RGBA").tobytes()
+                        # Identical frames, within a gif or across gifs, are only stored once
+                        digest = hashlib.sha1(data).digest() + bytes(str(image.size), "ascii")
+                        if digest not in frame_indices:
+                            frame_indices[digest] = len(rects)
+                            rects.append([0, offset // (image.width * 4), image.width, image.height])
+                            atlas.write(data)
+                            offset += len(data)
+                        indices.append(frame_indices[digest])
+
+                    # Animations of a pack have no gif, ie when compiling a pet that only exists as a pack
+                    file_name = os.path.basename(animation.gif_location) if animation.gif_location is not None else None
+                    if file_name is not None:
+                        sources[file_name] = SpritePack.get_file_stamp(animation.gif_location)
+                    manifest_animations[state.name] = {
+                        "source": file_name,
+                        "frames": indices,
+                        "durations": durations,
+                        "v_x": animation.v_x,
+                        "v_y": animation.v_y,
+                        "a_x": animation.a_x,
+                        "a_y": animation.a_y,
+                        "repititions": list(animation.repitition_range),
+                        "next_animation_states": {
+                            next_state.name: weight for next_state, weight in animation.transition_weights.items()
+                        },
+                        "list_message": animation.list_message,
+                        "show_tooltip": animation.show_tooltip,
+                    }
+                atlas.write(build_id)
+            os.replace(tmp_path, pack_path)
+        finally:
+            # Only there when writing failed, ie a gif could not be decoded
+            SpritePack.remove_file(tmp_path)
+
+        manifest = {
+            "version": SpritePack.VERSION,
+            "pet": pet_name,
+            "target_resolution": list(target_resolution),
+            "options": options,
+            "definition": SpritePack.get_definition(animations),
+            "atlas": {"mode": "RGBA", "width": target_resolution[0], "bytes": offset, "build_id": build_id.hex()},
+            "frames": rects,
+            "sources": sources,
+            "animations": manifest_animations,
+        }
+        tmp_path = f"{manifest_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(manifest, f, ensure_ascii=False, indent=1)
+            os.replace(tmp_path, manifest_path)
+        finally:
+            SpritePack.remove_file(tmp_path)
+        return pack_path
+
+    @staticmethod
+    def remove_file(path: str):
+        """Remove a file if it is there, ie one left behind by a write that failed"""
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def matches_manifest(self) -> bool:
+        """Whether the atlas is whole and the one written along with the manifest"""
+        atlas = self.manifest["atlas"]
+        build_id = bytes.fromhex(atlas["build_id"])
+        return len(self._map) == atlas["bytes"] + len(build_id) and self._map[atlas["bytes"] :] == build_id
+
+    def get_animations(self) -> Dict[AnimationStates, Animation]:
+        """Animations described by the manifest, their frames are read from the atlas when needed"""
+        target_resolution = tuple(self.manifest["target_resolution"])
+        animations = {}
+        for state_name, spec in self.manifest["animations"].items():
+            animations[AnimationStates[state_name]] = Animation(
+                {AnimationStates[next_state]: weight for next_state, weight in spec["next_animation_states"].items()},
+                name=state_name,
+                v_x=spec["v_x"],
+                v_y=spec["v_y"],
+                a_x=spec["a_x"],
+                a_y=spec["a_y"],
+                repititions=tuple(spec["repititions"]),
+                target_resolution=target_resolution,
+                list_message=spec["list_message"],
+                show_tooltip=spec["show_tooltip"],
+                pack=self,
+            )
+        return animations
+
+    def get_source_id(self, animation_name: str) -> str:
+        """Identifies the frames of an animation, animations made from the same gif get the same id"""
+        source = self.manifest["animations"][animation_name]["source"]
+        # Without a gif the frames are the animation's own, state names never clash with gif names
+        source = source if source is not None else animation_name
+        return f"{self.path}@{self.build[0]}.{self.build[1]}#{source}"
+
+    def load_frames(self, animation_name: str) -> DecodedFrames:
+        """Read the frames of an animation out of the atlas. Safe to call from any thread.
+
+        The images are views of the mapped atlas rather than copies, and carry the pack and index
+        of their frame as `info["frame_key"]`, so identical frames are known without hashing them.
+        The key includes the build and resolution of the pack, as the pack of a pet is compiled
+        again to the same path when its resolution changes while its old frames are still shown.
+
+        Args:
+            animation_name (str): name of the AnimationStates the animation is for
+
+        Returns:
+            DecodedFrames: the RGBA frames and their durations (in ms)
+        """
+        spec = self.manifest["animations"][animation_name]
+        row_bytes = self.manifest["atlas"]["width"] * 4
+        atlas = memoryview(self._map)
+        pack_key = (self.path, self.build, tuple(self.manifest["target_resolution"]))
+        images = []
+        for index in spec["frames"]:
+            x, y, width, height = self.manifest["frames"][index]
+            start = y * row_bytes + x * 4
+            image = Image.frombuffer("RGBA", (width, height), atlas[start : start + width * height * 4], "raw", "RGBA", 0, 1)
+            image.info["frame_key"] = (pack_key, index)
+            images.append(image)
+        return images, list(spec["durations"])
+
+    def close(self):
+        try:
+            self._map.close()
+        except BufferError:
+            # Images read out of the atlas still point into it, the mapping goes once they do
+            pass
+        self._file.close()
+
+    def __repr__(self):
+        return f"<SpritePack: {len(self.manifest['frames'])} frames in {len(self.manifest['animations'])} animations at {self.path}>"
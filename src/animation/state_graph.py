@@ -0,0 +1,234 @@
+import random
+from collections.abc import Mapping
+from typing import Dict, List, Tuple
+from src import logger
+from .animation_states import AnimationStates
+
+
+class StateGraph:
+    """Which animation follows which, and how likely, with states numbered 0 to n - 1.
+
+    Each state's successors are kept in an alias table, so picking the next state is a single
+    random number and a lookup however many successors there are. An animation is played
+    `repititions` times, picked anew from its range on every visit, before moving on.
+
+    The graph only knows about the transitions animations make by themselves. The pet also
+    forces some, ie grabbing the pet or landing after a fall (see `FORCED_TRANSITIONS`), which
+    the analysis leaves out.
+    """
+
+    FORCED_TRANSITIONS = {AnimationStates.FALLING: AnimationStates.LANDED}
+    """States the pet switches to from other states regardless of the graph, ie on reaching the floor"""
+    MAX_ITERATIONS = 100000
+    TOLERANCE = 1e-12
+
+    states: List[AnimationStates]
+    """The state of each id"""
+    ids: Dict[AnimationStates, int]
+    successors: List[List[int]]
+    """Ids of the states each state can transition to"""
+    probabilities: List[List[float]]
+    """Chance of each of the successors"""
+    repitition_ranges: List[Tuple[int, int]]
+    initial: int
+
+    def __init__(
+        self,
+        states: List[AnimationStates],
+        transitions: List[Dict[int, float]],
+        repitition_ranges: List[Tuple[int, int]],
+        initial: int = 0,
+    ):
+        """Use `compile` to make a graph out of the animations of a pet
+
+        Args:
+            states (List[AnimationStates]): state of each id
+            transitions (List[Dict[int, float]]): weight of each successor of each state, by id
+            repitition_ranges (List[Tuple[int, int]]): inclusive range of the repititions of each state
+            initial (int, optional): id of the state pets start in. Defaults to 0.
+        """
+        self.states = states
+        self.ids = {state: state_id for state_id, state in enumerate(states)}
+        self.successors = []
+        self.probabilities = []
+        self._alias_probabilities: List[List[float]] = []
+        self._aliases: List[List[int]] = []
+        for weights in transitions:
+            total = sum(weights.values())
+            successors = sorted(weights, key=lambda successor: -weights[successor])
+            probabilities = [weights[successor] / total for successor in successors]
+            alias_probabilities, aliases = StateGraph.build_alias_table(probabilities)
+            self.successors.append(successors)
+            self.probabilities.append(probabilities)
+            self._alias_probabilities.append(alias_probabilities)
+            self._aliases.append(aliases)
+        self.repitition_ranges = repitition_ranges
+        self.initial = initial
+
+    @staticmethod
+    def compile(animations: Mapping, initial: AnimationStates = AnimationStates.IDLE) -> "StateGraph":
+        """Compile the transitions of a pet's animations, rejecting graphs the pet could get stuck in
+
+        Args:
+            animations (Mapping[AnimationStates, Animation]): every animation of the pet, not a LazyAnimations
+                as looking up its animations would load them, use `of` for those
+            initial (AnimationStates, optional): state pets start in. Defaults to AnimationStates.IDLE.
+
+        Raises:
+            Exception: if a state has no successors or transitions to a state without an animation,
+                a state forced by the pet has no animation, or a state can never be left
+        """
+        states = list(animations.keys())
+        ids = {state: state_id for state_id, state in enumerate(states)}
+        problems = []
+        if initial not in ids:
+            problems.append(f"there is no animation for the initial state {initial.name}")
+        for state, forced in StateGraph.FORCED_TRANSITIONS.items():
+            if state in ids and forced not in ids:
+                problems.append(f"{state.name} has to end in {forced.name}, which has no animation")
+
+        transitions = []
+        for state in states:
+            weights = {}
+            for next_state, weight in animations[state].transition_weights.items():
+                if next_state not in ids:
+                    problems.append(f"{state.name} transitions to {next_state.name}, which has no animation")
+                elif weight > 0:
+                    weights[ids[next_state]] = weights.get(ids[next_state], 0) + weight
+            if not weights:
+                problems.append(f"{state.name} has nothing to transition to")
+                weights = {ids[state]: 1}
+            transitions.append(weights)
+
+        graph = StateGraph(
+            states,
+            transitions,
+            [tuple(animations[state].repitition_range) for state in states],
+            ids.get(initial, 0),
+        )
+        if not problems:
+            for state_id, state in enumerate(states):
+                if graph.successors[state_id] == [state_id]:
+                    problems.append(f"{state.name} only transitions to itself, so it is never left")
+        if problems:
+            raise Exception("The animations of the pet can get stuck: " + "; ".join(problems))
+
+        # Pets can be put in any state by hand, so loops that never lead back are worth knowing about
+        reachable = [graph.get_reachable(state_id) for state_id in range(len(states))]
+        for state_id, state in enumerate(states):
+            if graph.initial not in reachable[state_id]:
+                logger.warning(f"Once in {state.name}, the pet never gets back to {states[graph.initial].name}")
+        return graph
+
+    @staticmethod
+    def of(animations: Mapping) -> "StateGraph":
+        """The graph compiled along with a mapping of animations, or a freshly compiled one"""
+        graph = getattr(animations, "graph", None)
+        return graph if graph is not None else StateGraph.compile(animations)
+
+    @staticmethod
+    def build_alias_table(probabilities: List[float]) -> Tuple[List[float], List[int]]:
+        """Vose's alias table: slot i is taken with its probability, else its alias is"""
+        count = len(probabilities)
+        scaled = [probability * count for probability in probabilities]
+        alias_probabilities = [1.0] * count
+        aliases = list(range(count))
+        small = [index for index, value in enumerate(scaled) if value < 1]
+        large = [index for index, value in enumerate(scaled) if value >= 1]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            alias_probabilities[less] = scaled[less]
+            aliases[less] = more
+            scaled[more] -= 1 - scaled[less]
+            (small if scaled[more] < 1 else large).append(more)
+        return alias_probabilities, aliases
+
+    def sample(self, state_id: int) -> int:
+        """Pick the id of the state following the given one"""
+        draw = random.random() * len(self._aliases[state_id])
+        slot = int(draw)
+        if draw - slot < self._alias_probabilities[state_id][slot]:
+            return self.successors[state_id][slot]
+        return self.successors[state_id][self._aliases[state_id][slot]]
+
+    def next_state(self, state: AnimationStates) -> AnimationStates:
+        """Pick the state following the given one"""
+        return self.states[self.sample(self.ids[state])]
+
+    def draw_repititions(self, state: AnimationStates) -> int:
+        """How many times to repeat a state on this visit"""
+        return random.randint(*self.repitition_ranges[self.ids[state]])
+
+    def get_successor_weights(self, state: AnimationStates) -> List[Tuple[AnimationStates, float]]:
+        """Probability of each state following the given state, most likely first"""
+        state_id = self.ids[state]
+        return [
+            (self.states[successor], probability)
+            for successor, probability in zip(self.successors[state_id], self.probabilities[state_id])
+        ]
+
+    def get_reachable(self, state_id: int) -> set:
+        """Ids of every state that can follow the given one, directly or not"""
+        reachable = set()
+        pending = [state_id]
+        while pending:
+            for successor in self.successors[pending.pop()]:
+                if successor not in reachable:
+                    reachable.add(successor)
+                    pending.append(successor)
+        return reachable
+
+    def get_expected_plays(self, state: AnimationStates) -> float:
+        """Times an animation plays on an average visit, the first play plus its repititions"""
+        low, high = self.repitition_ranges[self.ids[state]]
+        return 1 + (low + high) / 2
+
+    def get_stationary_distribution(self) -> Dict[AnimationStates, float]:
+        """Share of all visits that go to each state in the long run, starting from the initial state"""
+        distribution = [0.0] * len(self.states)
+        distribution[self.initial] = 1.0
+        for _ in range(StateGraph.MAX_ITERATIONS):
+            # Half a step at a time (staying put the other half) has the same stationary
+            # distribution, but also converges for graphs that cycle with a fixed period
+            following = [share / 2 for share in distribution]
+            for state_id, share in enumerate(distribution):
+                if share:
+                    for successor, probability in zip(self.successors[state_id], self.probabilities[state_id]):
+                        following[successor] += share * probability / 2
+            change = sum(abs(new - old) for new, old in zip(following, distribution))
+            distribution = following
+            if change < StateGraph.TOLERANCE:
+                break
+        return {state: distribution[state_id] for state_id, state in enumerate(self.states)}
+
+    def get_dwell_times(self, play_seconds: Dict[AnimationStates, float]) -> Dict[AnimationStates, float]:
+        """Seconds spent in each state on an average visit
+
+        Args:
+            play_seconds (Dict[AnimationStates, float]): seconds one play of each animation takes, see `get_play_seconds`
+        """
+        return {state: self.get_expected_plays(state) * play_seconds[state] for state in self.states}
+
+    def get_time_shares(self, play_seconds: Dict[AnimationStates, float]) -> Dict[AnimationStates, float]:
+        """Share of all time spent in each state in the long run"""
+        visits = self.get_stationary_distribution()
+        dwell_times = self.get_dwell_times(play_seconds)
+        total = sum(visits[state] * dwell_times[state] for state in self.states)
+        return {state: visits[state] * dwell_times[state] / total if total else 0 for state in self.states}
+
+    @staticmethod
+    def get_play_seconds(animations: Mapping) -> Dict[AnimationStates, float]:
+        """Seconds one play of each animation takes, decoding the animations if they are not yet"""
+        play_seconds = {}
+        for state in animations:
+            animation = animations[state]
+            if animation.frame_durations is None:
+                animation.prefetch()
+            play_seconds[state] = (
+                sum(animation.get_frame_duration(index) for index in range(len(animation.frame_durations))) / 1000
+            )
+        return play_seconds
+
+    def __repr__(self):
+        transitions = sum(len(successors) for successors in self.successors)
+        return f"<StateGraph: {len(self.states)} states, {transitions} transitions>"
@@ -1,94 +1,207 @@
-import tkinter as tk
-from xml.etree.ElementTree import XML
-from screeninfo import get_monitors
+import os
+import pathlib
+import xml.etree.ElementTree as ET
+from types import MappingProxyType
+from typing import Dict, NamedTuple, Optional, Tuple
 from xml.dom import minidom
-import distutils.util
 from src import logger
-import pathlib
-import os
-from typing import Tuple
 
+TRUE_VALUES = ("y", "yes", "t", "true", "on", "1")
+FALSE_VALUES = ("n", "no", "f", "false", "off", "0")
+
+
+def xml_bool(val: str) -> bool:
+    """Read a boolean the way the config.xml writes them, ie "true" or "false"
+
+    Raises:
+        Exception: if the value is not one of `TRUE_VALUES` or `FALSE_VALUES`
+    """
+    value = val.strip().lower()
+    if value in TRUE_VALUES:
+        return True
+    if value in FALSE_VALUES:
+        return False
+    raise Exception(f"'{val}' is not a boolean, use true or false")
+
+
+def get_config_path() -> str:
+    """Path of the config.xml of the project"""
+    return os.path.join(pathlib.Path().resolve(), "config.xml")
+
+
+class PetConfiguration(NamedTuple):
+    """Settings of one pet in the config.xml"""
 
-class PetConfiguration:
     offset: int
+    """Offset from the bottom of the screen in px"""
     bg_color: str
     target_resolution: Tuple[int, int]
+    preserve_aspect_ratio: bool = False
+
+    @staticmethod
+    def parse(element: ET.Element) -> "PetConfiguration":
+        resolution = element.find("resolution")
+        preserve_aspect_ratio = element.findtext("preserve_aspect_ratio")
+        return PetConfiguration(
+            int(element.findtext("offset")),
+            element.findtext("bg_color").strip(),
+            (int(resolution.findtext("x")), int(resolution.findtext("y"))),
+            xml_bool(preserve_aspect_ratio) if preserve_aspect_ratio is not None else False,
+        )
+
+
+class Config(NamedTuple):
+    """Everything in the config.xml, parsed once. Snapshots never change, a changed file is
+    parsed into a new one (see `load_config`), so comparing two tells what changed.
+    """
+
+    default_pet: str
+    force_topmost: bool
+    should_run_preprocessing: bool
+    frame_memory_mb: Optional[float]
+    """Memory budget for decoded animation frames in MB, None when not set or 0"""
+    decode_workers: Optional[int]
+    """Number of threads decoding animations, None (one per core) when not set or 0"""
+    pets: Dict[str, PetConfiguration]
+    """Settings of every pet, by name, read only"""
+    walk_on_windows: bool = False
+    """Whether pets can stand on the top edges of other windows"""
+
+    @staticmethod
+    def parse(root: ET.Element) -> "Config":
+        frame_memory_mb = root.findtext("frame_memory_mb")
+        decode_workers = root.findtext("decode_workers")
+        walk_on_windows = root.findtext("walk_on_windows")
+        pets = {pet.get("name"): PetConfiguration.parse(pet) for pet in root.iter("pet")}
+        return Config(
+            root.findtext("defualt_pet").strip(),
+            xml_bool(root.findtext("force_topmost")),
+            xml_bool(root.findtext("should_run_preprocessing")),
+            (float(frame_memory_mb) or None) if frame_memory_mb is not None else None,
+            (int(decode_workers) or None) if decode_workers is not None else None,
+            MappingProxyType(pets),
+            xml_bool(walk_on_windows) if walk_on_windows is not None else False,
+        )
+
+    @staticmethod
+    def read(path: str = None) -> "Config":
+        """Parse a config.xml, use `load_config` to only parse it again once it changed"""
+        return Config.parse(ET.parse(path if path is not None else get_config_path()).getroot())
+
+    def get_pet(self, pet: str) -> PetConfiguration:
+        if pet not in self.pets:
+            raise Exception(
+                "Could not find the current pet as one of \
+                the supported pets in the config.xml. 'current_pet' must \
+                match one of the 'pet' element's 'name' attribute"
+            )
+        return self.pets[pet]
 
-    def __init__(self, offset, bg_color, target_resolution):
-        self.offset = offset
-        self.bg_color = bg_color
-        self.target_resolution = target_resolution
+
+_loaded: Dict[str, Tuple[Tuple[int, int], Config]] = {}
+"""Last snapshot of each config file, with the modification time and size it was parsed at"""
+
+
+def load_config(path: str = None) -> Config:
+    """The config.xml as a Config, only parsed again once the file changed
+
+    Args:
+        path (str, optional): Path to the config file. Defaults to the config.xml of the project.
+    """
+    path = os.path.abspath(path if path is not None else get_config_path())
+    stat = os.stat(path)
+    version = (stat.st_mtime_ns, stat.st_size)
+    loaded = _loaded.get(path)
+    if loaded is not None and loaded[0] == version:
+        return loaded[1]
+    config = Config.read(path)
+    _loaded[path] = (version, config)
+    logger.debug(f"Parsed {path}")
+    return config
 
 
 class XMLReader:
+    """Edits the config.xml, keeping its comments. Reading is done from a `Config` snapshot,
+    the getters are kept for scripts that still use them.
+    """
+
     path: str
     """
     Path to the xml data store
     """
-    dom: minidom
 
     def __init__(self, path=None, dom=None):
-        if dom is None:
-            if path is None:
-                path = os.path.join(pathlib.Path().resolve(), "config.xml")
-            self.path = path
-            self.dom = minidom.parse(path)
-        else:
-            self.path = path
-            self.dom = dom
+        if dom is None and path is None:
+            path = get_config_path()
+        self.path = path
+        self._dom = dom
+        self._config = None
+
+    @property
+    def dom(self) -> minidom.Document:
+        """The document being edited, only parsed once it is needed"""
+        if self._dom is None:
+            self._dom = minidom.parse(self.path)
+        return self._dom
+
+    @property
+    def config(self) -> Config:
+        """Snapshot of the document, as it is on disk unless it was given or edited"""
+        if self._config is None:
+            if self._dom is None:
+                self._config = load_config(self.path)
+            else:
+                self._config = Config.parse(ET.fromstring(self._dom.toxml()))
+        return self._config
 
     def getDefaultPet(self):
-        return self.getFirstTagValue("defualt_pet")
+        return self.config.default_pet
 
     def getForceTopMostWindow(self):
-        return self.getFirstTagValueAsBool("force_topmost")
+        return self.config.force_topmost
 
     def getShouldRunAnimationPreprocessing(self):
-        return self.getFirstTagValueAsBool("should_run_preprocessing")
-
-    def getMatchingPetConfigurationAsDom(self, pet: str) -> minidom:
-        pets = self.dom.getElementsByTagName("pet")
-        pet_config = None
-        for i in range(len(pets)):
-            if pets[i].getAttribute("name") == pet:
-                pet_config = pets[i]
-        if pet_config is None:
-            raise Exception(
-                "Could not find the current pet as one of \
-                the supported pets in the config.xml. 'current_pet' must \
-                match one of the 'pet' element's 'name' attribute"
-            )
-        return pet_config
+        return self.config.should_run_preprocessing
 
-    def getMatchingPetConfigurationClean(self, pet: str) -> PetConfiguration:
-        pet_config = self.getMatchingPetConfigurationAsDom(pet)
-        pet_reader = XMLReader(dom=pet_config)
-        offset = int(pet_reader.getFirstTagValue("offset"))
-        bg_color = pet_reader.getFirstTagValue("bg_color")
-        resolution = XMLReader(dom=pet_config.getElementsByTagName("resolution")[0])
-        target_resolution = (
-            int(resolution.getFirstTagValue("x")),
-            int(resolution.getFirstTagValue("y")),
-        )
+    def getFrameMemoryMb(self) -> float:
+        """Memory budget for decoded animation frames in MB, None when not set or 0"""
+        return self.config.frame_memory_mb
+
+    def getDecodeWorkers(self) -> int:
+        """Number of threads decoding animations, None (one per core) when not set or 0"""
+        return self.config.decode_workers
 
-        return PetConfiguration(offset, bg_color, target_resolution)
+    def getMatchingPetConfigurationAsDom(self, pet: str) -> minidom.Element:
+        for pet_config in self.dom.getElementsByTagName("pet"):
+            if pet_config.getAttribute("name") == pet:
+                return pet_config
+        # Raises the same error as a snapshot would
+        self.config.get_pet(pet)
+
+    def getMatchingPetConfigurationClean(self, pet: str) -> PetConfiguration:
+        return self.config.get_pet(pet)
 
     def getFirstTagValueAsBool(self, tag_name: str) -> bool:
-        return XMLReader.xml_bool(self.getFirstTagValue(tag_name))
+        return xml_bool(self.getFirstTagValue(tag_name))
 
     def getFirstTagValue(self, tag_name: str) -> str:
         return self.dom.getElementsByTagName(tag_name)[0].firstChild.nodeValue
 
     def setFirstTagValue(self, tag_name: str, val: any):
         self.dom.getElementsByTagName(tag_name)[0].firstChild.replaceWholeText(val)
+        self._config = None
 
     def save(self, path: str = None):
+        """Write the document to `path`, the file it was read from by default. The file is
+        replaced at once, so a pet watching it never reads half of it
+        """
         if path is None:
             path = self.path
-
-        with open(self.path, "w") as f:
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
             f.write(self.dom.toxml())
+        os.replace(tmp_path, path)
 
     @staticmethod
     def xml_bool(val: str) -> bool:
-        return bool(distutils.util.strtobool(val))
+        return xml_bool(val)
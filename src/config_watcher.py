@@ -0,0 +1,67 @@
+import os
+from typing import Callable, List
+from src import logger
+from .config_reader import Config, get_config_path, load_config
+from .window_utils import TimerService
+
+
+class ConfigWatcher:
+    """Follows changes to the config.xml, telling listeners about every new snapshot of it.
+
+    The file's modification time is checked on the pet's timers, which is a single `stat()` as
+    long as it does not change, and the check may share a wakeup with the pet's other jobs. While
+    every pet is hidden the checks pause, and the file is checked as soon as one shows again. A
+    file that does not parse, ie as it is being edited, is ignored until it does.
+    """
+
+    JOB_NAME = "config_watcher"
+    INTERVAL = 2
+    """Seconds between checks of the file"""
+    SLACK = 1
+
+    path: str
+    timers: TimerService
+    config: Config
+    """Last snapshot handed to the listeners"""
+
+    def __init__(self, timers: TimerService, path: str = None, config: Config = None):
+        """
+        Args:
+            timers (TimerService): Runs the checks.
+            path (str, optional): Path to the config file. Defaults to the config.xml of the project.
+            config (Config, optional): Snapshot the listeners already know about. Defaults to the file as it is now.
+        """
+        self.timers = timers
+        self.path = os.path.abspath(path if path is not None else get_config_path())
+        self.config = config if config is not None else load_config(self.path)
+        self._listeners: List[Callable[[Config, Config], None]] = []
+        self._error = None
+
+    def add_listener(self, listener: Callable[[Config, Config], None]):
+        """Call `listener(old, new)` whenever the file changes"""
+        self._listeners.append(listener)
+
+    def start(self):
+        self.timers.add(
+            ConfigWatcher.JOB_NAME, self.check, ConfigWatcher.INTERVAL, slack=ConfigWatcher.SLACK, only_while_awake=True
+        )
+
+    def stop(self):
+        self.timers.cancel(ConfigWatcher.JOB_NAME)
+
+    def check(self):
+        """Parse the file if it changed, and tell the listeners if that changed any setting"""
+        try:
+            config = load_config(self.path)
+        except Exception as e:
+            if str(e) != self._error:
+                logger.warning(f"Ignoring changes to {self.path} until it is valid again: {str(e)}")
+            self._error = str(e)
+            return
+        self._error = None
+        if config == self.config:
+            return
+        old, self.config = self.config, config
+        logger.info(f"Applying changes to {self.path}")
+        for listener in self._listeners:
+            listener(old, config)
@@ -0,0 +1,191 @@
+"""Low overhead timing and counting of the pet's hot path.
+
+Off by default, set the DESKTOP_PET_INSTRUMENTATION environment variable to 1 to record from
+the start, or toggle it from the tray menu. While off, every call returns right away. Snapshots
+of what was recorded are written as JSON by `instruments.dump()`, also from the tray menu.
+"""
+import json
+import os
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Callable, Dict, List
+
+ENVIRONMENT_VARIABLE = "DESKTOP_PET_INSTRUMENTATION"
+
+
+class Histogram:
+    """Distribution of values in power of two buckets, cheap to record into and fixed in size"""
+
+    BUCKETS = 32
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+        self.buckets: List[int] = [0] * Histogram.BUCKETS
+
+    def add(self, value: float):
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+        # Bucket i holds values from 2**(i - 1) up to 2**i, bucket 0 everything below 1
+        self.buckets[min(int(value).bit_length(), Histogram.BUCKETS - 1)] += 1
+
+    def percentile(self, fraction: float) -> float:
+        """Upper bound of the bucket the given fraction of the values falls in"""
+        if self.count == 0:
+            return 0
+        target = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if seen >= target:
+                return min(2 ** index, self.max)
+        return self.max
+
+    def to_dict(self) -> Dict[str, any]:
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0,
+            "min": self.min,
+            "p50": self.percentile(0.5),
+            "p95": self.percentile(0.95),
+            "p99": self.percentile(0.99),
+            "max": self.max,
+            "buckets": {f"<{2 ** index}": count for index, count in enumerate(self.buckets) if count},
+        }
+
+    def __repr__(self):
+        return f"<Histogram: {self.count} values, p50 {self.percentile(0.5)} max {self.max}>"
+
+
+class Instrumentation:
+    """Timing histograms (in microseconds) per phase, counters and state transitions.
+
+    Time a phase with:
+        started = instruments.start()
+        ...
+        instruments.record("render", started)
+    """
+
+    enabled: bool
+    timings: Dict[str, Histogram]
+    """Microseconds spent per phase"""
+    values: Dict[str, Histogram]
+    """Any other distributions, ie tkinter calls per tick"""
+    counters: Counter
+    transitions: Counter
+    """Counts of "FROM->TO" animation state changes"""
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._sources: Dict[str, Callable[[], Dict[str, any]]] = {}
+        self.reset()
+
+    def reset(self):
+        """Forget everything recorded so far"""
+        self.timings = {}
+        self.values = {}
+        self.counters = Counter()
+        self.transitions = Counter()
+        self._since = time.time()
+
+    def set_enabled(self, enabled: bool):
+        if enabled and not self.enabled:
+            self.reset()
+        self.enabled = enabled
+
+    def start(self) -> float:
+        """Start timing a phase, pass the result to `record` once done"""
+        return time.perf_counter() if self.enabled else 0
+
+    def record(self, phase: str, started: float):
+        """Record the time since `started` for a phase"""
+        if not self.enabled or not started:
+            return
+        histogram = self.timings.get(phase)
+        if histogram is None:
+            histogram = self.timings[phase] = Histogram()
+        histogram.add((time.perf_counter() - started) * 1000000)
+
+    def observe(self, name: str, value: float):
+        """Record a value into a histogram"""
+        if not self.enabled:
+            return
+        histogram = self.values.get(name)
+        if histogram is None:
+            histogram = self.values[name] = Histogram()
+        histogram.add(value)
+
+    def count(self, name: str, amount: int = 1):
+        if self.enabled:
+            self.counters[name] += amount
+
+    def transition(self, from_state, to_state):
+        if self.enabled:
+            self.transitions[f"{from_state.name}->{to_state.name}"] += 1
+
+    def add_source(self, name: str, source: Callable[[], Dict[str, any]]) -> str:
+        """Include the result of `source` in every snapshot, ie the stats of a component, until
+        removed with `remove_source`. Components that come and go must remove their sources, or
+        the sources keep them alive.
+
+        Returns:
+            str: the name the source is listed under, `name` with a number added if it was taken
+        """
+        unique_name = name
+        number = 1
+        while unique_name in self._sources:
+            number += 1
+            unique_name = f"{name}#{number}"
+        self._sources[unique_name] = source
+        return unique_name
+
+    def remove_source(self, name: str):
+        """Stop including a source in snapshots, by the name `add_source` returned"""
+        self._sources.pop(name, None)
+
+    def snapshot(self) -> Dict[str, any]:
+        """Everything recorded so far, plus the output of every source"""
+        snapshot = {
+            "enabled": self.enabled,
+            "since": datetime.fromtimestamp(self._since).isoformat(timespec="seconds"),
+            "seconds": time.time() - self._since,
+            "timings_us": {phase: histogram.to_dict() for phase, histogram in self.timings.items()},
+            "values": {name: histogram.to_dict() for name, histogram in self.values.items()},
+            "counters": dict(self.counters),
+            "transitions": dict(self.transitions.most_common()),
+        }
+        for name, source in self._sources.items():
+            try:
+                snapshot[name] = source()
+            except Exception as e:
+                snapshot[name] = {"error": str(e)}
+        return snapshot
+
+    def dump(self, path: str = None) -> str:
+        """Write a snapshot as JSON
+
+        Args:
+            path (str, optional): File to write to. Defaults to a timestamped file in the working directory.
+
+        Returns:
+            str: the path written to
+        """
+        if path is None:
+            path = os.path.abspath(f"instrumentation-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, indent=1, default=str)
+        return path
+
+    def __repr__(self):
+        return f"<Instrumentation: {'on' if self.enabled else 'off'}, {len(self.timings)} phases>"
+
+
+instruments = Instrumentation(enabled=os.environ.get(ENVIRONMENT_VARIABLE, "").lower() in ("1", "true", "yes", "on"))
+"""The instrumentation of the running pet"""
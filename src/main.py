@@ -1,10 +1,15 @@
 import tkinter as tk
-from .animation import AnimationStates, Animator, get_animations
-from src.pets import Pet
-from screeninfo import get_monitors
+from typing import List
+from .animation import AnimationStates, Animator, FrameCache, FrameInterner, FrameStore, get_animations
+from src.pets import LiveConfig, Pet, PetGroup
 from src import logger
-from .window_utils import configure_window, show_window
-from .config_reader import XMLReader
+from .window_utils import MonitorTopology, TimerService, WindowEdgeIndex, configure_window, show_window
+from .window_utils.window_list import get_window_list_backend
+from .config_reader import PetConfiguration, XMLReader, load_config
+from .config_watcher import ConfigWatcher
+from .instrumentation import instruments
+from .process_memory import get_process_memory, report_process_memory
+from .animation.preprocessing import preprocess_pet
 
 
 def start_program(current_pet: str = None):
@@ -18,34 +23,54 @@ def start_program(current_pet: str = None):
     """
     # logger.debug("Loading general configuration from XML")
     ### General Configuration
-    config = XMLReader()
+    config = load_config()
     current_pet = current_pet
-    topmost = config.getForceTopMostWindow()
-    should_run_preprocessing = config.getShouldRunAnimationPreprocessing()
+    should_run_preprocessing = config.should_run_preprocessing
 
     ### Animation Specific Configuration
     # Find the desired pet
     # logger.debug('Finding "current_pet" configurations from the XML')
-    pet_config = config.getMatchingPetConfigurationClean(current_pet)
+    pet_config = config.get_pet(current_pet)
 
     ### Window Configuration
     # logger.debug("Creating tkinter window/config")
-    # Get info on the primary monitor (that is where the pet will be)
-    monitor = get_monitors()[0]
+    window = tk.Tk()
+    # The pet starts out on the primary monitor, and can walk across the others
+    monitors = MonitorTopology.from_window(window)
+    primary = monitors.get_primary()
     resolution = {
-        "width": int(monitor.width),
-        "height": int(monitor.height - pet_config.offset),
+        "width": primary.width,
+        "height": primary.height - pet_config.offset,
     }
-    window = tk.Tk()
     canvas = configure_window(
-        window, topmost=topmost, bg_color=pet_config.bg_color, resolution=resolution
+        window, topmost=config.force_topmost, bg_color=pet_config.bg_color, resolution=resolution
     )
 
+    # Clean up the sprites before loading them, in this process as the pet is not started
+    # from behind a __main__ guard that worker processes would need
+    if should_run_preprocessing:
+        preprocess_pet(current_pet, pet_config.bg_color, workers=1)
+
     ## Load the animations.
     # logger.debug("Starting to load animations")
-    animations = get_animations(
-        current_pet, pet_config.target_resolution, should_run_preprocessing
-    )
+    frame_cache = FrameCache()
+    frame_store = FrameStore.from_megabytes(config.frame_memory_mb)
+    frame_interner = FrameInterner()
+
+    def load(pet_name: str, pet_config: PetConfiguration, should_run_preprocessing: bool = False):
+        return get_animations(
+            pet_name,
+            pet_config.target_resolution,
+            should_run_preprocessing,
+            frame_cache=frame_cache,
+            frame_store=frame_store,
+            frame_interner=frame_interner,
+            preserve_aspect_ratio=pet_config.preserve_aspect_ratio,
+            decode_workers=config.decode_workers,
+            compile_sprite_pack=True,
+        )
+
+    animations = load(current_pet, pet_config, should_run_preprocessing)
 
     animator = Animator(
         state=AnimationStates.IDLE, frame_number=0, animations=animations
@@ -54,23 +79,159 @@ def start_program(current_pet: str = None):
     # We esentially only need to run preprocessing once as it is really expensive to do
     # so make it false for the next time the program runs
     if should_run_preprocessing:
-        config.setFirstTagValue("should_run_preprocessing", "false")
-        config.save()
+        config_writer = XMLReader()
+        config_writer.setFirstTagValue("should_run_preprocessing", "false")
+        config_writer.save()
 
     ## Initialize pet
     # Create the desktop pet
     # logger.debug("Create pet")
-    x = int(canvas.resolution["width"] / 2)
-    y = int(canvas.resolution["height"])
-    pet = Pet(x, y, canvas=canvas, animator=animator)
+    x = primary.x + int(canvas.resolution["width"] / 2)
+    y = primary.y + int(canvas.resolution["height"])
+    timers = TimerService(window)
+    window_list = get_window_list_backend(window) if config.walk_on_windows else None
+    window_edges = WindowEdgeIndex(window_list) if window_list is not None else None
+    pet = Pet(
+        x,
+        y,
+        canvas=canvas,
+        animator=animator,
+        timers=timers,
+        topmost=config.force_topmost,
+        monitors=monitors,
+        offset=pet_config.offset,
+        window_edges=window_edges,
+    )
     # bind key events to the pet and start the app
     canvas.label.bind("<ButtonPress-1>", pet.start_move)
     canvas.label.bind("<ButtonRelease-1>", pet.stop_move)
     canvas.label.bind("<B1-Motion>", pet.do_move)
     # logger.info(pet.__repr__())
 
+    # Apply changes to the config.xml while the pet runs
+    live_config = LiveConfig(timers, load, frame_store=frame_store)
+    live_config.add_pet(current_pet, pet, animations)
+    config_watcher = ConfigWatcher(timers, config=config)
+    config_watcher.add_listener(live_config.on_config_changed)
+
     # Begin the main loop
-    window.after(1, pet.on_tick)
+    instruments.add_source("memory", get_process_memory)
+    pet.scheduler.start()
+    monitors.start(timers)
+    if window_list is not None:
+        window_list.start()
+    config_watcher.start()
     show_window(window)
     window.mainloop()
+    pet.active_window.stop()
+    if window_list is not None:
+        window_list.stop()
+    monitors.stop()
+    config_watcher.stop()
+    live_config.close()
+    logger.info(pet.scheduler.report())
+    logger.info(pet.power.report())
+    logger.info(timers.report())
+    render_stats = pet.get_render_stats()
+    logger.info(f"Render calls: {render_stats['issued']} sent to tkinter, {render_stats['skipped']} skipped")
+    logger.info(frame_cache.report())
+    logger.info(frame_store.report())
+    logger.info(frame_interner.report())
+    logger.info(report_process_memory())
+    if instruments.enabled:
+        logger.info(f"Instrumentation snapshot written to {instruments.dump()}")
     return pet
+
+
+def start_pets(pet_names: List[str]):
+    """Creates a pet for every name, all in one tkinter interpreter, and then shows them.
+    Pets of the same kind share their frames, and all pets share their timers, see PetGroup
+
+    Args:
+        pet_names (List[str]): names of the pets to show, a name can be repeated for several of the same pet
+
+    Returns:
+        PetGroup
+    """
+    if not pet_names:
+        # A group without pets would run an invisible event loop nobody can quit
+        raise Exception("No pets to show, give at least one pet name")
+    config = load_config()
+
+    # The root window only runs the event loop, every pet gets a Toplevel of it
+    root = tk.Tk()
+    root.withdraw()
+    window_list = get_window_list_backend(root) if config.walk_on_windows else None
+    group = PetGroup(
+        root,
+        monitors=MonitorTopology.from_window(root),
+        window_edges=WindowEdgeIndex(window_list) if window_list is not None else None,
+    )
+    primary = group.monitors.get_primary()
+    frame_cache = FrameCache()
+    frame_store = FrameStore.from_megabytes(config.frame_memory_mb)
+    frame_interner = FrameInterner()
+
+    def load(pet_name: str, pet_config: PetConfiguration):
+        return get_animations(
+            pet_name,
+            pet_config.target_resolution,
+            False,
+            frame_cache=frame_cache,
+            frame_store=frame_store,
+            frame_interner=frame_interner,
+            preserve_aspect_ratio=pet_config.preserve_aspect_ratio,
+            decode_workers=config.decode_workers,
+            compile_sprite_pack=True,
+        )
+
+    live_config = LiveConfig(group.timers, load, frame_store=frame_store, on_animations_swapped=group.replace_animations)
+    for index, pet_name in enumerate(pet_names):
+        pet_config = config.get_pet(pet_name)
+        resolution = {"width": primary.width, "height": primary.height - pet_config.offset}
+        canvas = configure_window(
+            tk.Toplevel(root), topmost=config.force_topmost, bg_color=pet_config.bg_color, resolution=resolution
+        )
+        animations = group.get_animations(
+            pet_name, pet_config.target_resolution, lambda: load(pet_name, pet_config)
+        )
+        animator = Animator(state=AnimationStates.IDLE, frame_number=0, animations=animations)
+        # Spread the pets out over the bottom of the primary monitor
+        x = primary.x + int(resolution["width"] * (index + 1) / (len(pet_names) + 1))
+        pet = group.add_pet(
+            x, primary.y + resolution["height"], canvas, animator, topmost=config.force_topmost, offset=pet_config.offset
+        )
+        live_config.add_pet(pet_name, pet, animations.shared)
+        canvas.label.bind("<ButtonPress-1>", pet.start_move)
+        canvas.label.bind("<ButtonRelease-1>", pet.stop_move)
+        canvas.label.bind("<B1-Motion>", pet.do_move)
+        show_window(canvas.window)
+
+    config_watcher = ConfigWatcher(group.timers, config=config)
+    config_watcher.add_listener(live_config.on_config_changed)
+
+    instruments.add_source("memory", get_process_memory)
+    group.start()
+    group.monitors.start(group.timers)
+    if window_list is not None:
+        window_list.start()
+    config_watcher.start()
+    # Returns once the window of the last pet is destroyed, see PetGroup.on_window_destroyed
+    root.mainloop()
+    group.monitors.stop()
+    if window_list is not None:
+        window_list.stop()
+    config_watcher.stop()
+    live_config.close()
+    logger.info(group.report())
+    logger.info(group.timers.report())
+    logger.info(frame_cache.report())
+    logger.info(frame_store.report())
+    logger.info(frame_interner.report())
+    logger.info(report_process_memory())
+    if instruments.enabled:
+        logger.info(f"Instrumentation snapshot written to {instruments.dump()}")
+    # Last, the snapshot above still lists every pet
+    group.close()
+    root.destroy()
+    return group
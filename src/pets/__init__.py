@@ -1 +1,3 @@
 from .interactable_pet import InteractablePet as Pet
+from .pet_group import PetGroup
+from .live_config import LiveConfig
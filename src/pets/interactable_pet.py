@@ -1,9 +1,14 @@
 import tkinter as tk
+from typing import Dict
 from ..animation import AnimationStates
+from ..instrumentation import instruments
+from ..window_utils import MonitorTopology, TickScheduler, TimerService, Tween, WindowEdgeIndex
+from ..window_utils.active_window import ActiveWindow, ActiveWindowBackend, get_active_window_backend
+from .power import PowerModes, PowerMonitor
 from .simple_pet import SimplePet
+from .tooltip_bubbles import TooltipBubble, TooltipBubbles
 from src import logger
 import random
-import win32gui
 
 
 class InteractablePet(SimplePet):
@@ -13,138 +18,274 @@ class InteractablePet(SimplePet):
     a_y: float = 0
     tooltip: tk.Toplevel = None
     tooltip_label: tk.Label = None
-    tooltip_after_id = None
+    tooltip_bubbles: TooltipBubbles = None
+    """Measured bubbles of the messages the tooltip shows"""
+    TOOLTIP_FONT = ("Arial", 8)
+    timers: TimerService = None
+    """Runs the periodic jobs of the pet, keeping it on top and changing the tooltip"""
+    scheduler: TickScheduler = None
+    """Ticks the pet, start it to bring the pet to life"""
+    power: PowerMonitor = None
+    active_window: ActiveWindowBackend = None
+    """Tells the pet when the focus moves to another window"""
     is_desktop_active = True  # Track if desktop is active
+    fade: Tween = None
+    """Alpha of the window while fading out or in when wrapping around the screen"""
+    wrap_to_x: int = None
+    """Where the pet reappears once it has faded out at an edge of the screen"""
+    name: str = None
+    """Tells the pet apart from other pets sharing its timers, None when it has them to itself"""
+    topmost: bool = True
+    """Whether the pet keeps its window above other windows"""
+    monitors: MonitorTopology = None
+    """The monitors the pet walks across"""
+    offset: int = 0
+    """Pixels between the bottom of a monitor and the floor the pet walks on"""
+    floor: int = None
+    """Where the top of the pet was when it last stood on the floor of the monitor it is on"""
+    window_edges: WindowEdgeIndex = None
+    """Top edges of other windows the pet can stand on, None when it only walks on the floor"""
+    standing_on: int = None
+    """Handle of the window the pet stands on, None when it is not on one"""
+    fall_speed: float = 0
+    """Pixels per frame the pet falls at, while nothing holds it up"""
+    is_dragged = False
+    """Whether the user holds the pet, it neither falls nor sticks to windows meanwhile"""
+    is_closed = False
+    """Whether the pet was closed, see `close`"""
+    GRAVITY = 1
+    """Pixels per frame the fall speed grows by, only when walking on windows"""
+    MAX_FALL_SPEED = 24
+    FADE_DURATION = 0.5
+    """Seconds a fade out or in takes"""
+    FADE_INTERVAL = 0.05
+    """Seconds between alpha updates while fading"""
+    KEEP_ON_TOP_INTERVAL = 0.1
+    """Seconds between raising the window right after another window may have covered it"""
+    KEEP_ON_TOP_MAX_INTERVAL = 3.2
+    """Seconds between raising the window once nothing has covered it for a while"""
+    MIN_TICK_INTERVALS = {
+        PowerModes.ACTIVE: 0,
+        PowerModes.BACKGROUND: 0.1,
+        PowerModes.SLEEPING: 1,
+        PowerModes.SUSPENDED: 1,
+    }
+    """Least seconds between ticks in each power mode, frames due in between are dropped"""
 
-    def __init__(self, x, y, canvas, animator):
+    def __init__(
+        self,
+        x,
+        y,
+        canvas,
+        animator,
+        timers: TimerService = None,
+        active_window: ActiveWindowBackend = None,
+        name: str = None,
+        tick_slack: float = 0,
+        topmost: bool = True,
+        monitors: MonitorTopology = None,
+        offset: int = 0,
+        window_edges: WindowEdgeIndex = None,
+        tooltip_bubbles: TooltipBubbles = None,
+    ):
         super().__init__(x, y, canvas, animator)
+        self.name = name
+        self.topmost = topmost
+        self.monitors = monitors if monitors is not None else MonitorTopology.from_resolution(canvas.resolution)
+        self.offset = offset
+        self.window_edges = window_edges
+        self.tooltip_bubbles = tooltip_bubbles if tooltip_bubbles is not None else TooltipBubbles()
+        self.timers = timers if timers is not None else TimerService(canvas.window)
+        self.timers.set_awake(self.get_job_name("pet"), True)
+        self.scheduler = TickScheduler(self.timers, self.on_tick, name=self.get_job_name("tick"), slack=tick_slack)
+        self.power = PowerMonitor(lambda: self.timers.wakeups, clock=self.timers.clock)
+        self.app_title = self.canvas.window.title()
         self.setup_tooltip()
         self.update_tooltip_content()
-        self.canvas.window.wm_attributes("-topmost", True)
+        self.canvas.window.wm_attributes("-topmost", topmost)
         self.canvas.window.bind("<FocusOut>", self.on_focus_out)
-        self.keep_on_top()
-        
-        # Start checking for window focus
-        self.check_desktop_active()
-        self.app_title = self.canvas.window.title()
+        self.canvas.window.bind("<Visibility>", self.on_visibility_changed)
+        self.canvas.window.bind("<Map>", self.on_map_changed)
+        self.canvas.window.bind("<Unmap>", self.on_map_changed)
+        self.keep_on_top_interval = InteractablePet.KEEP_ON_TOP_INTERVAL
+        self.timers.add(self.get_job_name("keep_on_top"), self.keep_on_top, self.keep_on_top_interval, slack=0.05)
+        if not topmost:
+            self.timers.pause(self.get_job_name("keep_on_top"))
+
+        # Follow window focus, the backend calls back whenever it moves
+        self.active_window = active_window if active_window is not None else get_active_window_backend(canvas.window)
+        self.active_window.add_listener(self.on_active_window_changed)
+        self.active_window.start()
+        self.on_active_window_changed(self.active_window.get_active_window())
+
+        self._sources = [
+            instruments.add_source(self.get_job_name("scheduler"), self.get_scheduler_stats),
+            instruments.add_source(self.get_job_name("power"), self.get_power_stats),
+            instruments.add_source(self.get_job_name("render"), self.get_render_stats),
+        ]
+
+    def close(self):
+        """Stop the pet's jobs and listeners, so nothing keeps the pet alive once it is dropped.
+        Makes no tkinter calls, as the window may already be destroyed
+        """
+        if self.is_closed:
+            return
+        self.is_closed = True
+        self.scheduler.stop()
+        self.fade = None
+        self.wrap_to_x = None
+        for job in ("keep_on_top", "tooltip"):
+            self.timers.cancel(self.get_job_name(job))
+        self.active_window.remove_listener(self.on_active_window_changed)
+        self.timers.set_awake(self.get_job_name("pet"), False)
+        for name in self._sources:
+            instruments.remove_source(name)
+        self._sources = []
+
+    def get_job_name(self, job: str) -> str:
+        """Name of one of the pet's timer jobs, prefixed with the pet's name if it has one"""
+        return job if self.name is None else f"{self.name}.{job}"
 
-    def keep_on_top(self):
+    def keep_on_top(self) -> float:
+        """Raise the window, less and less often while nothing covers it
+
+        Returns:
+            float: Seconds until the window should be raised again
+        """
         self.canvas.window.wm_attributes("-topmost", True)
-        self.canvas.window.after(100, self.keep_on_top)
+        self.tk_calls_issued += 1
+        if self.power.mode != PowerModes.ACTIVE:
+            # Nobody is watching the pet closely enough to notice it being covered for a bit
+            return InteractablePet.KEEP_ON_TOP_MAX_INTERVAL
+        interval = self.keep_on_top_interval
+        self.keep_on_top_interval = min(interval * 2, InteractablePet.KEEP_ON_TOP_MAX_INTERVAL)
+        return interval
+
+    def set_topmost(self, topmost: bool):
+        """Start or stop keeping the window above other windows"""
+        if topmost == self.topmost:
+            return
+        self.topmost = topmost
+        self.canvas.window.wm_attributes("-topmost", topmost)
+        self.tk_calls_issued += 1
+        if not topmost:
+            self.timers.pause(self.get_job_name("keep_on_top"))
+        elif self.power.mode != PowerModes.SUSPENDED:
+            self.timers.resume(self.get_job_name("keep_on_top"))
+            self.raise_soon()
+
+    def raise_soon(self):
+        """Another window may have gone over the pet, raise it right away and keep at it for a bit"""
+        if not self.topmost:
+            return
+        self.keep_on_top_interval = InteractablePet.KEEP_ON_TOP_INTERVAL
+        self.timers.reschedule(self.get_job_name("keep_on_top"), 0, interval=self.keep_on_top_interval)
 
     def on_focus_out(self, event):
-        self.canvas.window.wm_attributes("-topmost", True)
+        if self.topmost:
+            self.canvas.window.wm_attributes("-topmost", True)
+            self.tk_calls_issued += 1
+            self.raise_soon()
         # When focus is lost, hide tooltip
         self.hide_tooltip()
 
-    def is_on_desktop(self):
+    def on_visibility_changed(self, event):
+        if event.state != "VisibilityUnobscured":
+            self.raise_soon()
+
+    def on_map_changed(self, event):
+        # Bindings on the root window also fire for its children
+        if event.widget is self.canvas.window:
+            self.update_power_mode()
+
+    def get_power_mode(self) -> PowerModes:
+        """The power mode the pet should be in right now"""
+        if self.canvas.window.state() in ("withdrawn", "iconic"):
+            return PowerModes.SUSPENDED
+        if self.animator.state == AnimationStates.SLEEP:
+            return PowerModes.SLEEPING
+        if not self.is_desktop_active:
+            return PowerModes.BACKGROUND
+        return PowerModes.ACTIVE
+
+    def update_power_mode(self):
+        """Switch power mode if the pet should be in another one, and resume instantly when waking up"""
+        previous_mode = self.power.mode
+        mode = self.get_power_mode()
+        if not self.power.set_mode(mode):
+            return
+        logger.debug(f"Power mode {previous_mode.value} -> {mode.value}")
+
+        if mode == PowerModes.SUSPENDED:
+            self.hide_tooltip()
+            self.scheduler.pause()
+            self.timers.pause(self.get_job_name("keep_on_top"))
+            self.timers.set_awake(self.get_job_name("pet"), False)
+            return
+        if previous_mode == PowerModes.SUSPENDED:
+            self.timers.set_awake(self.get_job_name("pet"), True)
+            self.scheduler.resume()
+            if self.topmost:
+                self.timers.resume(self.get_job_name("keep_on_top"))
+        if InteractablePet.MIN_TICK_INTERVALS[mode] < InteractablePet.MIN_TICK_INTERVALS[previous_mode]:
+            # The next tick may be a long way off, do not wait for it
+            self.scheduler.wake()
+        if mode == PowerModes.ACTIVE:
+            self.raise_soon()
+
+    def is_on_desktop(self, active_window: ActiveWindow = None) -> bool:
         """
-        Check if the desktop or the app itself (title containing 'Totoro') is active.
+        Check if the desktop or the app itself is active.
         Returns True if desktop or app is active, False if another application is active.
         """
-        foreground_window = win32gui.GetForegroundWindow()
-        
-        try:
-            class_name = win32gui.GetClassName(foreground_window)
-            window_title = win32gui.GetWindowText(foreground_window)
-            # logger.info(f"Foreground window: handle={foreground_window}, class={class_name}, title={window_title}")
-            
-            if self.app_title == window_title:
-                # logger.info(f"App detected as desktop (title contains '{self.app_title}')")
-                return True
-            
-            desktop_classes = {
-                "Progman",                      # Program Manager - Main desktop on older Windows (XP, 7, 10)
-                "WorkerW",                      # Wallpaper layer - Often appears when desktop is visible (Windows 7, 10)
-                "SysListView32",                # List of icons on desktop (child of Progman)
-                "Shell_TrayWnd",                # Main taskbar (Start menu, system tray)
-                "Static",                       # Hidden window when all apps are minimized (based on your log)
-                "DesktopWindowXamlSource",      # Desktop on Windows 11 (XAML-based)
-                "NotifyIconOverflowWindow",     # System tray overflow (when clicking hidden icons in tray)
-                "Windows.UI.Core.CoreWindow",   # Core UI window on Windows 10/11 (UWP-related desktop components)
-                "Shell_SecondaryTrayWnd",       # Secondary taskbar on multi-monitor setups (Windows 10/11)
-                "DV2ControlHost",               # Desktop View control host (related to Start menu on Windows 7/8)
-                "Shell_DLL_DefView",            # Default view of desktop (child of Progman on some systems)
-                "MultitaskingViewFrame",        # Task View or Alt+Tab interface on Windows 10/11
-                "TaskListThumbnailWnd",         # Thumbnail preview when hovering over taskbar
-                "TrayNotifyWnd",                # System tray notification area
-                "TrayClockWClass",              # Clock in system tray
-                "ReBarWindow32",                # Toolbar in taskbar
-                "CiceroUIWndFrame",             # Input method editor (IME) window (may appear on desktop)
-                "ApplicationManager_DesktopShellWindow",  # Desktop shell on Windows 11 (less common)
-                "Start",                        # Start menu on Windows 10/11 when opened
-                "ExplorerWClass",               # Explorer window (may relate to desktop on some configurations)
-                "CabinetWClass",                # File Explorer window (if Explorer displays desktop)
-                "ApplicationFrameWindow",       # UWP app frame (Windows 11 shell components)
-            }
-            if class_name in desktop_classes:
-                # logger.info("Desktop detected (class match)")
-                return True
-                
-        except Exception as e:
-            logger.info(f"Foreground window: handle={foreground_window}, error getting info: {str(e)}")
-        
-        # logger.info("Application detected (no desktop or app match)")
-        return False
+        if active_window is None:
+            active_window = self.active_window.get_active_window()
+        return active_window.is_desktop or active_window.title == self.app_title
 
-    def check_desktop_active(self):
+    def on_active_window_changed(self, active_window: ActiveWindow):
         """
-        Periodically check if desktop is active and update state
+        Update the state whenever the focus moves to another window
         """
+        started = instruments.start()
         previous_state = self.is_desktop_active
-        self.is_desktop_active = self.is_on_desktop()
-        
+        self.is_desktop_active = self.is_on_desktop(active_window)
+        self.update_power_mode()
+
         # If desktop state changes, update tooltip
         if previous_state != self.is_desktop_active:
             if not self.is_desktop_active and self.tooltip.winfo_viewable():
                 self.hide_tooltip()
             elif self.is_desktop_active and not self.tooltip.winfo_viewable():
                 self.update_tooltip_content()
-        
-        self.canvas.window.after(300, self.check_desktop_active)
+        instruments.record("desktop_check", started)
 
     def setup_tooltip(self):
-        self.tooltip = tk.Toplevel(self.canvas.window)
+        toolkit = self.canvas.toolkit
+        self.tooltip = toolkit.Toplevel(self.canvas.window)
         self.tooltip.wm_overrideredirect(True)
         self.tooltip.geometry("110x25")
         
         # Create a Canvas to draw the rounded rectangle
-        self.tooltip_canvas = tk.Canvas(self.tooltip, width=100, height=25, bg="white", highlightthickness=0)
+        self.tooltip_canvas = toolkit.Canvas(self.tooltip, width=100, height=25, bg="white", highlightthickness=0)
         self.tooltip_canvas.pack(expand=True, fill="both")
         
         # Create a Label inside the Canvas
-        self.tooltip_label = tk.Label(
-            self.tooltip_canvas, text="", bg="white", fg="black", font=("Arial", 8)
+        self.tooltip_label = toolkit.Label(
+            self.tooltip_canvas, text="", bg="white", fg="black", font=InteractablePet.TOOLTIP_FONT
         )
         self.tooltip_label.place(x=10, y=5)
+        # One outline, moved to fit each message instead of drawn again
+        self.tooltip_outline = self.rounded_rect(self.tooltip_canvas, 0, 0, 110, 25, 10, fill="white", outline="black")
+        self.tooltip_bubble: TooltipBubble = None
         self.tooltip.withdraw()
 
     def rounded_rect(self, canvas, x1, y1, x2, y2, radius=25, **kwargs):
-        points = [x1+radius, y1,
-                  x1+radius, y1,
-                  x2-radius, y1,
-                  x2-radius, y1,
-                  x2, y1,
-                  x2, y1+radius,
-                  x2, y1+radius,
-                  x2, y2-radius,
-                  x2, y2-radius,
-                  x2, y2,
-                  x2-radius, y2,
-                  x2-radius, y2,
-                  x1+radius, y2,
-                  x1+radius, y2,
-                  x1, y2,
-                  x1, y2-radius,
-                  x1, y2-radius,
-                  x1, y1+radius,
-                  x1, y1+radius,
-                  x1, y1]
+        points = TooltipBubbles.get_rounded_rect_points(x1, y1, x2, y2, radius)
         return canvas.create_polygon(points, **kwargs, smooth=True)
 
     def update_tooltip_content(self):
-        # Only show tooltip if desktop is active
-        if not self.is_desktop_active:
+        # Only show tooltip if desktop is active and the pet is showing
+        if not self.is_desktop_active or self.power.mode == PowerModes.SUSPENDED:
             self.hide_tooltip()
             return
             
@@ -155,41 +296,47 @@ class InteractablePet(SimplePet):
             
         message = animation.get_random_message()
         self.tooltip_label.configure(text=message)
-        
-        # Update the tooltip size based on the text width
-        self.tooltip.update_idletasks()  # Update the geometry manager
-        text_width = self.tooltip_label.winfo_reqwidth() + 20  # Add some padding
-        self.tooltip.geometry(f"{text_width}x25")
-        self.tooltip_canvas.config(width=text_width)
-        self.tooltip_canvas.delete("all")
-        self.rounded_rect(self.tooltip_canvas, 0, 0, text_width, 25, 10, fill="white", outline="black")
-        
-        self.update_tooltip_position()
+        bubble = self.tooltip_bubbles.get(message, InteractablePet.TOOLTIP_FONT, self.tooltip_label)
+        if bubble is not self.tooltip_bubble:
+            if self.tooltip_bubble is None or bubble.width != self.tooltip_bubble.width:
+                self.tooltip_canvas.coords(self.tooltip_outline, *bubble.points)
+                self.tk_calls_issued += 1
+            self.tooltip_bubble = bubble
+        # Size and position in one go
+        tooltip_x, tooltip_y = self.get_tooltip_position()
+        self.tooltip.geometry(f"{bubble.width}x{bubble.height}+{tooltip_x}+{tooltip_y}")
         self.tooltip.deiconify()
-        if self.tooltip_after_id:
-            self.canvas.window.after_cancel(self.tooltip_after_id)
+        self.tk_calls_issued += 3
         display_time = random.randint(1000, 3000)  # Maximum 3 seconds
-        self.tooltip_after_id = self.canvas.window.after(display_time, self.update_tooltip_content)
+        # The exact moment a message changes does not matter, so it can share a wakeup
+        self.timers.call_later(self.get_job_name("tooltip"), display_time / 1000, self.update_tooltip_content, slack=0.2)
 
-    def update_tooltip_position(self):
-        animation = self.get_current_animation()
-        size = animation.target_resolution
+    def get_tooltip_position(self):
         tooltip_x = self.x + 55
         tooltip_y = self.y - 20
+        return tooltip_x, tooltip_y
+
+    def update_tooltip_position(self):
+        tooltip_x, tooltip_y = self.get_tooltip_position()
         self.tooltip.geometry(f"+{tooltip_x}+{tooltip_y}")
+        self.tk_calls_issued += 1
 
     def hide_tooltip(self):
         self.tooltip.withdraw()
-        if self.tooltip_after_id:
-            self.canvas.window.after_cancel(self.tooltip_after_id)
-            self.tooltip_after_id = None
-
-    def set_animation_state(self, state: AnimationStates) -> bool:
-        changed = self.animator.set_animation_state(state)
-        if changed:
-            self.reset_movement()
-            self.update_tooltip_content()
-        return changed
+        self.tk_calls_issued += 1
+        self.timers.cancel(self.get_job_name("tooltip"))
+
+    def on_animation_state_changed(self):
+        if (
+            self.fall_speed > 0
+            and self.animator.state not in (AnimationStates.FALLING, AnimationStates.LANDED)
+            and AnimationStates.FALLING in self.animator.animations
+        ):
+            # The state graph moved on mid-fall, keep falling until the pet lands
+            self.animator.set_animation_state(AnimationStates.FALLING)
+        self.reset_movement()
+        self.update_tooltip_content()
+        self.update_power_mode()
 
     def reset_movement(self):
         animation = self.get_current_animation()
@@ -197,72 +344,217 @@ class InteractablePet(SimplePet):
         self.a_x, self.a_y = animation.get_acceleration()
 
     def do_movement(self):
+        if self.wrap_to_x is not None:
+            # Stay at the edge until faded out
+            return
         self.v_x += self.a_x
         self.v_y += self.a_y
+        was_on_floor = self.floor is not None and self.y >= self.floor
+        size = self.animator.animations[self.animator.state].target_resolution
+        previous_bottom = self.y + size[1]
         self.x = int(self.x + self.v_x)
         self.y = int(self.y + self.v_y)
-        size = self.animator.animations[self.animator.state].target_resolution
-        if self.x < 0 or self.x > self.canvas.resolution["width"] - size[0]:
-            self.fade_out()
-            if self.x < 0:
-                self.x = self.canvas.resolution["width"] - size[0]
+        monitor = self.monitors.find(self.x + size[0] // 2, self.y + size[1] // 2)
+        left, right = self.monitors.get_row(monitor)
+        if self.x < left or self.x > right - size[0]:
+            if self.x < left:
+                self.x = left
+                self.fade_out(wrap_to_x=right - size[0])
             else:
-                self.x = 0
-            self.fade_in()
-        if self.y > self.canvas.resolution["height"] - size[1]:
-            self.y = self.canvas.resolution["height"] - size[1]
+                self.x = right - size[0]
+                self.fade_out(wrap_to_x=left)
+        floor = monitor.bottom - self.offset - size[1]
+        if self.window_edges is not None and not self.is_dragged:
+            self.move_on_windows(previous_bottom, size, floor)
+        if was_on_floor and self.v_y >= 0 and self.y < floor:
+            # Walked onto a monitor that reaches further down, step down onto its floor
+            self.y = floor
+        if self.y > floor:
+            self.y = floor
             if self.animator.state == AnimationStates.FALLING:
-                if AnimationStates.LANDED in self.animator.animations:
-                    self.set_animation_state(AnimationStates.LANDED)
-                else:
-                    raise Exception("Stuck falling as no AnimationStates.LANDED is defined.")
+                # The state graph made sure there is a LANDED when the animations were loaded
+                self.set_animation_state(AnimationStates.LANDED)
+        self.floor = floor
         if self.tooltip.winfo_viewable():
             self.update_tooltip_position()
 
-    def fade_out(self):
+    def move_on_windows(self, previous_bottom: int, size, floor: int):
+        """Keep the pet on the top edge of the window it stands on, following the window when it
+        moves, or let it fall when nothing holds it up until it lands on a window or the floor
+
+        Args:
+            previous_bottom (int): where the bottom of the pet was before this frame's movement
+            size (Tuple[int, int]): size of the pet
+            floor (int): where the top of the pet is when standing on the floor
+        """
+        center = self.x + size[0] // 2
+        if self.standing_on is not None:
+            edge = self.window_edges.get(self.standing_on)
+            if edge is not None and edge.x <= center < edge.right and self.v_y >= 0:
+                self.y = edge.y - size[1]
+                return
+            # The window went away, or the pet walked off its edge or jumped
+            self.standing_on = None
+        if self.v_y < 0 or self.y >= floor:
+            return
+
+        if self.fall_speed == 0 and AnimationStates.FALLING in self.animator.animations:
+            self.set_animation_state(AnimationStates.FALLING)
+        self.fall_speed = min(self.fall_speed + InteractablePet.GRAVITY, InteractablePet.MAX_FALL_SPEED)
+        self.y = int(self.y + self.fall_speed)
+        edge = self.window_edges.find_landing(center, previous_bottom, self.y + size[1])
+        if edge is not None:
+            self.y = edge.y - size[1]
+            self.standing_on = edge.handle
+        elif self.y < floor:
+            return
+        else:
+            self.y = floor
+        self.fall_speed = 0
+        if self.animator.state == AnimationStates.FALLING:
+            self.set_animation_state(AnimationStates.LANDED)
+
+    def fade_out(self, wrap_to_x: int = None):
+        """Start fading the window out, it is faded back in at `wrap_to_x` if given"""
         self.hide_tooltip()
-        for alpha in range(100, 0, -10):
-            self.canvas.window.attributes("-alpha", alpha / 100)
-            self.canvas.window.update()
-            self.canvas.window.after(50)
+        self.wrap_to_x = wrap_to_x
+        start = 1 if self.fade is None else self.fade.value
+        self.fade = Tween(start, 0, InteractablePet.FADE_DURATION * start, on_done=self.on_faded_out)
+
+    def on_faded_out(self):
+        if self.wrap_to_x is not None:
+            self.x = self.wrap_to_x
+            self.wrap_to_x = None
+        self.fade_in()
 
     def fade_in(self):
-        for alpha in range(0, 100, 10):
-            self.canvas.window.attributes("-alpha", alpha / 100)
-            self.canvas.window.update()
-            self.canvas.window.after(50)
-
-    def update(self):
-        self.do_movement()
-        super().update()
+        """Start fading the window back in"""
+        start = 0 if self.fade is None else self.fade.value
+        self.fade = Tween(start, 1, InteractablePet.FADE_DURATION * (1 - start))
+
+    def cancel_fade(self):
+        """Stop fading and make the window opaque right away"""
+        if self.fade is None:
+            return
+        self.fade = None
+        self.wrap_to_x = None
+        self.canvas.window.attributes("-alpha", 1)
+
+    def update_fade(self, delta_time: float):
+        """Advance the current fade, if any, and apply its alpha to the window"""
+        if self.fade is None:
+            return
+        self.fade.advance(delta_time)
+        # Finishing a fade out starts the fade in, so re-read the current fade
+        fade = self.fade
+        self.canvas.window.attributes("-alpha", fade.value)
+        self.tk_calls_issued += 1
+        if fade.is_done:
+            self.fade = None
+
+    def update(self, delta_time: float) -> int:
+        frames_advanced = super().update(delta_time)
+        # Movement is per frame, so frames dropped by a late tick still move the pet
+        for _ in range(frames_advanced):
+            self.do_movement()
         # Only show random tooltips if desktop is active
-        if random.random() < 0.3 and not self.tooltip.winfo_viewable() and self.is_desktop_active:
+        if frames_advanced and random.random() < 0.3 and not self.tooltip.winfo_viewable() and self.is_desktop_active:
             self.update_tooltip_content()
+        return frames_advanced
 
-    def on_tick(self):
-        self.update()
-        frame = super().get_current_animation_frame()
-        super().set_geometry()
-        self.canvas.label.configure(image=frame)
-        self.handle_event()
+    def on_tick(self, delta_time: float) -> float:
+        started = instruments.start()
+        tk_calls = self.tk_calls_issued
+        frames_advanced = self.update(delta_time)
+        instruments.record("update", started)
+        if frames_advanced > 1:
+            instruments.count("late_frames", frames_advanced - 1)
 
-    def handle_event(self):
-        animation = self.get_current_animation()
-        frame_duration = animation.get_frame_duration(self.animator.frame_number)
-        self.canvas.window.after(frame_duration, self.on_tick)
+        render_started = instruments.start()
+        self.update_fade(delta_time)
+        self.set_frame(self.get_current_animation_frame())
+        self.set_geometry()
+        instruments.record("render", render_started)
+        instruments.record("tick", started)
+        if instruments.enabled:
+            instruments.observe("tk_calls_per_tick", self.tk_calls_issued - tk_calls)
+        if self.fade is not None:
+            return min(self.animator.get_time_to_next_frame(), InteractablePet.FADE_INTERVAL)
+        return max(self.animator.get_time_to_next_frame(), InteractablePet.MIN_TICK_INTERVALS[self.power.mode])
+
+    def get_scheduler_stats(self) -> Dict[str, any]:
+        """Ticks, late ticks and their lateness in seconds, and how often the pet woke up"""
+        return {
+            "ticks": self.scheduler.ticks,
+            "late_ticks": self.scheduler.late_ticks,
+            "lateness": self.scheduler.get_lateness_stats(),
+            "wakeups": self.timers.wakeups,
+            "wakeups_per_second": self.timers.get_wakeups_per_second(),
+        }
+
+    def get_power_stats(self) -> Dict[str, any]:
+        """Time and wakeups spent in each power mode"""
+        return {mode.value: stats for mode, stats in self.power.get_stats().items()}
+
+    def set_offset(self, offset: int):
+        """Move the floor, ie when the pet's offset in the config changed. A pet standing on the
+        floor stays on it.
+
+        Args:
+            offset (int): pixels between the bottom of a monitor and the floor
+        """
+        size = self.get_current_animation().target_resolution
+        monitor = self.monitors.find(self.x + size[0] // 2, self.y + size[1] // 2)
+        on_floor = self.y >= monitor.bottom - self.offset - size[1]
+        self.offset = offset
+        self.floor = monitor.bottom - offset - size[1]
+        if on_floor or self.y > self.floor:
+            self.y = self.floor
+        self.set_geometry()
+        if self.tooltip.winfo_viewable():
+            self.update_tooltip_position()
+
+    def swap_animations(self, animations):
+        """Play other animations from now on, ie the same ones at another size, carrying on in the
+        same state and frame. The pet keeps standing where it stood, its window grows or shrinks
+        around the middle of its bottom edge.
+
+        Args:
+            animations (Mapping[AnimationStates, Animation]): the new animations, best with the
+                current state already decoded so the swap does not wait on it
+        """
+        old_size = self.get_current_animation().target_resolution
+        self.animator.set_animations(animations)
+        size = self.get_current_animation().target_resolution
+        self.x += (old_size[0] - size[0]) // 2
+        self.y += old_size[1] - size[1]
+        if self.floor is not None:
+            self.floor += old_size[1] - size[1]
+        self.invalidate_render()
+        self.set_frame(self.get_current_animation_frame())
+        self.set_geometry()
+        if self.tooltip.winfo_viewable():
+            self.update_tooltip_position()
 
     def start_move(self, event):
+        self.scheduler.wake()
+        self.is_dragged = True
+        self.standing_on = None
+        self.fall_speed = 0
         if AnimationStates.GRABBED in self.animator.animations:
             self.set_animation_state(AnimationStates.GRABBED)
 
     def stop_move(self, event):
+        self.is_dragged = False
         excluded_states = {AnimationStates.WALK_POSITIVE_MANY, AnimationStates.WALK_NEGATIVE_MANY}
         available_states = [state for state in self.animator.animations.keys() if state not in excluded_states]
         random_state = random.choice(available_states)
         self.set_animation_state(random_state)
-        # logger.info(f"Random state after clicked: {random_state}")
+        if instruments.enabled:
+            logger.info(f"Random state after clicked: {random_state}")
 
     def do_move(self, event):
+        self.cancel_fade()
         size = self.animator.animations[self.animator.state].target_resolution
         self.x = event.x_root - int(size[0] / 2)
         self.y = event.y_root - int(size[1] / 2)
@@ -0,0 +1,160 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Tuple
+from src import logger
+from ..animation import AnimationsView, FrameStore, LazyAnimations
+from ..config_reader import Config, PetConfiguration
+from ..window_utils import TimerService, set_bg_color
+from .interactable_pet import InteractablePet
+
+
+class LiveConfig:
+    """Applies changes to the config.xml to running pets, without restarting them.
+
+    Whether pets stay on top, their background color, their offset from the bottom of the screen
+    and the frame memory budget apply right away. A new resolution needs every frame scaled
+    again: the new animations are loaded on a background thread (compiling a sprite pack for the
+    new size if needed) along with the states the pets are in, and only then are the pets
+    switched over to them, all at once on the tkinter thread. The pets keep playing their old
+    frames until then, and those are dropped after the switch.
+    """
+
+    JOB_NAME = "live_config"
+    POLL_INTERVAL = 0.1
+    """Seconds between checks whether animations loading in the background are ready"""
+
+    timers: TimerService
+    animations: Dict[str, LazyAnimations]
+    """Animations each kind of pet is playing, by pet name"""
+
+    def __init__(
+        self,
+        timers: TimerService,
+        load_animations: Callable[[str, PetConfiguration], LazyAnimations],
+        frame_store: FrameStore = None,
+        on_animations_swapped: Callable[[LazyAnimations, LazyAnimations, Tuple[int, int]], None] = None,
+    ):
+        """
+        Args:
+            timers (TimerService): Polls the animations loading in the background.
+            load_animations (Callable[[str, PetConfiguration], LazyAnimations]): loads the animations of a pet
+                with the given settings, ie through `get_animations`. Runs on a background thread.
+            frame_store (FrameStore, optional): store whose budget follows the config.
+            on_animations_swapped (Callable, optional): called with the old and new animations and the
+                new target resolution, once pets moved on to new animations.
+        """
+        self.timers = timers
+        self.load_animations = load_animations
+        self.frame_store = frame_store
+        self.on_animations_swapped = on_animations_swapped
+        self.animations = {}
+        self._pets: List[Tuple[str, InteractablePet]] = []
+        self._loading: Dict[str, Tuple[Future, PetConfiguration]] = {}
+        self._executor = None
+
+    def add_pet(self, pet_name: str, pet: InteractablePet, animations: LazyAnimations):
+        """Apply changes to a pet from now on
+
+        Args:
+            pet_name (str): name of the pet in the config.xml
+            pet (InteractablePet): the running pet
+            animations (LazyAnimations): what the pet plays, itself or through a view of it
+        """
+        self._pets.append((pet_name, pet))
+        self.animations[pet_name] = animations
+
+    def on_config_changed(self, old: Config, new: Config):
+        """Apply the differences between two snapshots of the config, see ConfigWatcher"""
+        if new.frame_memory_mb != old.frame_memory_mb and self.frame_store is not None:
+            self.frame_store.budget_bytes = FrameStore.from_megabytes(new.frame_memory_mb).budget_bytes
+            self.frame_store.evict()
+        for pet_name in self.animations:
+            if pet_name not in new.pets:
+                logger.warning(f"{pet_name} was removed from the config, keeping its last settings")
+                continue
+            old_pet, new_pet = old.pets.get(pet_name), new.pets[pet_name]
+            for name, pet in self._pets:
+                if name != pet_name:
+                    continue
+                if new.force_topmost != old.force_topmost:
+                    pet.set_topmost(new.force_topmost)
+                if old_pet is None or new_pet.bg_color != old_pet.bg_color:
+                    set_bg_color(pet.canvas.window, pet.canvas.label, new_pet.bg_color)
+                if old_pet is None or new_pet.offset != old_pet.offset:
+                    pet.set_offset(new_pet.offset)
+            if (
+                old_pet is None
+                or new_pet.target_resolution != old_pet.target_resolution
+                or new_pet.preserve_aspect_ratio != old_pet.preserve_aspect_ratio
+            ):
+                self.reload_animations(pet_name, new_pet)
+
+    def reload_animations(self, pet_name: str, pet_config: PetConfiguration):
+        """Load the animations of a pet with new settings in the background, replacing any that
+        are still loading for it, and switch its pets over once they are ready
+        """
+        states = {pet.animator.state for name, pet in self._pets if name == pet_name}
+        if self._executor is None:
+            # One at a time, as loading already decodes on several threads
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="animation-reload")
+        future = self._executor.submit(self.load_decoded, pet_name, pet_config, states)
+        if pet_name in self._loading:
+            superseded, _ = self._loading[pet_name]
+            if not superseded.cancel():
+                superseded.add_done_callback(LiveConfig.close_unused)
+        self._loading[pet_name] = (future, pet_config)
+        logger.info(f"Scaling {pet_name} to {pet_config.target_resolution[0]}x{pet_config.target_resolution[1]}")
+        self.timers.add(LiveConfig.JOB_NAME, self.poll, LiveConfig.POLL_INTERVAL, slack=0.05)
+
+    def load_decoded(self, pet_name: str, pet_config: PetConfiguration, states) -> LazyAnimations:
+        """Load a pet's animations and decode the given states. Runs on a background thread."""
+        animations = self.load_animations(pet_name, pet_config)
+        for state in states:
+            if state in animations.animations:
+                animations.animations[state].prefetch()
+        return animations
+
+    @staticmethod
+    def close_unused(future: Future):
+        if not future.cancelled() and future.exception() is None:
+            future.result().close()
+
+    def poll(self):
+        """Switch pets over to animations that finished loading, stop polling once none are left"""
+        for pet_name, (future, pet_config) in list(self._loading.items()):
+            if not future.done():
+                continue
+            del self._loading[pet_name]
+            if future.exception() is not None:
+                logger.error(f"Could not scale {pet_name}, it keeps its current size: {str(future.exception())}")
+                continue
+            self.swap_animations(pet_name, future.result(), pet_config)
+        if not self._loading:
+            self.timers.cancel(LiveConfig.JOB_NAME)
+
+    def swap_animations(self, pet_name: str, animations: LazyAnimations, pet_config: PetConfiguration):
+        """Switch every pet of a kind to new animations and drop the frames of the old ones"""
+        old = self.animations[pet_name]
+        for name, pet in self._pets:
+            if name == pet_name:
+                shared = isinstance(pet.animator.animations, AnimationsView)
+                pet.swap_animations(animations.view() if shared else animations)
+        self.animations[pet_name] = animations
+        old.release()
+        if self.on_animations_swapped is not None:
+            self.on_animations_swapped(old, animations, pet_config.target_resolution)
+        logger.info(f"{pet_name} now plays at {pet_config.target_resolution[0]}x{pet_config.target_resolution[1]}")
+
+    def close(self):
+        """Stop loading in the background and close the animations the pets play"""
+        self.timers.cancel(LiveConfig.JOB_NAME)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        for future, _ in self._loading.values():
+            future.add_done_callback(LiveConfig.close_unused)
+        self._loading = {}
+        for animations in self.animations.values():
+            animations.close()
+
+    def __repr__(self):
+        return f"<LiveConfig: {len(self._pets)} pets, {len(self._loading)} loading>"
@@ -0,0 +1,178 @@
+import tkinter as tk
+from typing import Callable, Dict, List, Tuple
+from ..animation import AnimationsView, FrameStore, LazyAnimations
+from ..window_utils import Canvas, MonitorTopology, TimerService, WindowEdgeIndex
+from ..window_utils.active_window import ActiveWindowBackend, get_active_window_backend
+from .interactable_pet import InteractablePet
+from .tooltip_bubbles import TooltipBubbles
+
+
+class PetGroup:
+    """Runs many pets in one tkinter interpreter.
+
+    Every pet has its own window, a Toplevel of the group's root window, and its own animator,
+    but everything else is shared: a single TimerService wakes all pets up, running the ticks of
+    pets that come due within `TICK_SLACK` of each other together, a single backend follows the
+    focused window for all of them, and pets of the same kind and size play the same decoded
+    frames. Adding a pet costs a window and an animator, not a set of frames or a timer.
+    """
+
+    TICK_SLACK = 0.008
+    """Seconds a pet's tick may move to share a wakeup with the ticks of other pets"""
+
+    window: tk.Misc
+    """Root window of the group, the pets' windows are its Toplevels"""
+    timers: TimerService
+    active_window: ActiveWindowBackend
+    monitors: MonitorTopology
+    """The monitors all pets walk across, None when each pet keeps to its own canvas' resolution"""
+    window_edges: WindowEdgeIndex
+    """Top edges of other windows all pets can stand on, None when they only walk on the floor"""
+    tooltip_bubbles: TooltipBubbles
+    """Measured tooltip bubbles, shared as pets of a kind show the same messages"""
+    pets: List[InteractablePet]
+
+    def __init__(
+        self,
+        window: tk.Misc,
+        timers: TimerService = None,
+        active_window: ActiveWindowBackend = None,
+        monitors: MonitorTopology = None,
+        window_edges: WindowEdgeIndex = None,
+    ):
+        """
+        Args:
+            window (tk.Misc): Root window, only used to run timers and follow the focus.
+            timers (TimerService, optional): Service running the jobs of all pets. Defaults to a new one.
+            active_window (ActiveWindowBackend, optional): Follows the focus for all pets. Defaults to the one for this platform.
+            monitors (MonitorTopology, optional): The monitors all pets walk across. Defaults to each
+                pet's canvas' resolution.
+            window_edges (WindowEdgeIndex, optional): Windows all pets can stand on. Defaults to none.
+        """
+        self.window = window
+        self.timers = timers if timers is not None else TimerService(window)
+        self.active_window = active_window if active_window is not None else get_active_window_backend(window)
+        self.monitors = monitors
+        self.window_edges = window_edges
+        self.tooltip_bubbles = TooltipBubbles()
+        self.pets = []
+        self._animations: Dict[Tuple[str, Tuple[int, int]], LazyAnimations] = {}
+
+    def get_animations(
+        self, pet_name: str, target_resolution: Tuple[int, int], load: Callable[[], LazyAnimations]
+    ) -> AnimationsView:
+        """Animations for one more pet, loaded only for the first pet of its kind and size
+
+        Args:
+            pet_name (str): name of the pet, ie the name of folder its animations are in
+            target_resolution (Tuple[int, int]): target size of the animations
+            load (Callable[[], LazyAnimations]): loads the animations, ie through `get_animations`
+
+        Returns:
+            AnimationsView: the shared animations as seen by the new pet
+        """
+        key = (pet_name, tuple(target_resolution))
+        if key not in self._animations:
+            self._animations[key] = load()
+        return self._animations[key].view()
+
+    def add_pet(
+        self, x: int, y: int, canvas: Canvas, animator, topmost: bool = True, offset: int = 0
+    ) -> InteractablePet:
+        """Make a pet in the given window, running off the group's timers and focus tracking
+
+        Args:
+            x (int): where the pet starts out
+            y (int): where the pet starts out
+            canvas (Canvas): the pet's own window, a Toplevel of the group's window
+            animator (Animator): the pet's animator, on animations from `get_animations`
+            topmost (bool, optional): whether the pet keeps its window above other windows. Defaults to True.
+            offset (int, optional): pixels between the bottom of a monitor and the pet's floor. Defaults to 0.
+
+        Returns:
+            InteractablePet: the new pet, which starts ticking with the rest of the group
+        """
+        pet = InteractablePet(
+            x,
+            y,
+            canvas=canvas,
+            animator=animator,
+            timers=self.timers,
+            active_window=self.active_window,
+            name=f"pet{len(self.pets)}",
+            tick_slack=PetGroup.TICK_SLACK,
+            topmost=topmost,
+            monitors=self.monitors,
+            offset=offset,
+            window_edges=self.window_edges,
+            tooltip_bubbles=self.tooltip_bubbles,
+        )
+        self.pets.append(pet)
+        canvas.window.bind("<Destroy>", lambda event: self.on_window_destroyed(pet, event), add="+")
+        if any(other.scheduler.is_running for other in self.pets):
+            pet.scheduler.start()
+        return pet
+
+    def on_window_destroyed(self, pet: InteractablePet, event: tk.Event):
+        """Close a pet whose window was destroyed, ie from its tray icon, and end the event loop
+        of the root window once every pet is gone, as nothing shows it
+        """
+        # Destroying a window also destroys its children, which report to the same binding
+        if event.widget is not pet.canvas.window:
+            return
+        pet.close()
+        if all(other.is_closed for other in self.pets):
+            self.window.quit()
+
+    def replace_animations(self, old: LazyAnimations, new: LazyAnimations, target_resolution: Tuple[int, int]):
+        """Record that the pets playing `old` moved on to `new`, ie after their resolution changed"""
+        for key, animations in list(self._animations.items()):
+            if animations is old:
+                del self._animations[key]
+                self._animations[(key[0], tuple(target_resolution))] = new
+
+    def start(self):
+        """Start ticking every pet, at the same moment, so pets playing the same animations tick together"""
+        for pet in self.pets:
+            if not pet.scheduler.is_running:
+                pet.scheduler.start()
+
+    def close(self):
+        """Stop the pets still open, following the focus and decoding animations in the background"""
+        for pet in self.pets:
+            pet.close()
+        self.active_window.stop()
+        for animations in self._animations.values():
+            animations.close()
+
+    def get_stats(self) -> Dict[str, any]:
+        """Number of pets and frame sets, ticks of all pets and the wakeups they took, and reuse of tooltip bubbles"""
+        frames = [
+            frame
+            for animations in self._animations.values()
+            for animation in animations.animations.values()
+            if animation.is_loaded
+            for frame in animation.frames
+        ]
+        ticks = sum(pet.scheduler.ticks for pet in self.pets)
+        return {
+            "pets": len(self.pets),
+            "frame_sets": len(self._animations),
+            "frame_bytes": FrameStore.get_frames_bytes(frames),
+            "ticks": ticks,
+            "wakeups": self.timers.wakeups,
+            "ticks_per_wakeup": ticks / self.timers.wakeups if self.timers.wakeups else 0,
+            "wakeups_per_second": self.timers.get_wakeups_per_second(),
+            "tooltip_bubbles": self.tooltip_bubbles.get_stats(),
+        }
+
+    def report(self) -> str:
+        stats = self.get_stats()
+        return (
+            f"Pet group: {stats['pets']} pets on {stats['frame_sets']} frame sets "
+            f"({stats['frame_bytes'] / 1024 / 1024:.1f}MB), {stats['ticks']} ticks in {stats['wakeups']} wakeups "
+            f"({stats['ticks_per_wakeup']:.1f} ticks per wakeup, {stats['wakeups_per_second']:.1f} wakeups/s)"
+        )
+
+    def __repr__(self):
+        return f"<PetGroup: {len(self.pets)} pets, {len(self._animations)} frame sets>"
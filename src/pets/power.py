@@ -0,0 +1,88 @@
+import time
+from collections import defaultdict
+from enum import Enum
+from typing import Callable, Dict
+
+
+class PowerModes(Enum):
+    """How much work the pet does, from most to least"""
+
+    ACTIVE = "active"
+    """On the desktop and awake, animating at the full frame rate of its gifs"""
+    BACKGROUND = "background"
+    """Another application has the focus, animating at a lower frame rate"""
+    SLEEPING = "sleeping"
+    """Asleep, the frame only changes now and then"""
+    SUSPENDED = "suspended"
+    """Withdrawn to the tray, nothing is rendered or raised"""
+
+
+class PowerMonitor:
+    """Records how long the pet spends in each power mode and how often it wakes the process up
+    while in it.
+    """
+
+    mode: PowerModes
+    get_wakeups: Callable[[], int]
+    """Total number of wakeups so far, ie TimerService.wakeups"""
+
+    def __init__(self, get_wakeups: Callable[[], int], clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            get_wakeups (Callable[[], int]): Returns the total number of wakeups so far.
+            clock (Callable[[], float], optional): Clock in seconds. Defaults to time.monotonic.
+        """
+        self.get_wakeups = get_wakeups
+        self.clock = clock
+        self.mode = PowerModes.ACTIVE
+        self.switches = 0
+        self._seconds: Dict[PowerModes, float] = defaultdict(float)
+        self._wakeups: Dict[PowerModes, int] = defaultdict(int)
+        self._since = clock()
+        self._wakeups_since = get_wakeups()
+
+    def set_mode(self, mode: PowerModes) -> bool:
+        """Switch to another power mode
+
+        Returns:
+            bool: Whether or not the mode actually changed
+        """
+        if mode == self.mode:
+            return False
+        self._record()
+        self.mode = mode
+        self.switches += 1
+        return True
+
+    def _record(self):
+        """Attribute the time and wakeups since the last switch to the current mode"""
+        now = self.clock()
+        wakeups = self.get_wakeups()
+        self._seconds[self.mode] += now - self._since
+        self._wakeups[self.mode] += wakeups - self._wakeups_since
+        self._since = now
+        self._wakeups_since = wakeups
+
+    def get_stats(self) -> Dict[PowerModes, Dict[str, float]]:
+        """Seconds spent, wakeups and wakeups per minute in each power mode the pet has been in"""
+        self._record()
+        return {
+            mode: {
+                "seconds": seconds,
+                "wakeups": self._wakeups[mode],
+                "wakeups_per_minute": self._wakeups[mode] / seconds * 60 if seconds > 0 else 0,
+            }
+            for mode, seconds in self._seconds.items()
+        }
+
+    def report(self) -> str:
+        lines = [f"Power modes: {self.switches} switches, now {self.mode.value}"]
+        for mode, stats in self.get_stats().items():
+            lines.append(
+                f"    {mode.value}: {stats['seconds']:.1f}s, {stats['wakeups']} wakeups "
+                f"({stats['wakeups_per_minute']:.0f}/min)"
+            )
+        return "\n".join(lines)
+
+    def __repr__(self):
+        return f"<PowerMonitor: {self.mode.value}>"
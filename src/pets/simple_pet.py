@@ -1,6 +1,8 @@
 import tkinter as tk
+from typing import Dict
 from ..animation import Animation, AnimationStates, Animator
 from ..window_utils import Canvas
+from ..instrumentation import instruments
 from src import logger
 
 
@@ -9,16 +11,38 @@ class SimplePet:
     y: int
     canvas: Canvas
     animator: Animator
+    tk_calls_issued: int
+    """Calls changing the windows actually sent to tkinter"""
+    tk_calls_skipped: int
+    """Calls left out as they would not have changed anything"""
 
     def __init__(self, x, y, canvas, animator):
         self.x = x
         self.y = y
         self.canvas = canvas
         self.animator = animator
+        self.tk_calls_issued = 0
+        self.tk_calls_skipped = 0
+        # What was last sent to tkinter, so unchanged frames and geometry are not sent again
+        self._rendered_frame = None
+        self._rendered_size = None
+        self._rendered_position = None
 
-    def update(self):
-        """Progress to next frame of animation"""
-        self.progress_animation()
+    def update(self, delta_time: float) -> int:
+        """Progress the animation by the time that passed, possibly over several frames
+
+        Args:
+            delta_time (float): Seconds since the last update
+
+        Returns:
+            int: How many frames the animation moved forward
+        """
+        previous_state = self.animator.state
+        frames_advanced = self.animator.update(delta_time)
+        if self.animator.state != previous_state:
+            instruments.transition(previous_state, self.animator.state)
+            self.on_animation_state_changed()
+        return frames_advanced
 
     def get_current_animation(self) -> Animation:
         """Returns the current animation of the Pet instance
@@ -46,11 +70,17 @@ class SimplePet:
         Returns:
             bool: Whether or not the state actually changed values
         """
+        previous_state = self.animator.state
         changed = self.animator.set_animation_state(state)
         if changed:
-            self.reset_movement()
+            instruments.transition(previous_state, state)
+            self.on_animation_state_changed()
         return changed
 
+    def on_animation_state_changed(self):
+        """Called whenever the animation state changes, either when set or when an animation ended"""
+        self.reset_movement()
+
     def progress_animation(self):
         """Move the animation forward one frame. If the animation has finished (i.e., current frame is
         the last frame), then try to progress to the next animation
@@ -67,34 +97,54 @@ class SimplePet:
         # logger.debug(f"{self.animator.state.__repr__()}, {self.animator.frame_number}")
 
     def set_geometry(self):
-        """Update the window position and scale to match that of the pet instance's location and size"""
-        size = self.animator.animations[self.animator.state].target_resolution
-        self.canvas.window.geometry(
-            f"{size[0]}x{size[1]}+{self.x}+{self.y}"
-        )
-
-    def handle_event(self):
-        """Part of animation loop, after delay between frames in animation,
-        proceed to begin logic of drawing next frame
+        """Update the window position and scale to match that of the pet instance's location and size.
+        Only moves the window if the size did not change, and does nothing if neither did.
         """
-        animation = self.get_current_animation()
-        # Lấy thời gian của khung hình hiện tại từ frame_durations
-        frame_duration = animation.get_frame_duration(self.animator.frame_number)
-        self.canvas.window.after(frame_duration, self.on_tick)
-
-    def on_tick(self):
-        """Handle the logic for drawing the next frame and scheduling the next tick"""
-        # Cập nhật khung hình
-        self.update()
-        # Vẽ khung hình hiện tại lên canvas (giả sử canvas có phương thức vẽ)
-        self.canvas.delete("all")  # Xóa nội dung cũ
-        self.canvas.create_image(
-            0, 0, anchor=tk.NW, image=self.get_current_animation_frame()
-        )
-        # Đặt lại vị trí cửa sổ
+        size = tuple(self.animator.animations[self.animator.state].target_resolution)
+        position = (self.x, self.y)
+        if size != self._rendered_size:
+            self.canvas.window.geometry(f"{size[0]}x{size[1]}+{self.x}+{self.y}")
+        elif position != self._rendered_position:
+            self.canvas.window.geometry(f"+{self.x}+{self.y}")
+        else:
+            self.tk_calls_skipped += 1
+            return
+        self.tk_calls_issued += 1
+        self._rendered_size = size
+        self._rendered_position = position
+
+    def set_frame(self, frame: tk.PhotoImage):
+        """Show a frame in the window, unless it is already showing"""
+        if frame is self._rendered_frame:
+            self.tk_calls_skipped += 1
+            return
+        self.canvas.label.configure(image=frame)
+        self.tk_calls_issued += 1
+        self._rendered_frame = frame
+
+    def invalidate_render(self):
+        """Forget what was last rendered, so the next render sends everything to tkinter again"""
+        self._rendered_frame = None
+        self._rendered_size = None
+        self._rendered_position = None
+
+    def get_render_stats(self) -> Dict[str, int]:
+        """Calls changing the windows sent to and skipped over tkinter so far, tooltip and raising included"""
+        return {"issued": self.tk_calls_issued, "skipped": self.tk_calls_skipped}
+
+    def on_tick(self, delta_time: float) -> float:
+        """Progress the animation by the time that passed and draw the current frame
+
+        Args:
+            delta_time (float): Seconds since the last tick
+
+        Returns:
+            float: Seconds until the next frame is due
+        """
+        self.update(delta_time)
+        self.set_frame(self.get_current_animation_frame())
         self.set_geometry()
-        # Lên lịch cho lần tick tiếp theo
-        self.handle_event()
+        return self.animator.get_time_to_next_frame()
 
     def reset_movement(self):
         """Reset any movement-related variables (if applicable)"""
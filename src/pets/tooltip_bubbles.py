@@ -0,0 +1,89 @@
+import tkinter as tk
+from typing import Dict, NamedTuple, Tuple
+
+
+class TooltipBubble(NamedTuple):
+    """Size and outline of the bubble around one message"""
+
+    width: int
+    height: int
+    points: Tuple[int, ...]
+    """Corners of the rounded rectangle, to draw as a smoothed polygon"""
+
+
+class TooltipBubbles:
+    """Bubbles of the messages tooltips show, each measured and laid out once per message and font.
+
+    Messages come from the short `list_message` of each animation, so after the first time a
+    message shows, showing it again only configures the label, moves one polygon and places the
+    tooltip window. Pets of a group share one cache.
+    """
+
+    HEIGHT = 25
+    PADDING = 20
+    """Pixels of the bubble around the text, left and right together"""
+    RADIUS = 10
+
+    hits: int
+    misses: int
+
+    def __init__(self):
+        self._bubbles: Dict[Tuple[str, any], TooltipBubble] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def get_rounded_rect_points(x1: int, y1: int, x2: int, y2: int, radius: int = 25) -> Tuple[int, ...]:
+        """Points of a rectangle with rounded corners, when drawn as a polygon with smooth=True"""
+        return (
+            x1 + radius, y1,
+            x1 + radius, y1,
+            x2 - radius, y1,
+            x2 - radius, y1,
+            x2, y1,
+            x2, y1 + radius,
+            x2, y1 + radius,
+            x2, y2 - radius,
+            x2, y2 - radius,
+            x2, y2,
+            x2 - radius, y2,
+            x2 - radius, y2,
+            x1 + radius, y2,
+            x1 + radius, y2,
+            x1, y2,
+            x1, y2 - radius,
+            x1, y2 - radius,
+            x1, y1 + radius,
+            x1, y1 + radius,
+            x1, y1,
+        )
+
+    def get(self, message: str, font: any, label: tk.Label) -> TooltipBubble:
+        """The bubble of a message, measured on `label` the first time.
+
+        The label must already show the message in the font. Tk works out the size a label asks
+        for as soon as it is configured, so measuring it needs no layout pass.
+        """
+        key = (message, font)
+        bubble = self._bubbles.get(key)
+        if bubble is not None:
+            self.hits += 1
+            return bubble
+        self.misses += 1
+        width = label.winfo_reqwidth() + TooltipBubbles.PADDING
+        bubble = TooltipBubble(
+            width,
+            TooltipBubbles.HEIGHT,
+            TooltipBubbles.get_rounded_rect_points(0, 0, width, TooltipBubbles.HEIGHT, TooltipBubbles.RADIUS),
+        )
+        self._bubbles[key] = bubble
+        return bubble
+
+    def get_stats(self) -> Dict[str, int]:
+        return {"bubbles": len(self._bubbles), "hits": self.hits, "misses": self.misses}
+
+    def __len__(self) -> int:
+        return len(self._bubbles)
+
+    def __repr__(self):
+        return f"<TooltipBubbles: {len(self._bubbles)} bubbles, {self.hits} hits, {self.misses} misses>"
@@ -0,0 +1,96 @@
+"""Resident memory of a process, split into what it shares with other processes and what only it
+holds, so the cost of running one more pet process can be told apart from pages it maps in common
+with the others, ie a sprite pack.
+"""
+import os
+import sys
+from typing import Dict
+
+
+def get_process_memory(pid: int = None) -> Dict[str, int]:
+    """Resident memory of a process in bytes
+
+    Args:
+        pid (int, optional): Process to look at. Defaults to this process.
+
+    Returns:
+        Dict[str, int]: "rss", and where the OS tells them, "shared" (pages also mapped by other
+            processes), "private" (pages only this process has, what it adds over the others) and
+            "pss" (private plus its fair part of the shared pages). Empty if the OS is not supported.
+    """
+    pid = os.getpid() if pid is None else pid
+    if sys.platform == "win32":
+        return _get_windows_process_memory(pid)
+    if os.path.isfile(f"/proc/{pid}/smaps_rollup"):
+        return _get_linux_process_memory(pid)
+    return {}
+
+
+def _get_linux_process_memory(pid: int) -> Dict[str, int]:
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            name, _, value = line.partition(":")
+            parts = value.split()
+            if len(parts) == 2 and parts[1] == "kB":
+                fields[name] = int(parts[0]) * 1024
+    return {
+        "rss": fields.get("Rss", 0),
+        "pss": fields.get("Pss", 0),
+        "shared": fields.get("Shared_Clean", 0) + fields.get("Shared_Dirty", 0),
+        "private": fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0),
+    }
+
+
+def _get_windows_process_memory(pid: int) -> Dict[str, int]:
+    import ctypes
+    from ctypes import wintypes
+
+    class PROCESS_MEMORY_COUNTERS_EX(ctypes.Structure):
+        _fields_ = [
+            ("cb", wintypes.DWORD),
+            ("PageFaultCount", wintypes.DWORD),
+            ("PeakWorkingSetSize", ctypes.c_size_t),
+            ("WorkingSetSize", ctypes.c_size_t),
+            ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+            ("PagefileUsage", ctypes.c_size_t),
+            ("PeakPagefileUsage", ctypes.c_size_t),
+            ("PrivateUsage", ctypes.c_size_t),
+        ]
+
+    PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+    kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+    psapi = ctypes.WinDLL("psapi", use_last_error=True)
+    kernel32.OpenProcess.restype = wintypes.HANDLE
+    process = kernel32.OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+    if not process:
+        return {}
+    try:
+        counters = PROCESS_MEMORY_COUNTERS_EX()
+        counters.cb = ctypes.sizeof(counters)
+        if not psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+            return {}
+        # The private commit charge includes pages that are not resident, but it is the
+        # closest to what the process adds on top of the pages it shares
+        return {
+            "rss": counters.WorkingSetSize,
+            "private": counters.PrivateUsage,
+            "shared": max(counters.WorkingSetSize - counters.PrivateUsage, 0),
+        }
+    finally:
+        kernel32.CloseHandle(process)
+
+
+def report_process_memory(pid: int = None) -> str:
+    memory = get_process_memory(pid)
+    if not memory:
+        return "Process memory: unknown on this platform"
+    parts = [f"{memory['rss'] / 1024 / 1024:.1f}MB resident"]
+    if "shared" in memory:
+        parts.append(f"{memory['shared'] / 1024 / 1024:.1f}MB shared with other processes")
+    if "private" in memory:
+        parts.append(f"{memory['private'] / 1024 / 1024:.1f}MB private")
+    return f"Process memory: {', '.join(parts)}"
@@ -0,0 +1,3 @@
+from .headless import HeadlessImage, HeadlessToplevel, HeadlessWidget, HeadlessWindow, VirtualClock, headless_toolkit
+from .trace import Trace
+from .engine import Simulation
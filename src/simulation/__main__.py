@@ -0,0 +1,67 @@
+"""Runs a pet without a display on a simulated clock and reports what it did.
+
+Run from the project root, ie to simulate an hour of totoro:
+    python -m src.simulation totoro --seconds 3600 [--seed 0] [--trace trace.jsonl]
+or on two monitors side by side, the first one the primary:
+    python -m src.simulation totoro --monitors 1920x1080+0+0 1280x1024+1920+0
+"""
+import argparse
+import json
+import re
+import time
+from src.animation import FrameCache
+from src.config_reader import load_config
+from src.window_utils import Monitor
+from .engine import Simulation
+
+
+def parse_monitor(geometry: str) -> Monitor:
+    """A monitor from a geometry such as 1920x1080+0+0, offsets may be negative: 1280x1024+-1280+0"""
+    match = re.fullmatch(r"(\d+)x(\d+)\+(-?\d+)\+(-?\d+)", geometry)
+    if match is None:
+        raise argparse.ArgumentTypeError(f"'{geometry}' is not a monitor geometry like 1920x1080+0+0")
+    width, height, x, y = map(int, match.groups())
+    return Monitor(x, y, width, height)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("pet_name", nargs="?", default="totoro")
+    parser.add_argument("--seconds", type=float, default=3600, help="simulated seconds to run for")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--screen", type=int, nargs=2, default=(1920, 1080), help="simulated screen size")
+    parser.add_argument(
+        "--monitors", type=parse_monitor, nargs="+", default=None, help="simulated monitors, the first one is the primary"
+    )
+    parser.add_argument("--trace", default=None, help="file to write the trace to, as JSON lines")
+    args = parser.parse_args()
+
+    pet_config = load_config().get_pet(args.pet_name)
+    start = time.perf_counter()
+    simulation = Simulation(
+        args.pet_name,
+        pet_config.target_resolution,
+        screen_resolution=tuple(args.screen),
+        offset=pet_config.offset,
+        seed=args.seed,
+        frame_cache=FrameCache(),
+        monitors=[args.monitors[0]._replace(is_primary=True), *args.monitors[1:]] if args.monitors else None,
+    )
+    loaded = time.perf_counter()
+    trace = simulation.run(args.seconds)
+    elapsed = time.perf_counter() - loaded
+    simulation.close()
+
+    if args.trace is not None:
+        trace.write_jsonl(args.trace)
+    print(json.dumps(trace.summarize(args.seconds), indent=1))
+    print(simulation.pet.power.report())
+    print(simulation.timers.report())
+    print(
+        f"Simulated {args.seconds:.0f}s in {elapsed:.2f}s ({args.seconds / max(elapsed, 1e-9):.0f}x), "
+        f"loading took {loaded - start:.2f}s, {len(trace)} events, digest {trace.digest()}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+import random
+from typing import List, Tuple
+from src.animation import Animation, AnimationStates, Animator, FrameCache, FrameInterner, get_animations
+from src.config_watcher import ConfigWatcher
+from src.pets import Pet
+from src.window_utils import Canvas, Monitor, MonitorTopology, TimerService, WindowEdgeIndex
+from src.window_utils.active_window import FakeActiveWindowBackend
+from src.window_utils.window_list import FakeWindowListBackend
+from .headless import HeadlessImage, HeadlessWidget, HeadlessWindow, VirtualClock, headless_toolkit
+from .trace import Trace
+
+
+class Simulation:
+    """Runs a pet without a display, on a virtual clock, as fast as the pet's logic allows.
+
+    The pet, its animator, movement, state machine, timers and power modes are the real ones,
+    only the window and widgets are headless stand ins and the time is simulated. Everything
+    the pet does ends up in `trace`. The random state transitions are seeded, so the same seed
+    and settings always give the same trace.
+    """
+
+    clock: VirtualClock
+    window: HeadlessWindow
+    timers: TimerService
+    active_window: FakeActiveWindowBackend
+    """Move the focus around with this to simulate the user switching applications"""
+    monitors: MonitorTopology
+    """The simulated monitors when given a layout, change it with `set_monitors`"""
+    windows: FakeWindowListBackend
+    """Open, move and close other windows with this for the pet to walk on, if it may"""
+    config_watcher: ConfigWatcher
+    """Polls the config.xml as the running pet does, changes are not applied"""
+    pet: Pet
+    trace: Trace
+
+    def __init__(
+        self,
+        pet_name: str,
+        target_resolution: Tuple[int, int],
+        screen_resolution: Tuple[int, int] = (1920, 1080),
+        offset: int = 0,
+        seed: int = 0,
+        frame_cache: FrameCache = None,
+        use_sprite_pack: bool = True,
+        monitors: List[Monitor] = None,
+        walk_on_windows: bool = False,
+    ):
+        """
+        Args:
+            pet_name (str): name of the pet, ie the name of folder its animations are in
+            target_resolution (Tuple[int, int]): target size of the animations
+            screen_resolution (Tuple[int, int], optional): size of the simulated screen. Defaults to (1920, 1080).
+            offset (int, optional): space kept free at the bottom of the screen, ie for the taskbar. Defaults to 0.
+            seed (int, optional): seed for the random state transitions and messages. Defaults to 0.
+            frame_cache (FrameCache, optional): cache of decoded frames to load from and fill. Defaults to none.
+            use_sprite_pack (bool, optional): load the pet from its sprite pack if up to date. Defaults to True.
+            monitors (List[Monitor], optional): layout of several simulated monitors, the pet starts on the
+                primary one. Defaults to a single screen of `screen_resolution`.
+            walk_on_windows (bool, optional): whether the pet can stand on the windows in `windows`. Defaults to False.
+        """
+        random.seed(seed)
+        self.clock = VirtualClock()
+        self.window = HeadlessWindow(self.clock, title=pet_name)
+        label = HeadlessWidget(self.window)
+        self.monitors = None
+        origin = (0, 0)
+        if monitors is not None:
+            self._monitor_layout = list(monitors)
+            self.monitors = MonitorTopology(lambda: self._monitor_layout)
+            primary = self.monitors.get_primary()
+            screen_resolution = (primary.width, primary.height)
+            origin = (primary.x, primary.y)
+        resolution = {"width": screen_resolution[0], "height": screen_resolution[1] - offset}
+        canvas = Canvas(self.window, label, resolution, toolkit=headless_toolkit)
+
+        self._photo_image = Animation.photo_image
+        Animation.photo_image = HeadlessImage
+        self.animations = get_animations(
+            pet_name,
+            target_resolution,
+            False,
+            frame_cache=frame_cache,
+            frame_interner=FrameInterner(),
+            use_sprite_pack=use_sprite_pack,
+        )
+        animator = Animator(state=AnimationStates.IDLE, frame_number=0, animations=self.animations)
+
+        self.trace = Trace()
+        self.timers = TimerService(self.window, clock=self.clock)
+        self.active_window = FakeActiveWindowBackend()
+        self.windows = FakeWindowListBackend()
+        self.pet = Pet(
+            origin[0] + int(resolution["width"] / 2),
+            origin[1] + int(resolution["height"]),
+            canvas=canvas,
+            animator=animator,
+            timers=self.timers,
+            active_window=self.active_window,
+            monitors=self.monitors,
+            # Without a layout the offset is already taken off the canvas' resolution
+            offset=offset if monitors is not None else 0,
+            window_edges=WindowEdgeIndex(self.windows) if walk_on_windows else None,
+        )
+        # Poll the config and the monitors like the pet does, so their wakeups count
+        self.config_watcher = ConfigWatcher(self.timers)
+        self.config_watcher.start()
+        self.pet.monitors.start(self.timers)
+        self._last_state = None
+        self._last_power_mode = None
+        label.on_configure = self._on_label_configured
+        self.window.on_geometry = self._on_geometry
+        self.pet.tooltip.bind("<Map>", self._on_tooltip_mapped)
+        self.pet.tooltip.bind("<Unmap>", lambda event: self.trace.add(self.clock.now, "tooltip", message=None))
+        self._observe()
+
+    def run(self, seconds: float) -> Trace:
+        """Simulate the given number of seconds, running every timer that comes due in them
+
+        Returns:
+            Trace: the trace of the whole simulation so far
+        """
+        if not self.pet.scheduler.is_running:
+            self.pet.scheduler.start()
+        end = self.clock.now + seconds
+        while True:
+            due = self.window.get_next_timer()
+            if due is None or due > end:
+                break
+            self.window.run_next_timer()
+            self._observe()
+        self.clock.advance_to(end)
+        return self.trace
+
+    def set_monitors(self, monitors: List[Monitor]):
+        """Change the layout of the simulated monitors, as when one is plugged in or taken away"""
+        if self.monitors is None:
+            raise Exception("The simulation was not started with a layout of monitors")
+        self._monitor_layout = list(monitors)
+        self.monitors.refresh()
+
+    def hide(self):
+        """Withdraw the window, as when the pet is sent to the tray"""
+        self.window.withdraw()
+        self._observe()
+
+    def show(self):
+        self.window.deiconify()
+        self._observe()
+
+    def close(self):
+        """Stop the pet and go back to making tkinter frames"""
+        self.pet.close()
+        self.config_watcher.stop()
+        self.pet.monitors.stop()
+        self.timers.stop()
+        self.animations.close()
+        Animation.photo_image = self._photo_image
+
+    def _observe(self):
+        """Record changes that do not go through a widget call"""
+        if self.pet.animator.state != self._last_state:
+            self._last_state = self.pet.animator.state
+            self.trace.add(self.clock.now, "state", state=self._last_state.name)
+        if self.pet.power.mode != self._last_power_mode:
+            self._last_power_mode = self.pet.power.mode
+            self.trace.add(self.clock.now, "power", mode=self._last_power_mode.value)
+
+    def _on_label_configured(self, options):
+        if "image" in options:
+            self._observe()
+            self.trace.add(
+                self.clock.now, "frame", state=self.pet.animator.state.name, frame=self.pet.animator.frame_number
+            )
+
+    def _on_geometry(self, size, position):
+        self.trace.add(self.clock.now, "move", x=position[0], y=position[1], width=size[0], height=size[1])
+
+    def _on_tooltip_mapped(self, event):
+        self.trace.add(self.clock.now, "tooltip", message=self.pet.tooltip_label.cget("text"))
+
+    def __repr__(self):
+        return f"<Simulation: {self.clock.now:.1f}s simulated, {len(self.trace)} events>"
@@ -0,0 +1,227 @@
+"""Stand ins for the tkinter window and widgets a pet uses, so pets can run without a display.
+
+They implement the calls the pets make and record the state those calls would leave the real
+widgets in. Timers run on a VirtualClock instead of the tkinter event loop.
+"""
+import heapq
+import itertools
+import re
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Tuple
+from PIL import Image
+
+
+class VirtualClock:
+    """A clock that only moves when told to, in seconds. Call it to read the time, like time.monotonic"""
+
+    now: float
+
+    def __init__(self, start: float = 0):
+        self.now = start
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance_to(self, time: float):
+        self.now = max(self.now, time)
+
+    def __repr__(self):
+        return f"<VirtualClock: {self.now:.3f}s>"
+
+
+class HeadlessImage:
+    """Frame standing in for a tkinter photo image, only keeps the size of the image"""
+
+    def __init__(self, image: Image.Image):
+        self._size = image.size
+
+    def width(self) -> int:
+        return self._size[0]
+
+    def height(self) -> int:
+        return self._size[1]
+
+    def __repr__(self):
+        return f"<HeadlessImage: {self._size[0]}x{self._size[1]}>"
+
+
+class HeadlessWidget:
+    """Records the options and drawing calls of a tkinter widget"""
+
+    def __init__(self, master=None, **options):
+        self.master = master
+        self.options: Dict[str, any] = dict(options)
+        self.items = 0
+        self.mapped = True
+        self.on_configure: Callable[[Dict[str, any]], None] = None
+        """Called with the changed options whenever the widget is configured"""
+        self._bindings: Dict[str, List[Callable]] = {}
+
+    def configure(self, **options):
+        self.options.update(options)
+        if self.on_configure is not None:
+            self.on_configure(options)
+
+    config = configure
+
+    def cget(self, option: str):
+        return self.options.get(option)
+
+    def pack(self, **options):
+        pass
+
+    def place(self, **options):
+        pass
+
+    def bind(self, sequence: str, func: Callable, add: str = None):
+        self._bindings[sequence] = self._bindings.get(sequence, []) + [func] if add else [func]
+
+    def delete(self, *items):
+        self.items = 0
+
+    def create_polygon(self, *points, **options) -> int:
+        self.items += 1
+        return self.items
+
+    create_image = create_polygon
+    create_text = create_polygon
+
+    def coords(self, item: int, *points):
+        pass
+
+    def winfo_reqwidth(self) -> int:
+        # Roughly what an 8pt font needs per character
+        return len(str(self.options.get("text", ""))) * 6
+
+    def winfo_reqheight(self) -> int:
+        return 14
+
+    def winfo_viewable(self) -> bool:
+        widget = self
+        while widget is not None:
+            if not widget.mapped:
+                return False
+            widget = widget.master
+        return True
+
+    def update_idletasks(self):
+        pass
+
+    def destroy(self):
+        self.mapped = False
+        self._fire("<Destroy>")
+        self._bindings = {}
+
+    def _fire(self, sequence: str, **fields):
+        for handler in self._bindings.get(sequence, []):
+            handler(SimpleNamespace(widget=self, **fields))
+
+
+class HeadlessToplevel(HeadlessWidget):
+    """Records the geometry and window manager attributes of a tkinter toplevel window"""
+
+    GEOMETRY = re.compile(r"^(?:(\d+)x(\d+))?(?:\+(-?\d+)\+(-?\d+))?$")
+
+    def __init__(self, master=None, **options):
+        super().__init__(master, **options)
+        self.size: Tuple[int, int] = (1, 1)
+        self.position: Tuple[int, int] = (0, 0)
+        self.attributes_: Dict[str, any] = {"-alpha": 1.0, "-topmost": False}
+        self._title = ""
+        self.on_geometry: Callable[[Tuple[int, int], Tuple[int, int]], None] = None
+        """Called with the size and position whenever the geometry changes"""
+
+    def geometry(self, geometry: str = None):
+        if geometry is None:
+            return f"{self.size[0]}x{self.size[1]}+{self.position[0]}+{self.position[1]}"
+        match = HeadlessToplevel.GEOMETRY.match(geometry)
+        if match is None:
+            raise Exception(f'Bad geometry "{geometry}"')
+        width, height, x, y = match.groups()
+        if width is not None:
+            self.size = (int(width), int(height))
+        if x is not None:
+            self.position = (int(x), int(y))
+        if self.on_geometry is not None:
+            self.on_geometry(self.size, self.position)
+
+    def wm_attributes(self, *args):
+        if len(args) == 1:
+            return self.attributes_.get(args[0])
+        for option, value in zip(args[::2], args[1::2]):
+            self.attributes_[option] = value
+
+    attributes = wm_attributes
+
+    def title(self, title: str = None):
+        if title is None:
+            return self._title
+        self._title = title
+
+    def wm_overrideredirect(self, value: bool = None):
+        self.options["overrideredirect"] = value
+
+    overrideredirect = wm_overrideredirect
+
+    def withdraw(self):
+        if self.mapped:
+            self.mapped = False
+            self._fire("<Unmap>")
+
+    def deiconify(self):
+        if not self.mapped:
+            self.mapped = True
+            self._fire("<Map>")
+
+    wm_deiconify = deiconify
+
+    def state(self) -> str:
+        return "normal" if self.mapped else "withdrawn"
+
+
+class HeadlessWindow(HeadlessToplevel):
+    """Stands in for the tk.Tk root window, its timers run on a VirtualClock"""
+
+    def __init__(self, clock: VirtualClock, title: str = "Pet"):
+        super().__init__()
+        self.clock = clock
+        self._title = title
+        self._timers: List[Tuple[float, int, Callable, tuple]] = []
+        self._cancelled = set()
+        self._ids = itertools.count(1)
+        self.has_quit = False
+        """Whether `quit` was called, which would end the event loop"""
+
+    def after(self, ms: int, func: Callable = None, *args):
+        timer_id = next(self._ids)
+        heapq.heappush(self._timers, (self.clock.now + ms / 1000, timer_id, func, args))
+        return f"after#{timer_id}"
+
+    def after_cancel(self, timer_id: str):
+        self._cancelled.add(int(timer_id.split("#")[1]))
+
+    def get_next_timer(self) -> float:
+        """Time the next pending timer is due at, None if there are none"""
+        while self._timers and self._timers[0][1] in self._cancelled:
+            self._cancelled.discard(heapq.heappop(self._timers)[1])
+        return self._timers[0][0] if self._timers else None
+
+    def run_next_timer(self):
+        """Move the clock to the next pending timer and run it"""
+        due = self.get_next_timer()
+        if due is None:
+            return
+        _, _, func, args = heapq.heappop(self._timers)
+        self.clock.advance_to(due)
+        func(*args)
+
+    def quit(self):
+        self.has_quit = True
+
+    def focus_out(self):
+        """Pretend the window lost the focus"""
+        self._fire("<FocusOut>")
+
+
+headless_toolkit = SimpleNamespace(Toplevel=HeadlessToplevel, Canvas=HeadlessWidget, Label=HeadlessWidget)
+"""Stands in for the tkinter module when making extra widgets, see Canvas.toolkit"""
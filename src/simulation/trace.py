@@ -0,0 +1,92 @@
+import hashlib
+import json
+from collections import Counter, defaultdict
+from typing import Dict, Iterator, List
+
+
+class Trace:
+    """Everything observable a simulated pet did, in order, as events.
+
+    Every event has the simulated time `t` in seconds and a `type`:
+        - "state": the animation state changed to `state`
+        - "frame": the window started showing frame `frame` of `state`
+        - "move": the window moved to `x`, `y` (and has size `width`, `height`)
+        - "tooltip": the tooltip started showing `message`, or was hidden when it is None
+        - "power": the pet switched to power mode `mode`
+    """
+
+    events: List[Dict[str, any]]
+
+    def __init__(self):
+        self.events = []
+
+    def add(self, time: float, event_type: str, **fields):
+        self.events.append({"t": round(time, 6), "type": event_type, **fields})
+
+    def __iter__(self) -> Iterator[Dict[str, any]]:
+        return iter(self.events)
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def of_type(self, event_type: str) -> List[Dict[str, any]]:
+        return [event for event in self.events if event["type"] == event_type]
+
+    def write_jsonl(self, path: str):
+        """Write the events as one JSON object per line"""
+        with open(path, "w", encoding="utf-8") as f:
+            for event in self.events:
+                f.write(json.dumps(event, ensure_ascii=False))
+                f.write("\n")
+
+    @staticmethod
+    def read_jsonl(path: str) -> "Trace":
+        trace = Trace()
+        with open(path, encoding="utf-8") as f:
+            trace.events = [json.loads(line) for line in f if line.strip()]
+        return trace
+
+    def digest(self) -> str:
+        """Hash of all events, two runs with the same seed and settings must give the same digest"""
+        sha1 = hashlib.sha1()
+        for event in self.events:
+            sha1.update(json.dumps(event, sort_keys=True).encode("utf-8"))
+        return sha1.hexdigest()
+
+    def summarize(self, duration: float) -> Dict[str, any]:
+        """Time spent per state, transition counts, frames shown and distance moved
+
+        Args:
+            duration (float): Simulated seconds the trace covers.
+        """
+        seconds_in_state = defaultdict(float)
+        transitions = Counter()
+        state, since = None, 0
+        for event in self.of_type("state"):
+            if state is not None:
+                seconds_in_state[state] += event["t"] - since
+                transitions[f"{state}->{event['state']}"] += 1
+            state, since = event["state"], event["t"]
+        if state is not None:
+            seconds_in_state[state] += duration - since
+
+        distance = 0
+        moves = self.of_type("move")
+        for previous, move in zip(moves, moves[1:]):
+            distance += abs(move["x"] - previous["x"]) + abs(move["y"] - previous["y"])
+
+        return {
+            "seconds": duration,
+            "seconds_in_state": {
+                state: round(seconds, 3)
+                for state, seconds in sorted(seconds_in_state.items(), key=lambda item: -item[1])
+            },
+            "transitions": dict(transitions.most_common()),
+            "frames_shown": len(self.of_type("frame")),
+            "moves": len(moves),
+            "distance": distance,
+            "tooltips": sum(1 for event in self.of_type("tooltip") if event["message"] is not None),
+        }
+
+    def __repr__(self):
+        return f"<Trace: {len(self.events)} events>"
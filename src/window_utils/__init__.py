@@ -1,3 +1,8 @@
-from .configure_window import configure_window
+from .configure_window import configure_window, set_bg_color
 from .window_visability import show_window
 from .canvas import Canvas
+from .timer_service import TimerJob, TimerService
+from .tick_scheduler import TickScheduler
+from .tween import Tween
+from .monitors import Monitor, MonitorTopology
+from .window_edges import WindowEdgeIndex
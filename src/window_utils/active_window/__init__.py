@@ -0,0 +1,28 @@
+import os
+import sys
+import tkinter as tk
+from src import logger
+from .backend import ActiveWindow, ActiveWindowBackend, NO_ACTIVE_WINDOW
+from .fake import FakeActiveWindowBackend
+
+
+def get_active_window_backend(window: tk.Misc) -> ActiveWindowBackend:
+    """The active window backend for the platform this runs on. Falls back to a fake backend,
+    which always reports the desktop as active, where there is none.
+
+    Args:
+        window (tk.Misc): Any tkinter widget, backends receive their events through its event loop.
+    """
+    if sys.platform == "win32":
+        from .windows import WindowsActiveWindowBackend
+
+        return WindowsActiveWindowBackend()
+    if os.environ.get("DISPLAY"):
+        try:
+            from .x11 import X11ActiveWindowBackend
+
+            return X11ActiveWindowBackend(window)
+        except Exception as e:
+            logger.warning(f"Cannot follow the active window through X11: {str(e)}")
+    logger.info("Cannot tell the active window on this platform, the desktop is assumed to always be active")
+    return FakeActiveWindowBackend()
@@ -0,0 +1,58 @@
+from typing import Callable, List, NamedTuple, Optional
+
+
+class ActiveWindow(NamedTuple):
+    """The window that has the focus, as reported by an ActiveWindowBackend"""
+
+    handle: int
+    """Native id of the window, 0 when no window has the focus"""
+    class_name: str
+    title: str
+    is_desktop: bool
+    """Whether the window is the desktop itself or part of the shell around it, ie the taskbar"""
+
+
+NO_ACTIVE_WINDOW = ActiveWindow(0, "", "", True)
+"""Nothing has the focus, which means the desktop is showing"""
+
+
+class ActiveWindowBackend:
+    """Tells which window has the focus, and calls listeners whenever that changes.
+
+    Implementations must be event driven rather than polling, and call their listeners on the
+    tkinter thread.
+    """
+
+    def __init__(self):
+        self._listeners: List[Callable[[ActiveWindow], None]] = []
+        self._active_window = NO_ACTIVE_WINDOW
+
+    def start(self):
+        """Start listening to focus changes"""
+
+    def stop(self):
+        """Stop listening to focus changes"""
+
+    def get_active_window(self) -> ActiveWindow:
+        return self._active_window
+
+    def add_listener(self, listener: Callable[[ActiveWindow], None]):
+        """Call `listener` with the new active window whenever the focus moves to another window"""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[ActiveWindow], None]):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _set_active_window(self, active_window: Optional[ActiveWindow]):
+        """Record the newly active window and tell the listeners if it changed"""
+        if active_window is None:
+            active_window = NO_ACTIVE_WINDOW
+        if active_window == self._active_window:
+            return
+        self._active_window = active_window
+        for listener in list(self._listeners):
+            listener(active_window)
+
+    def __repr__(self):
+        return f"<{type(self).__name__}: {self._active_window.class_name or 'desktop'} active>"
@@ -0,0 +1,25 @@
+import zlib
+from .backend import ActiveWindow, ActiveWindowBackend
+
+
+class FakeActiveWindowBackend(ActiveWindowBackend):
+    """Keeps the active window in memory, for tests, simulations and platforms without a backend.
+    Starts with the desktop active.
+    """
+
+    def set_active_window(self, title: str = "", class_name: str = "", is_desktop: bool = False, handle: int = None):
+        """Pretend the focus moved to a window, telling the listeners about it
+
+        Args:
+            title (str, optional): Title of the window. Defaults to "".
+            class_name (str, optional): Class of the window. Defaults to "".
+            is_desktop (bool, optional): Whether the window is the desktop. Defaults to False.
+            handle (int, optional): Id of the window. Defaults to one derived from the title and class.
+        """
+        if handle is None:
+            handle = zlib.crc32(f"{class_name}\n{title}".encode("utf-8"))
+        self._set_active_window(ActiveWindow(handle, class_name, title, is_desktop))
+
+    def set_desktop_active(self):
+        """Pretend every window lost the focus, showing the desktop"""
+        self._set_active_window(None)
@@ -0,0 +1,100 @@
+import ctypes
+import ctypes.wintypes
+from src import logger
+from .backend import ActiveWindow, ActiveWindowBackend
+
+DESKTOP_CLASSES = frozenset(
+    {
+        "Progman",                      # Program Manager - Main desktop on older Windows (XP, 7, 10)
+        "WorkerW",                      # Wallpaper layer - Often appears when desktop is visible (Windows 7, 10)
+        "SysListView32",                # List of icons on desktop (child of Progman)
+        "Shell_TrayWnd",                # Main taskbar (Start menu, system tray)
+        "Static",                       # Hidden window when all apps are minimized
+        "DesktopWindowXamlSource",      # Desktop on Windows 11 (XAML-based)
+        "NotifyIconOverflowWindow",     # System tray overflow (when clicking hidden icons in tray)
+        "Windows.UI.Core.CoreWindow",   # Core UI window on Windows 10/11 (UWP-related desktop components)
+        "Shell_SecondaryTrayWnd",       # Secondary taskbar on multi-monitor setups (Windows 10/11)
+        "DV2ControlHost",               # Desktop View control host (related to Start menu on Windows 7/8)
+        "Shell_DLL_DefView",            # Default view of desktop (child of Progman on some systems)
+        "MultitaskingViewFrame",        # Task View or Alt+Tab interface on Windows 10/11
+        "TaskListThumbnailWnd",         # Thumbnail preview when hovering over taskbar
+        "TrayNotifyWnd",                # System tray notification area
+        "TrayClockWClass",              # Clock in system tray
+        "ReBarWindow32",                # Toolbar in taskbar
+        "CiceroUIWndFrame",             # Input method editor (IME) window (may appear on desktop)
+        "ApplicationManager_DesktopShellWindow",  # Desktop shell on Windows 11 (less common)
+        "Start",                        # Start menu on Windows 10/11 when opened
+        "ExplorerWClass",               # Explorer window (may relate to desktop on some configurations)
+        "CabinetWClass",                # File Explorer window (if Explorer displays desktop)
+        "ApplicationFrameWindow",       # UWP app frame (Windows 11 shell components)
+    }
+)
+"""Classes of the windows that make up the desktop and the shell around it"""
+
+EVENT_SYSTEM_FOREGROUND = 0x0003
+WINEVENT_OUTOFCONTEXT = 0x0000
+WINEVENT_SKIPOWNPROCESS = 0x0002
+
+WinEventProc = ctypes.WINFUNCTYPE(
+    None,
+    ctypes.wintypes.HANDLE,
+    ctypes.wintypes.DWORD,
+    ctypes.wintypes.HWND,
+    ctypes.wintypes.LONG,
+    ctypes.wintypes.LONG,
+    ctypes.wintypes.DWORD,
+    ctypes.wintypes.DWORD,
+)
+
+
+class WindowsActiveWindowBackend(ActiveWindowBackend):
+    """Listens to EVENT_SYSTEM_FOREGROUND through SetWinEventHook.
+
+    The hook is out of context, so Windows delivers the events through the message queue of
+    the thread that set it. Started from the tkinter thread, tkinter's own event loop pumps
+    them and the listeners run on the tkinter thread, without any polling.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._user32 = ctypes.windll.user32
+        self._hook = None
+        # Keep a reference, the hook would call into freed memory otherwise
+        self._callback = WinEventProc(self._on_win_event)
+
+    def start(self):
+        if self._hook is not None:
+            return
+        self._hook = self._user32.SetWinEventHook(
+            EVENT_SYSTEM_FOREGROUND,
+            EVENT_SYSTEM_FOREGROUND,
+            0,
+            self._callback,
+            0,
+            0,
+            WINEVENT_OUTOFCONTEXT,
+        )
+        if not self._hook:
+            raise Exception("Could not listen to foreground window changes, SetWinEventHook failed")
+        self._set_active_window(self.describe(self._user32.GetForegroundWindow()))
+
+    def stop(self):
+        if self._hook is not None:
+            self._user32.UnhookWinEvent(self._hook)
+            self._hook = None
+
+    def _on_win_event(self, hook, event, hwnd, id_object, id_child, event_thread, event_time):
+        try:
+            self._set_active_window(self.describe(hwnd))
+        except Exception as e:
+            logger.error(f"Failed to handle foreground window change: {str(e)}")
+
+    def describe(self, hwnd: int) -> ActiveWindow:
+        """Class, title and whether it is part of the desktop of a window"""
+        if not hwnd:
+            return None
+        buffer = ctypes.create_unicode_buffer(256)
+        self._user32.GetClassNameW(hwnd, buffer, len(buffer))
+        class_name = buffer.value
+        self._user32.GetWindowTextW(hwnd, buffer, len(buffer))
+        return ActiveWindow(int(hwnd), class_name, buffer.value, class_name in DESKTOP_CLASSES)
@@ -0,0 +1,87 @@
+import tkinter as tk
+from Xlib import X, Xatom, display, error
+from src import logger
+from .backend import ActiveWindow, ActiveWindowBackend
+
+DESKTOP_WINDOW_TYPES = ("_NET_WM_WINDOW_TYPE_DESKTOP", "_NET_WM_WINDOW_TYPE_DOCK")
+"""Window types that make up the desktop and the panels around it"""
+
+
+class X11ActiveWindowBackend(ActiveWindowBackend):
+    """Listens for changes of the `_NET_ACTIVE_WINDOW` property of the root window.
+
+    The window manager updates that property whenever the focus moves. The connection to the X
+    server is registered as a tkinter file handler, so its events are read on the tkinter thread
+    as soon as they arrive, without any polling or extra threads.
+    """
+
+    window: tk.Misc
+
+    def __init__(self, window: tk.Misc, display_name: str = None):
+        """
+        Args:
+            window (tk.Misc): Any tkinter widget, its event loop reads the X events.
+            display_name (str, optional): X display to connect to. Defaults to $DISPLAY.
+        """
+        super().__init__()
+        self.window = window
+        self._display = display.Display(display_name)
+        self._root = self._display.screen().root
+        self._net_active_window = self._display.intern_atom("_NET_ACTIVE_WINDOW")
+        self._net_wm_name = self._display.intern_atom("_NET_WM_NAME")
+        self._net_wm_window_type = self._display.intern_atom("_NET_WM_WINDOW_TYPE")
+        self._utf8_string = self._display.intern_atom("UTF8_STRING")
+        self._desktop_types = {self._display.intern_atom(name) for name in DESKTOP_WINDOW_TYPES}
+        self._listening = False
+
+    def start(self):
+        if self._listening:
+            return
+        self._root.change_attributes(event_mask=X.PropertyChangeMask)
+        self._display.flush()
+        self.window.tk.createfilehandler(self._display.fileno(), tk.READABLE, self._on_readable)
+        self._listening = True
+        self._set_active_window(self.read_active_window())
+
+    def stop(self):
+        if not self._listening:
+            return
+        self.window.tk.deletefilehandler(self._display.fileno())
+        self._root.change_attributes(event_mask=X.NoEventMask)
+        self._display.flush()
+        self._listening = False
+
+    def _on_readable(self, file, mask):
+        changed = False
+        while self._display.pending_events():
+            event = self._display.next_event()
+            if event.type == X.PropertyNotify and event.atom == self._net_active_window:
+                changed = True
+        if changed:
+            try:
+                self._set_active_window(self.read_active_window())
+            except Exception as e:
+                logger.error(f"Failed to handle active window change: {str(e)}")
+
+    def read_active_window(self) -> ActiveWindow:
+        """Ask the X server which window is active, None when no window is"""
+        prop = self._root.get_full_property(self._net_active_window, X.AnyPropertyType)
+        if prop is None or not prop.value or not prop.value[0]:
+            return None
+        handle = int(prop.value[0])
+        window = self._display.create_resource_object("window", handle)
+        try:
+            wm_class = window.get_wm_class()
+            name = window.get_full_property(self._net_wm_name, self._utf8_string)
+            title = name.value.decode("utf-8", "replace") if name is not None else (window.get_wm_name() or "")
+            window_type = window.get_full_property(self._net_wm_window_type, Xatom.ATOM)
+        except error.BadWindow:
+            # Closed before we got to it, the next change will follow shortly
+            return None
+        types = set(window_type.value) if window_type is not None else set()
+        class_name = wm_class[1] if wm_class else ""
+        return ActiveWindow(handle, class_name, str(title), bool(types & self._desktop_types))
+
+    def close(self):
+        self.stop()
+        self._display.close()
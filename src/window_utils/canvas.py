@@ -9,17 +9,21 @@ class Canvas:
     window: tk.Tk
     label: tk.Label
     resolution: any
+    toolkit: any
+    """Module the widgets are made with, tkinter unless the window is a headless stand in"""
 
-    def __init__(self, window, label, resolution):
+    def __init__(self, window, label, resolution, toolkit=tk):
         """
         Args:
             window (tkinter.Tk)
             label (tkinter.Label)
             resolution (Dict[str, int]): must have "width" and "height" as keys
+            toolkit (optional): provides Toplevel, Canvas and Label for extra widgets. Defaults to tkinter.
         """
         self.window = window
         self.label = label
         self.resolution = resolution
+        self.toolkit = toolkit
 
     def __repr__(self):
         return f"<Canvas:c width {self.resolution['width']}px and height {self.resolution['height']}px>"
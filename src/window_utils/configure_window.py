@@ -11,11 +11,10 @@ def configure_window(
     # We pick a transparent color here for the background
     # ! This should be different for mac as mac os has alpha channel
     # ! so this is not really needed there
-    window.config(highlightbackground=bg_color)
-    label = tk.Label(window, bd=0, bg=bg_color)
+    label = tk.Label(window, bd=0)
     window.overrideredirect(True)
     window.update_idletasks()
-    window.wm_attributes("-transparentcolor", bg_color)
+    set_bg_color(window, label, bg_color)
     label.pack()
 
     # Set on top attribute to True (at least at first) to bring it to the top
@@ -33,3 +32,10 @@ def configure_window(
 
     canvas = Canvas(window, label, resolution)
     return canvas
+
+
+def set_bg_color(window: tk.Tk, label: tk.Label, bg_color: str):
+    """Change the background color of a pet's window, which is keyed out to make it transparent"""
+    window.config(highlightbackground=bg_color)
+    label.config(bg=bg_color)
+    window.wm_attributes("-transparentcolor", bg_color)
@@ -0,0 +1,197 @@
+import tkinter as tk
+from bisect import bisect_right
+from typing import Callable, Dict, List, NamedTuple, Tuple
+from src import logger
+from .timer_service import TimerService
+
+
+class Monitor(NamedTuple):
+    """Rectangle of a monitor on the virtual desktop, in screen coordinates"""
+
+    x: int
+    y: int
+    width: int
+    height: int
+    is_primary: bool = False
+
+    @property
+    def right(self) -> int:
+        return self.x + self.width
+
+    @property
+    def bottom(self) -> int:
+        return self.y + self.height
+
+    def contains(self, x: int, y: int) -> bool:
+        return self.x <= x < self.right and self.y <= y < self.bottom
+
+
+class MonitorTopology:
+    """The monitors pets walk across, kept in a small spatial index so looking up the monitor
+    under a pet on every tick does not ask the display anything.
+
+    The desktop is cut into vertical slabs at every left and right edge of a monitor, and each
+    slab lists the monitors covering it top to bottom, so a lookup is a bisection over the slab
+    edges and a scan of a monitor or two. Monitors side by side, with some height in common, form
+    a row the pet walks along, wrapping around at the ends of the row.
+
+    The monitors are only enumerated again when the display changes. Whether it did is polled
+    cheaply through `get_signature`, ie the size of the screen as tkinter knows it, which
+    tkinter keeps up to date on display changes where the platform tells it about them. As
+    that misses layouts that change without changing the size (and tkinter on X11 never
+    updates it), the monitors are also enumerated again every `FULL_REFRESH_POLLS` polls. Polling
+    pauses while every pet is hidden, and checks right away once one shows again.
+    """
+
+    JOB_NAME = "monitors"
+    POLL_INTERVAL = 2
+    """Seconds between checks of the signature"""
+    FULL_REFRESH_POLLS = 30
+    """Polls after which the monitors are enumerated again even if the signature did not change"""
+
+    monitors: Tuple[Monitor, ...]
+    refreshes: int
+    """Times the monitors were enumerated"""
+
+    def __init__(self, get_monitors: Callable[[], List[Monitor]], get_signature: Callable[[], any] = None):
+        """
+        Args:
+            get_monitors (Callable[[], List[Monitor]]): Enumerates the monitors, the expensive part.
+            get_signature (Callable[[], any], optional): Cheap value that changes along with the display
+                layout. Defaults to only enumerating the monitors every `FULL_REFRESH_POLLS` polls.
+        """
+        self.get_monitors = get_monitors
+        self.get_signature = get_signature
+        self.monitors = ()
+        self.refreshes = 0
+        self._listeners: List[Callable[["MonitorTopology"], None]] = []
+        self._signature = None
+        self._polls = 0
+        self._timers = None
+        self._edges: List[int] = []
+        self._slabs: List[List[Monitor]] = []
+        self._rows: Dict[Monitor, Tuple[int, int]] = {}
+        self.refresh()
+
+    @staticmethod
+    def from_resolution(resolution: Dict[str, int]) -> "MonitorTopology":
+        """A single monitor that never changes, the size of a canvas' resolution"""
+        monitor = Monitor(0, 0, int(resolution["width"]), int(resolution["height"]), True)
+        return MonitorTopology(lambda: [monitor])
+
+    @staticmethod
+    def from_window(window: tk.Misc) -> "MonitorTopology":
+        """The monitors of the display a tkinter window is on"""
+        from screeninfo import get_monitors
+
+        def get_screen_monitors() -> List[Monitor]:
+            return [
+                Monitor(int(monitor.x), int(monitor.y), int(monitor.width), int(monitor.height), bool(monitor.is_primary))
+                for monitor in get_monitors()
+            ]
+
+        return MonitorTopology(
+            get_screen_monitors, lambda: (window.winfo_screenwidth(), window.winfo_screenheight())
+        )
+
+    def add_listener(self, listener: Callable[["MonitorTopology"], None]):
+        """Call `listener` with the topology whenever the monitors changed"""
+        self._listeners.append(listener)
+
+    def start(self, timers: TimerService):
+        """Start following changes of the display on the given timers"""
+        self._timers = timers
+        self._signature = self.get_signature() if self.get_signature is not None else None
+        timers.add(MonitorTopology.JOB_NAME, self.check, MonitorTopology.POLL_INTERVAL, slack=1, only_while_awake=True)
+
+    def stop(self):
+        if self._timers is not None:
+            self._timers.cancel(MonitorTopology.JOB_NAME)
+            self._timers = None
+
+    def check(self):
+        """Enumerate the monitors again if the signature changed, or it has been a while"""
+        self._polls += 1
+        if self.get_signature is not None:
+            signature = self.get_signature()
+            if signature != self._signature:
+                self._signature = signature
+                self.refresh()
+                return
+        if self._polls >= MonitorTopology.FULL_REFRESH_POLLS:
+            self.refresh()
+
+    def refresh(self) -> bool:
+        """Enumerate the monitors and rebuild the index if they changed
+
+        Returns:
+            bool: whether the monitors changed
+        """
+        self._polls = 0
+        self.refreshes += 1
+        try:
+            monitors = tuple(self.get_monitors())
+        except Exception as e:
+            logger.warning(f"Could not enumerate the monitors, keeping the last known ones: {str(e)}")
+            return False
+        if not monitors or monitors == self.monitors:
+            return False
+        previous = self.monitors
+        self.monitors = monitors
+        self.build_index()
+        if previous:
+            logger.info(f"Monitors changed: {', '.join(f'{m.width}x{m.height}+{m.x}+{m.y}' for m in monitors)}")
+            for listener in list(self._listeners):
+                listener(self)
+        return True
+
+    def build_index(self):
+        self._edges = sorted({edge for monitor in self.monitors for edge in (monitor.x, monitor.right)})
+        self._slabs = [
+            sorted((monitor for monitor in self.monitors if monitor.x <= left < monitor.right), key=lambda m: m.y)
+            for left in self._edges[:-1]
+        ]
+        self._rows = {monitor: self._get_row(monitor) for monitor in self.monitors}
+
+    def _get_row(self, monitor: Monitor) -> Tuple[int, int]:
+        """Left and right end of the monitors that continue the given one sideways"""
+        def overlaps(other: Monitor) -> bool:
+            return other.y < monitor.bottom and other.bottom > monitor.y
+
+        left, right = monitor.x, monitor.right
+        extended = True
+        while extended:
+            extended = False
+            for other in self.monitors:
+                if not overlaps(other):
+                    continue
+                if other.x < left <= other.right:
+                    left, extended = other.x, True
+                if other.x <= right < other.right:
+                    right, extended = other.right, True
+        return left, right
+
+    def find(self, x: int, y: int) -> Monitor:
+        """The monitor at a point. Off every monitor, the monitor above or below it, or the nearest one"""
+        slab = bisect_right(self._edges, x) - 1
+        if 0 <= slab < len(self._slabs) and self._slabs[slab]:
+            column = self._slabs[slab]
+            for monitor in column:
+                if monitor.y <= y < monitor.bottom:
+                    return monitor
+            return min(column, key=lambda monitor: max(monitor.y - y, y - monitor.bottom + 1))
+        return min(
+            self.monitors,
+            key=lambda monitor: max(monitor.x - x, x - monitor.right + 1, 0) ** 2
+            + max(monitor.y - y, y - monitor.bottom + 1, 0) ** 2,
+        )
+
+    def get_row(self, monitor: Monitor) -> Tuple[int, int]:
+        """Left and right end of the row of monitors a monitor is in, where pets wrap around"""
+        return self._rows[monitor]
+
+    def get_primary(self) -> Monitor:
+        return next((monitor for monitor in self.monitors if monitor.is_primary), self.monitors[0])
+
+    def __repr__(self):
+        return f"<MonitorTopology: {len(self.monitors)} monitors, {self.refreshes} refreshes>"
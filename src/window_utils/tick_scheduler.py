@@ -0,0 +1,132 @@
+from collections import deque
+from typing import Callable, Deque, Dict
+from .timer_service import TimerJob, TimerService
+
+
+class TickScheduler:
+    """Calls a tick function at the deadlines it asks for, measured on a monotonic clock.
+
+    The tick function gets the seconds since its previous call and returns the seconds until it
+    wants to be called again. As the next deadline is counted from when the tick actually ran,
+    and the tick is told how much time really passed, time spent ticking or waiting on tkinter
+    does not pile up as drift: a late tick just catches up, dropping frames if it has to.
+
+    Ticks run as a job of a TimerService, without slack by default, so other jobs share its
+    wakeups. Pets sharing a TimerService give their ticks some slack, so ticks of different pets
+    that come due close together run in the same wakeup. A tick run early is told the time of
+    its deadline, so it still finds its frame due.
+    """
+
+    JOB_NAME = "tick"
+    SAMPLES = 1000
+    """Number of recent ticks the lateness statistics are computed over"""
+    LATE_THRESHOLD = 0.005
+    """Seconds past its deadline after which a tick counts as late"""
+
+    timers: TimerService
+    tick: Callable[[float], float]
+    name: str
+    """Name of the job on the TimerService"""
+    slack: float
+    ticks: int
+    late_ticks: int
+
+    def __init__(self, timers: TimerService, tick: Callable[[float], float], name: str = JOB_NAME, slack: float = 0):
+        """
+        Args:
+            timers (TimerService): Service to run the ticks from.
+            tick (Callable[[float], float]): Gets the seconds since its last call, returns the seconds until the next.
+            name (str, optional): Name of the job, must differ between schedulers sharing the timers. Defaults to "tick".
+            slack (float, optional): Seconds a tick may run early or late. Defaults to 0.
+        """
+        self.timers = timers
+        self.tick = tick
+        self.name = name
+        self.slack = slack
+        self.ticks = 0
+        self.late_ticks = 0
+        self.max_lateness = 0
+        self._lateness: Deque[float] = deque(maxlen=TickScheduler.SAMPLES)
+        self._last_tick = None
+        self._job: TimerJob = None
+        self._paused = False
+
+    @property
+    def is_running(self) -> bool:
+        return self._job is not None and self.timers.get(self.name) is self._job
+
+    def start(self, delay: float = 0):
+        """Start ticking, the first tick comes after `delay` seconds"""
+        self._last_tick = self.timers.clock()
+        self._job = self.timers.add(self.name, self._run, delay, slack=self.slack, delay=delay)
+        if self._paused:
+            self.timers.pause(self.name)
+
+    def pause(self):
+        """Stop ticking until resumed, without waking the process up in the meantime. Pausing before
+        starting keeps the scheduler paused once started
+        """
+        self._paused = True
+        if self.is_running:
+            self.timers.pause(self.name)
+
+    def resume(self):
+        """Tick right away after a pause. The time spent paused is not passed on to the tick"""
+        self._paused = False
+        if self.is_running and self._job.paused:
+            self._last_tick = self.timers.clock()
+            self.timers.resume(self.name)
+
+    def wake(self):
+        """Tick right away instead of at the deadline the last tick asked for"""
+        if self.is_running and not self._job.paused:
+            self.timers.reschedule(self.name, 0)
+
+    def stop(self):
+        if self.is_running:
+            self.timers.cancel(self.name)
+        self._job = None
+
+    def _run(self) -> float:
+        now = self.timers.clock()
+        lateness = max(now - self._job.deadline, 0)
+        self._lateness.append(lateness)
+        self.max_lateness = max(self.max_lateness, lateness)
+        self.ticks += 1
+        if lateness > TickScheduler.LATE_THRESHOLD:
+            self.late_ticks += 1
+
+        # Run early within the slack, tick as if it was on time, and count the next deadline from there
+        early = max(self._job.deadline - now, 0)
+        delta_time = now + early - self._last_tick
+        self._last_tick = now + early
+        return self.tick(delta_time) + early
+
+    def get_lateness_stats(self) -> Dict[str, float]:
+        """Lateness of recent ticks in seconds: mean, 50th, 95th and 99th percentile and the max ever"""
+        samples = sorted(self._lateness)
+        if not samples:
+            return {"mean": 0, "p50": 0, "p95": 0, "p99": 0, "max": 0}
+
+        def percentile(fraction: float) -> float:
+            return samples[min(int(fraction * len(samples)), len(samples) - 1)]
+
+        return {
+            "mean": sum(samples) / len(samples),
+            "p50": percentile(0.5),
+            "p95": percentile(0.95),
+            "p99": percentile(0.99),
+            "max": self.max_lateness,
+        }
+
+    def report(self) -> str:
+        stats = self.get_lateness_stats()
+        return (
+            f"Tick scheduler: {self.ticks} ticks, {self.late_ticks} late by over "
+            f"{TickScheduler.LATE_THRESHOLD * 1000:.0f}ms, lateness mean {stats['mean'] * 1000:.1f}ms "
+            f"p50 {stats['p50'] * 1000:.1f}ms p95 {stats['p95'] * 1000:.1f}ms p99 {stats['p99'] * 1000:.1f}ms "
+            f"max {stats['max'] * 1000:.1f}ms"
+        )
+
+    def __repr__(self):
+        return f"<TickScheduler: {self.ticks} ticks, {'running' if self.is_running else 'stopped'}>"
@@ -0,0 +1,295 @@
+import math
+import time
+from typing import Callable, Dict, Optional
+import tkinter as tk
+from src import logger
+
+
+class TimerJob:
+    """A job run by the TimerService, see TimerService.add"""
+
+    name: str
+    callback: Callable[[], Optional[float]]
+    interval: float
+    """Seconds between runs"""
+    slack: float
+    """Seconds the job may run early or late, so it can share a wakeup with other jobs"""
+    one_shot: bool
+    deadline: float
+    """When the job is due, on the service's clock"""
+    runs: int
+    errors: int
+    """Runs that raised, the job keeps running on its interval regardless"""
+    paused: bool
+    """Paused jobs stay registered but do not run, nor wake the process up"""
+    only_while_awake: bool
+    """Paused while everything using the service sleeps, see TimerService.set_awake"""
+
+    def __init__(
+        self,
+        name: str,
+        callback: Callable[[], Optional[float]],
+        interval: float,
+        slack: float,
+        one_shot: bool,
+        only_while_awake: bool = False,
+    ):
+        self.name = name
+        self.callback = callback
+        self.interval = interval
+        self.slack = slack
+        self.one_shot = one_shot
+        self.deadline = 0
+        self.runs = 0
+        self.errors = 0
+        self.paused = False
+        self.only_while_awake = only_while_awake
+        self._rescheduled = False
+        self._error = None
+        self._slept = False
+
+    def __repr__(self):
+        kind = "once" if self.one_shot else f"every {self.interval * 1000:.0f}ms"
+        return f"<TimerJob: {self.name} {kind} (±{self.slack * 1000:.0f}ms), ran {self.runs} times>"
+
+
+class TimerService:
+    """Runs every periodic job of the app off a single tkinter timer.
+
+    Instead of each job rescheduling itself with its own `after()`, jobs are registered here with
+    an interval and a slack. The service only ever has one `after()` pending, for the earliest
+    moment a job has to run, and on waking up runs every job that is due within its slack. Jobs
+    with a fixed interval are aligned to multiples of their interval, so jobs with related
+    intervals come due together. Fewer wakeups means less idle CPU and power use.
+
+    A job's callback may return the seconds until it should run next, which also becomes its
+    interval, allowing jobs to adapt how often they run. Returning None keeps the interval. A job
+    that raises is logged and keeps its interval, so one failing job does not stop the others.
+
+    Jobs that only matter while a pet is shown, ie polling the config file, are added with
+    `only_while_awake` and paused once every pet using the service said it sleeps (`set_awake`),
+    so hidden pets do not wake the process up at all.
+    """
+
+    window: tk.Misc
+    wakeups: int
+    """Times the service woke up the process"""
+    jobs_run: int
+
+    def __init__(self, window: tk.Misc, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            window (tk.Misc): Any tkinter widget, used to schedule the wakeups on its event loop.
+            clock (Callable[[], float], optional): Clock in seconds. Defaults to time.monotonic.
+        """
+        self.window = window
+        self.clock = clock
+        self.wakeups = 0
+        self.jobs_run = 0
+        self._jobs: Dict[str, TimerJob] = {}
+        self._epoch = clock()
+        self._wake_at = None
+        self._after_id = None
+        self._awake: Dict[str, bool] = {}
+
+    @property
+    def is_asleep(self) -> bool:
+        """Whether everything that said whether it is awake sleeps"""
+        return bool(self._awake) and not any(self._awake.values())
+
+    def set_awake(self, owner: str, awake: bool):
+        """Tell whether something using the service, ie a pet, is awake. Pauses the jobs added with
+        `only_while_awake` once nothing is, and runs them right away once something wakes up again.
+
+        Args:
+            owner (str): Tells apart what uses the service.
+            awake (bool): Whether it is awake.
+        """
+        was_asleep = self.is_asleep
+        self._awake[owner] = awake
+        if self.is_asleep == was_asleep:
+            return
+        for job in [job for job in self._jobs.values() if job.only_while_awake]:
+            if not was_asleep and not job.paused:
+                job._slept = True
+                self.pause(job.name)
+            elif was_asleep and job._slept:
+                job._slept = False
+                self.resume(job.name)
+
+    def add(
+        self,
+        name: str,
+        callback: Callable[[], Optional[float]],
+        interval: float,
+        slack: float = 0,
+        delay: float = None,
+        one_shot: bool = False,
+        only_while_awake: bool = False,
+    ) -> TimerJob:
+        """Register a job, replacing any job with the same name
+
+        Args:
+            name (str): Identifies the job, to cancel or reschedule it.
+            callback (Callable[[], Optional[float]]): Runs the job, may return the seconds until its next run.
+            interval (float): Seconds between runs, or before the run of a one shot job.
+            slack (float, optional): Seconds the job may run early or late. Defaults to 0.
+            delay (float, optional): Seconds until the first run. Defaults to aligning it to the interval.
+            one_shot (bool, optional): Whether to only run the job once. Defaults to False.
+            only_while_awake (bool, optional): Whether to pause the job while everything sleeps. Defaults to False.
+
+        Returns:
+            TimerJob: the registered job
+        """
+        job = TimerJob(name, callback, interval, slack, one_shot, only_while_awake)
+        if only_while_awake and self.is_asleep:
+            job.paused = job._slept = True
+        now = self.clock()
+        if delay is not None or one_shot:
+            job.deadline = now + (interval if delay is None else delay)
+        else:
+            job.deadline = self._align(now, interval)
+        if name in self._jobs:
+            self._jobs[name]._rescheduled = True
+        self._jobs[name] = job
+        self._schedule()
+        return job
+
+    def call_later(self, name: str, delay: float, callback: Callable[[], None], slack: float = 0) -> TimerJob:
+        """Run a callback once after `delay` seconds, replacing any job with the same name"""
+        return self.add(name, callback, delay, slack=slack, one_shot=True)
+
+    def cancel(self, name: str):
+        job = self._jobs.pop(name, None)
+        if job is not None:
+            job._rescheduled = True
+            self._schedule()
+
+    def get(self, name: str) -> Optional[TimerJob]:
+        return self._jobs.get(name)
+
+    def reschedule(self, name: str, delay: float = 0, interval: float = None):
+        """Move the next run of a job to `delay` seconds from now, optionally changing its interval"""
+        job = self._jobs.get(name)
+        if job is None:
+            return
+        if interval is not None:
+            job.interval = interval
+        job.deadline = self.clock() + delay
+        job._rescheduled = True
+        self._schedule()
+
+    def pause(self, name: str):
+        """Stop running a job until it is resumed"""
+        job = self._jobs.get(name)
+        if job is not None and not job.paused:
+            job.paused = True
+            job._rescheduled = True
+            self._schedule()
+
+    def resume(self, name: str, delay: float = 0):
+        """Run a paused job again, the first time `delay` seconds from now"""
+        job = self._jobs.get(name)
+        if job is not None and job.paused:
+            job.paused = False
+            self.reschedule(name, delay)
+
+    def stop(self):
+        """Cancel every job"""
+        for name in list(self._jobs.keys()):
+            self.cancel(name)
+
+    def _align(self, now: float, interval: float) -> float:
+        """The first multiple of `interval` since the service started that is still to come"""
+        if interval <= 0:
+            return now
+        return self._epoch + math.ceil((now - self._epoch) / interval) * interval
+
+    def _schedule(self):
+        """Make sure a wakeup is pending for the earliest moment a job has to run"""
+        jobs = [job for job in self._jobs.values() if not job.paused]
+        if not jobs:
+            if self._after_id is not None:
+                self.window.after_cancel(self._after_id)
+                self._after_id = None
+                self._wake_at = None
+            return
+
+        # Wake up as late as the least patient job allows, giving the others a chance to join in
+        wake_at = min(job.deadline + job.slack for job in jobs)
+        if self._after_id is not None:
+            if self._wake_at == wake_at:
+                return
+            # Re-arm when the earliest job went away or moved too, a wakeup with nothing to do is a waste
+            self.window.after_cancel(self._after_id)
+        self._wake_at = wake_at
+        # tkinter timers have a resolution of a millisecond, round up so jobs are never early
+        delay_ms = max(math.ceil((wake_at - self.clock()) * 1000), 1)
+        self._after_id = self.window.after(delay_ms, self._run)
+
+    def _run(self):
+        self._after_id = None
+        self._wake_at = None
+        self.wakeups += 1
+        now = self.clock()
+        due = sorted(
+            (job for job in self._jobs.values() if not job.paused and job.deadline - job.slack <= now),
+            key=lambda job: job.deadline,
+        )
+        try:
+            for job in due:
+                if self._jobs.get(job.name) is not job or job.paused:
+                    # Cancelled, replaced or paused by a job that ran before it
+                    continue
+                job._rescheduled = False
+                started = self.clock()
+                job.runs += 1
+                self.jobs_run += 1
+                next_interval = self._run_job(job)
+
+                if self._jobs.get(job.name) is not job or job._rescheduled:
+                    continue
+                if job.one_shot:
+                    del self._jobs[job.name]
+                elif next_interval is not None:
+                    job.interval = next_interval
+                    job.deadline = started + max(next_interval, 0)
+                else:
+                    job.deadline += job.interval
+                    if job.deadline < now:
+                        # Fell behind, skip the runs that were missed and stay aligned
+                        job.deadline = self._align(now, job.interval)
+        finally:
+            # Whatever happened, keep a wakeup pending, or every job would stop for good
+            self._schedule()
+
+    @staticmethod
+    def _run_job(job: TimerJob) -> Optional[float]:
+        """Run a job's callback, logging instead of raising when it fails (once per distinct error)"""
+        try:
+            next_interval = job.callback()
+            job._error = None
+            return next_interval
+        except Exception as e:
+            job.errors += 1
+            if str(e) != job._error:
+                logger.error(f"Timer job {job.name} failed, it keeps running: {type(e).__name__}: {str(e)}")
+            job._error = str(e)
+            return None
+
+    def get_wakeups_per_second(self) -> float:
+        elapsed = self.clock() - self._epoch
+        return self.wakeups / elapsed if elapsed > 0 else 0
+
+    def report(self) -> str:
+        lines = [
+            f"Timer service: {self.wakeups} wakeups ({self.get_wakeups_per_second():.1f}/s) "
+            f"running {self.jobs_run} jobs"
+        ]
+        for job in self._jobs.values():
+            paused = ", paused" if job.paused else ""
+            lines.append(f"    {job.name}: {job.runs} runs, every {job.interval * 1000:.0f}ms{paused}")
+        return "\n".join(lines)
+
+    def __repr__(self):
+        return f"<TimerService: {len(self._jobs)} jobs, {self.wakeups} wakeups>"
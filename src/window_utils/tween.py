@@ -0,0 +1,61 @@
+from typing import Callable
+
+
+class Tween:
+    """Moves a value linearly from `start` to `end` over `duration` seconds, as time is fed to it.
+
+    Nothing is scheduled by the tween itself, whoever owns it advances it from their tick, so
+    running it never blocks the tkinter event loop.
+    """
+
+    start: float
+    end: float
+    duration: float
+    elapsed: float
+    on_done: Callable[[], None]
+    """Called once, by the advance that finishes the tween"""
+
+    def __init__(self, start: float, end: float, duration: float, on_done: Callable[[], None] = None):
+        """
+        Args:
+            start (float): Value at the start.
+            end (float): Value once `duration` has passed.
+            duration (float): Seconds the tween takes.
+            on_done (Callable[[], None], optional): Called once the tween finishes. Defaults to None.
+        """
+        self.start = start
+        self.end = end
+        self.duration = duration
+        self.elapsed = 0
+        self.on_done = on_done
+        self._finished = False
+
+    @property
+    def value(self) -> float:
+        if self.duration <= 0:
+            return self.end
+        progress = min(self.elapsed / self.duration, 1)
+        return self.start + (self.end - self.start) * progress
+
+    @property
+    def is_done(self) -> bool:
+        return self.elapsed >= self.duration
+
+    def advance(self, delta_time: float) -> float:
+        """Move the tween forward and return its new value
+
+        Args:
+            delta_time (float): Seconds since the last advance.
+
+        Returns:
+            float: the value after advancing
+        """
+        self.elapsed += delta_time
+        if self.is_done and not self._finished:
+            self._finished = True
+            if self.on_done is not None:
+                self.on_done()
+        return self.value
+
+    def __repr__(self):
+        return f"<Tween: {self.start} to {self.end} at {self.value:.2f} after {self.elapsed:.2f}/{self.duration:.2f}s>"
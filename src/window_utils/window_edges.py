@@ -0,0 +1,91 @@
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional, Tuple
+from .window_list import WindowListBackend, WindowRect
+
+
+class WindowEdgeIndex:
+    """Top edges of the other windows, which pets can stand on and walk along.
+
+    The desktop is cut into columns `COLUMN_WIDTH` pixels wide, and every column keeps the top
+    edges crossing it sorted from top to bottom. Finding the edge a falling pet lands on is a
+    lookup of the column under the pet and a bisection to the part of the column the pet fell
+    through, however many windows there are. The index follows the window list backend, so a
+    window that moves or resizes only updates the columns its edge left and entered.
+
+    Windows are taken to be in front of each other in no particular order, an edge covered by
+    another window can still be stood on.
+    """
+
+    COLUMN_WIDTH = 128
+
+    backend: WindowListBackend
+    updates: int
+    """Changes of windows applied to the index"""
+
+    def __init__(self, backend: WindowListBackend):
+        """
+        Args:
+            backend (WindowListBackend): Tells where the windows are, the index follows its changes.
+        """
+        self.backend = backend
+        self.updates = 0
+        self._edges: Dict[int, WindowRect] = {}
+        self._columns: Dict[int, List[Tuple[int, int]]] = {}
+        """Top edges (y, handle) crossing each column, by column number"""
+        for handle, rect in backend.get_windows().items():
+            self.update(handle, rect)
+        backend.add_listener(self.update)
+
+    def close(self):
+        """Stop following the backend"""
+        self.backend.remove_listener(self.update)
+
+    @staticmethod
+    def get_columns(rect: WindowRect) -> Iterable[int]:
+        return range(rect.x // WindowEdgeIndex.COLUMN_WIDTH, (rect.right - 1) // WindowEdgeIndex.COLUMN_WIDTH + 1)
+
+    def update(self, handle: int, rect: Optional[WindowRect]):
+        """Move the edge of a window, or remove it when the window is gone (rect is None)"""
+        self.updates += 1
+        old = self._edges.pop(handle, None)
+        if old is not None:
+            for column in WindowEdgeIndex.get_columns(old):
+                edges = self._columns[column]
+                del edges[bisect_left(edges, (old.y, handle))]
+                if not edges:
+                    del self._columns[column]
+        if rect is None or rect.width <= 0 or rect.height <= 0:
+            return
+        self._edges[handle] = rect
+        for column in WindowEdgeIndex.get_columns(rect):
+            insort(self._columns.setdefault(column, []), (rect.y, handle))
+
+    def get(self, handle: int) -> Optional[WindowRect]:
+        """Where a window is, None when it is not shown"""
+        return self._edges.get(handle)
+
+    def find_landing(self, x: int, top: int, bottom: int) -> Optional[WindowRect]:
+        """The highest window whose top edge is under `x`, from `top` down to `bottom` (inclusive)
+
+        Args:
+            x (int): where the pet is, horizontally
+            top (int): where the bottom of the pet was
+            bottom (int): where the bottom of the pet is now
+        """
+        edges = self._columns.get(x // WindowEdgeIndex.COLUMN_WIDTH)
+        if not edges:
+            return None
+        for index in range(bisect_left(edges, (top, -1)), len(edges)):
+            y, handle = edges[index]
+            if y > bottom:
+                break
+            rect = self._edges[handle]
+            if rect.x <= x < rect.right:
+                return rect
+        return None
+
+    def __len__(self) -> int:
+        return len(self._edges)
+
+    def __repr__(self):
+        return f"<WindowEdgeIndex: {len(self._edges)} windows in {len(self._columns)} columns, {self.updates} updates>"
@@ -0,0 +1,24 @@
+import os
+import sys
+import tkinter as tk
+from src import logger
+from .backend import WindowListBackend, WindowRect
+from .fake import FakeWindowListBackend
+
+
+def get_window_list_backend(window: tk.Misc) -> WindowListBackend:
+    """The window list backend for the platform this runs on. Falls back to a fake backend,
+    which never reports any windows, where there is none.
+
+    Args:
+        window (tk.Misc): Any tkinter widget, backends receive their events through its event loop.
+    """
+    if sys.platform != "win32" and os.environ.get("DISPLAY"):
+        try:
+            from .x11 import X11WindowListBackend
+
+            return X11WindowListBackend(window)
+        except Exception as e:
+            logger.warning(f"Cannot follow the other windows through X11: {str(e)}")
+    logger.info("Cannot follow the other windows on this platform, pets only walk on the bottom of the screen")
+    return FakeWindowListBackend()
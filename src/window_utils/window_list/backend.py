@@ -0,0 +1,65 @@
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+
+class WindowRect(NamedTuple):
+    """Where a top level window is on the desktop, in screen coordinates"""
+
+    handle: int
+    """Native id of the window"""
+    x: int
+    y: int
+    width: int
+    height: int
+
+    @property
+    def right(self) -> int:
+        return self.x + self.width
+
+    @property
+    def bottom(self) -> int:
+        return self.y + self.height
+
+
+class WindowListBackend:
+    """Tells where the visible top level windows of other applications are, and calls listeners
+    with every window that is moved, resized, shown or hidden.
+
+    Implementations must be event driven rather than polling, only report what changed, and
+    call their listeners on the tkinter thread.
+    """
+
+    def __init__(self):
+        self._listeners: List[Callable[[int, Optional[WindowRect]], None]] = []
+        self._windows: Dict[int, WindowRect] = {}
+
+    def start(self):
+        """Start listening to windows being moved, resized, shown and hidden"""
+
+    def stop(self):
+        """Stop listening to changes of the windows"""
+
+    def get_windows(self) -> Dict[int, WindowRect]:
+        """Every visible window, by handle"""
+        return dict(self._windows)
+
+    def add_listener(self, listener: Callable[[int, Optional[WindowRect]], None]):
+        """Call `listener(handle, rect)` whenever a window changed, with None as rect once it is hidden or closed"""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[int, Optional[WindowRect]], None]):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _set_window(self, handle: int, rect: Optional[WindowRect]):
+        """Record where a window is now, None when it is gone, and tell the listeners if that changed"""
+        if rect == self._windows.get(handle):
+            return
+        if rect is None:
+            del self._windows[handle]
+        else:
+            self._windows[handle] = rect
+        for listener in list(self._listeners):
+            listener(handle, rect)
+
+    def __repr__(self):
+        return f"<{type(self).__name__}: {len(self._windows)} windows>"
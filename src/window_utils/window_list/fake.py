@@ -0,0 +1,16 @@
+from .backend import WindowListBackend, WindowRect
+
+
+class FakeWindowListBackend(WindowListBackend):
+    """Keeps the windows in memory, for tests, simulations and platforms without a backend.
+    Starts without any windows.
+    """
+
+    def set_window(self, handle: int, x: int, y: int, width: int, height: int):
+        """Pretend a window was shown, moved or resized, telling the listeners about it"""
+        self._set_window(handle, WindowRect(handle, x, y, width, height))
+
+    def remove_window(self, handle: int):
+        """Pretend a window was hidden or closed"""
+        if handle in self._windows:
+            self._set_window(handle, None)
@@ -0,0 +1,91 @@
+import tkinter as tk
+from typing import Dict, Optional
+from Xlib import X, display, error
+from src import logger
+from .backend import WindowListBackend, WindowRect
+
+
+class X11WindowListBackend(WindowListBackend):
+    """Follows the children of the root window through `SubstructureNotify` events.
+
+    With a reparenting window manager the children of the root are the frames around the
+    applications' windows, so their top edge is the top of the title bar. The windows are listed
+    once on start, after which only the windows named in the events are looked at. Override
+    redirect windows, ie menus, tooltips and the pets themselves, are left out. The connection to
+    the X server is registered as a tkinter file handler, like the X11 active window backend.
+    """
+
+    window: tk.Misc
+
+    def __init__(self, window: tk.Misc, display_name: str = None):
+        """
+        Args:
+            window (tk.Misc): Any tkinter widget, its event loop reads the X events.
+            display_name (str, optional): X display to connect to. Defaults to $DISPLAY.
+        """
+        super().__init__()
+        self.window = window
+        self._display = display.Display(display_name)
+        self._root = self._display.screen().root
+        self._listening = False
+
+    def start(self):
+        if self._listening:
+            return
+        self._root.change_attributes(event_mask=X.SubstructureNotifyMask)
+        self._display.flush()
+        self.window.tk.createfilehandler(self._display.fileno(), tk.READABLE, self._on_readable)
+        self._listening = True
+        for child in self._root.query_tree().children:
+            self._set_window(child.id, self.read_window(child))
+
+    def stop(self):
+        if not self._listening:
+            return
+        self.window.tk.deletefilehandler(self._display.fileno())
+        self._root.change_attributes(event_mask=X.NoEventMask)
+        self._display.flush()
+        self._listening = False
+
+    def _on_readable(self, file, mask):
+        # Dragging a window sends a burst of events, only the last state of each window matters
+        changed: Dict[int, Optional[WindowRect]] = {}
+        while self._display.pending_events():
+            event = self._display.next_event()
+            if event.type == X.ConfigureNotify:
+                # Only windows that are shown, as of the events read so far
+                shown = changed[event.window.id] is not None if event.window.id in changed else event.window.id in self._windows
+                if event.override or not shown:
+                    continue
+                changed[event.window.id] = WindowRect(
+                    event.window.id, event.x, event.y, event.width + 2 * event.border_width, event.height + 2 * event.border_width
+                )
+            elif event.type == X.MapNotify:
+                if not event.override:
+                    changed[event.window.id] = event.window
+            elif event.type in (X.UnmapNotify, X.DestroyNotify):
+                changed[event.window.id] = None
+        for handle, rect in changed.items():
+            try:
+                if rect is not None and not isinstance(rect, WindowRect):
+                    rect = self.read_window(rect)
+                self._set_window(handle, rect)
+            except Exception as e:
+                logger.error(f"Failed to handle a change of window {handle}: {str(e)}")
+
+    def read_window(self, window) -> Optional[WindowRect]:
+        """Ask the X server where a window is, None when it is not shown or is override redirect"""
+        try:
+            attributes = window.get_attributes()
+            if attributes.map_state != X.IsViewable or attributes.override_redirect:
+                return None
+            geometry = window.get_geometry()
+        except error.BadWindow:
+            # Closed before we got to it, its DestroyNotify follows
+            return None
+        border = 2 * geometry.border_width
+        return WindowRect(window.id, geometry.x, geometry.y, geometry.width + border, geometry.height + border)
+
+    def close(self):
+        self.stop()
+        self._display.close()
@@ -1,9 +1,9 @@
-from pystray import MenuItem as item, Menu
-import pystray
 from PIL import Image
 from pathlib import Path
 import os
 import tkinter as tk
+from src import logger
+from src.instrumentation import instruments
 
 
 def hide_window(window: tk.Tk):
@@ -23,7 +23,12 @@ def show_window(window: tk.Tk):
     window.wm_deiconify()
 
 
-def show_in_tray(window: tk.Tk) -> pystray.Icon:
+def show_in_tray(window: tk.Tk) -> "pystray.Icon":
+    # pystray connects to the display as soon as it is imported, so only import it when
+    # actually showing the icon, keeping this module usable without a display
+    from pystray import MenuItem as item, Menu
+    import pystray
+
     def exit_action(icon: pystray.Icon):
         # kills the pet
         icon.stop()
@@ -34,9 +39,19 @@ def show_in_tray(window: tk.Tk) -> pystray.Icon:
         show_window(window)
         window.mainloop()
 
+    def toggle_stats_action():
+        instruments.set_enabled(not instruments.enabled)
+
+    def dump_stats_action():
+        # writes what the instrumentation recorded so far, see src/instrumentation.py
+        logger.info(f"Instrumentation snapshot written to {instruments.dump()}")
+
     icon = pystray.Icon("Totoro ❤️ Lu")
     icon.menu = Menu(
-        item("exit", lambda: exit_action(icon)), item("show", show_action, default=True)
+        item("exit", lambda: exit_action(icon)),
+        item("show", show_action, default=True),
+        item("record stats", toggle_stats_action, checked=lambda menu_item: instruments.enabled),
+        item("dump stats", dump_stats_action),
     )
     icon.icon = Image.open(os.path.join(Path().resolve(), "icon.ico"))
     icon.title = "Totoro ❤️ Lu"
@@ -0,0 +1,25 @@
+import os
+import pytest
+from src.animation import Animation
+from src.animation.sprite_pack import SpritePack
+from src.simulation import HeadlessImage
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(autouse=True)
+def project_root(monkeypatch):
+    """Run from the project root, where the pet finds its sprites and config.xml"""
+    monkeypatch.chdir(ROOT)
+
+
+@pytest.fixture(autouse=True)
+def sprite_packs(monkeypatch, tmp_path):
+    """Keep the sprite packs tests compile out of src/sprites, where the pet would pick them up"""
+    monkeypatch.setattr(SpritePack, "folder", str(tmp_path))
+
+
+@pytest.fixture
+def headless_frames(monkeypatch):
+    """Make frames without a display, as the simulation does"""
+    monkeypatch.setattr(Animation, "photo_image", HeadlessImage)
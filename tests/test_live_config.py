@@ -0,0 +1,75 @@
+from types import MappingProxyType
+from src.animation import Animation, AnimationStates, FrameInterner, get_animations
+from src.animation.sprite_pack import SpritePack
+from src.config_reader import load_config
+from src.pets import LiveConfig
+from src.simulation import Simulation
+
+
+def get_size(frame):
+    return (frame.width(), frame.height())
+
+
+def compile_pack(target_resolution):
+    """Compile the pack of a totoro as a start without one does, and wait for it"""
+    # Loading sets the frame interner of all animations, keep the one of those already loaded
+    frame_interner = Animation.frame_interner
+    get_animations("totoro", target_resolution, False, compile_sprite_pack=True).close()
+    SpritePack.wait_for_compiles()
+    Animation.frame_interner = frame_interner
+
+
+def test_resized_animations_do_not_reuse_old_frames(headless_frames):
+    frame_interner = FrameInterner()
+    compile_pack((100, 100))
+    small = get_animations("totoro", (100, 100), False, frame_interner=frame_interner, compile_sprite_pack=True)
+    small_frame = small[AnimationStates.IDLE].frames[0]
+    # Replaces the pack the small frames were read from
+    compile_pack((160, 160))
+    large = get_animations("totoro", (160, 160), False, frame_interner=frame_interner, compile_sprite_pack=True)
+    large_frame = large[AnimationStates.IDLE].frames[0]
+    assert get_size(small_frame) == (100, 100)
+    assert get_size(large_frame) == (160, 160)
+    assert small[AnimationStates.IDLE].pack is not None and large[AnimationStates.IDLE].pack is not None
+    small.close()
+    large.close()
+
+
+def test_swapped_animations_have_the_new_size(headless_frames):
+    # Start from the pack, as the pet does, which is then compiled again at the new size
+    compile_pack((100, 100))
+    simulation = Simulation("totoro", (100, 100))
+    assert simulation.animations[AnimationStates.IDLE].pack is not None
+    compile_pack((160, 160))
+    frame_interner = Animation.frame_interner
+    live_config = LiveConfig(
+        simulation.timers,
+        lambda pet_name, pet_config: get_animations(
+            pet_name,
+            pet_config.target_resolution,
+            False,
+            frame_interner=frame_interner,
+            compile_sprite_pack=True,
+        ),
+    )
+    live_config.add_pet("totoro", simulation.pet, simulation.animations)
+    config = load_config()
+    pet_config = config.get_pet("totoro")
+    old = config._replace(pets=MappingProxyType({"totoro": pet_config._replace(target_resolution=(100, 100))}))
+    new = config._replace(pets=MappingProxyType({"totoro": pet_config._replace(target_resolution=(160, 160))}))
+    simulation.run(1)
+
+    live_config.on_config_changed(old, new)
+    future, _ = live_config._loading["totoro"]
+    future.result(timeout=60)
+    simulation.run(1)
+
+    assert not live_config._loading
+    assert simulation.pet.get_current_animation().target_resolution == (160, 160)
+    assert get_size(simulation.pet.get_current_animation_frame()) == (160, 160)
+    simulation.run(10)
+    for animation in simulation.pet.animator.animations.values():
+        if animation.is_loaded:
+            assert {get_size(frame) for frame in animation.frames} == {(160, 160)}
+    live_config.close()
+    simulation.close()
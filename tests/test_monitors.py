@@ -0,0 +1,71 @@
+from src.window_utils import Monitor, MonitorTopology
+
+# An L: a wide monitor with a smaller one on its right, and another wide one under it
+LEFT = Monitor(0, 0, 1920, 1080, True)
+RIGHT = Monitor(1920, 0, 1280, 1024)
+BELOW = Monitor(0, 1080, 1920, 1080)
+
+
+def get_topology(*monitors):
+    layout = list(monitors)
+    topology = MonitorTopology(lambda: layout)
+    return topology, layout
+
+
+def test_finds_the_monitor_under_a_point():
+    topology, _ = get_topology(LEFT, RIGHT, BELOW)
+    assert topology.find(0, 0) == LEFT
+    assert topology.find(1919, 1079) == LEFT
+    assert topology.find(1920, 0) == RIGHT
+    assert topology.find(3199, 1023) == RIGHT
+    assert topology.find(100, 1080) == BELOW
+    assert topology.find(1919, 2159) == BELOW
+
+
+def test_finds_the_nearest_monitor_off_every_monitor():
+    topology, _ = get_topology(LEFT, RIGHT, BELOW)
+    # Under the right monitor, where the L has no monitor
+    assert topology.find(2500, 1500) == RIGHT
+    assert topology.find(100, -50) == LEFT
+    assert topology.find(-50, 1500) == BELOW
+    assert topology.find(4000, 500) == RIGHT
+
+
+def test_rows_only_join_monitors_side_by_side():
+    topology, _ = get_topology(LEFT, RIGHT, BELOW)
+    assert topology.get_row(LEFT) == (0, 3200)
+    assert topology.get_row(RIGHT) == (0, 3200)
+    assert topology.get_row(BELOW) == (0, 1920)
+
+
+def test_rows_follow_the_height_in_common():
+    # Stairs: the outer two monitors have no height in common, only with the middle one
+    upper = Monitor(0, 0, 1000, 500)
+    middle = Monitor(1000, 400, 1000, 500)
+    lower = Monitor(2000, 800, 1000, 500)
+    topology, _ = get_topology(upper, middle, lower)
+    assert topology.get_row(upper) == (0, 2000)
+    assert topology.get_row(middle) == (0, 3000)
+    assert topology.get_row(lower) == (1000, 3000)
+
+
+def test_primary_monitor():
+    topology, _ = get_topology(RIGHT, LEFT, BELOW)
+    assert topology.get_primary() == LEFT
+    topology, _ = get_topology(RIGHT, BELOW)
+    assert topology.get_primary() == RIGHT
+
+
+def test_refresh_tells_listeners_about_changes():
+    topology, layout = get_topology(LEFT, RIGHT)
+    changes = []
+    topology.add_listener(changes.append)
+    assert not topology.refresh()
+    layout.append(BELOW)
+    assert topology.refresh()
+    assert changes == [topology]
+    assert topology.find(100, 1500) == BELOW
+    layout.remove(RIGHT)
+    topology.refresh()
+    assert topology.find(2500, 500) == LEFT
+    assert topology.get_row(LEFT) == (0, 1920)
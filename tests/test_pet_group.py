@@ -0,0 +1,50 @@
+from src.animation import AnimationStates, Animator, FrameInterner, get_animations
+from src.pets import PetGroup
+from src.simulation import HeadlessToplevel, HeadlessWidget, HeadlessWindow, VirtualClock
+from src.simulation.headless import headless_toolkit
+from src.window_utils import Canvas, TimerService
+from src.window_utils.active_window import FakeActiveWindowBackend
+
+RESOLUTION = {"width": 1920, "height": 1080}
+
+
+def make_group(count: int):
+    clock = VirtualClock()
+    root = HeadlessWindow(clock)
+    group = PetGroup(root, timers=TimerService(root, clock=clock), active_window=FakeActiveWindowBackend())
+    for index in range(count):
+        window = HeadlessToplevel(root)
+        canvas = Canvas(window, HeadlessWidget(window), RESOLUTION, toolkit=headless_toolkit)
+        animations = group.get_animations(
+            "totoro", (100, 100), lambda: get_animations("totoro", (100, 100), False, frame_interner=FrameInterner())
+        )
+        animator = Animator(state=AnimationStates.IDLE, frame_number=0, animations=animations)
+        group.add_pet(200 * (index + 1), 1080, canvas, animator)
+    group.start()
+    return group, root
+
+
+def test_destroyed_windows_close_their_pets(headless_frames):
+    group, root = make_group(3)
+    first, second, third = group.pets
+    first.canvas.window.destroy()
+    assert first.is_closed
+    assert not second.is_closed and not third.is_closed
+    assert not first.scheduler.is_running and second.scheduler.is_running
+    assert not root.has_quit
+    # Children of a pet's window going away leave the pet be
+    second.tooltip.destroy()
+    assert not second.is_closed
+    group.close()
+
+
+def test_event_loop_ends_with_the_last_pet(headless_frames):
+    group, root = make_group(2)
+    for pet in group.pets:
+        assert not root.has_quit
+        pet.canvas.window.destroy()
+    assert root.has_quit
+    for pet in group.pets:
+        for job in ("tick", "keep_on_top", "tooltip"):
+            assert group.timers.get(pet.get_job_name(job)) is None
+    group.close()
@@ -0,0 +1,37 @@
+from src.simulation import Simulation
+
+SCREEN = (1920, 1080)
+
+
+def simulate(seed: int, seconds: float = 300):
+    simulation = Simulation("totoro", (100, 100), screen_resolution=SCREEN, seed=seed)
+    trace = simulation.run(seconds)
+    states = set(simulation.animations.keys())
+    simulation.close()
+    return trace, states
+
+
+def test_pet_stays_on_the_screen():
+    trace, _ = simulate(3)
+    # Pets are placed just under the screen and stand on the floor from their first frame on
+    moves = trace.of_type("move")[1:]
+    assert moves
+    for move in moves:
+        assert 0 <= move["x"] and move["x"] + move["width"] <= SCREEN[0]
+        assert 0 <= move["y"] and move["y"] + move["height"] <= SCREEN[1]
+
+
+def test_pet_only_plays_its_animations():
+    trace, states = simulate(3)
+    played = {event["state"] for event in trace.of_type("state")}
+    assert len(played) > 1
+    assert played <= {state.name for state in states}
+    assert {event["state"] for event in trace.of_type("frame")} <= played
+
+
+def test_same_seed_gives_the_same_trace():
+    first, _ = simulate(5, 120)
+    second, _ = simulate(5, 120)
+    other, _ = simulate(6, 120)
+    assert first.digest() == second.digest()
+    assert first.digest() != other.digest()
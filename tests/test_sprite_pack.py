@@ -0,0 +1,102 @@
+import os
+import pytest
+from src.animation import Animation, AnimationStates, FrameInterner, get_animations
+from src.animation.sprite_pack import SpritePack
+
+RESOLUTION = (100, 100)
+
+
+def compile_pack():
+    options = Animation.get_preprocessing_options()
+    animations = get_animations("totoro", RESOLUTION, False, frame_interner=FrameInterner(), use_sprite_pack=False)
+    SpritePack.compile("totoro", animations.animations, RESOLUTION, options)
+    animations.close()
+    return SpritePack.get_paths("totoro")
+
+
+def test_compiles_animations_that_are_shown(headless_frames):
+    animations = get_animations("totoro", RESOLUTION, False, frame_interner=FrameInterner(), use_sprite_pack=False)
+    shown = animations[AnimationStates.IDLE].frames
+    SpritePack.compile("totoro", animations.animations, RESOLUTION, Animation.get_preprocessing_options())
+    pack = SpritePack.open("totoro", RESOLUTION, Animation.get_preprocessing_options())
+    images, _ = pack.load_frames(AnimationStates.IDLE.name)
+    assert len(images) == len(shown)
+    pack.close()
+    animations.close()
+
+
+def test_compiles_animations_without_a_gif(headless_frames):
+    options = Animation.get_preprocessing_options()
+    compile_pack()
+    # Compile the pet again from its pack, as for a pet that only exists as one
+    pack = SpritePack.open("totoro", RESOLUTION, options)
+    SpritePack.compile("totoro", pack.get_animations(), RESOLUTION, options)
+    pack.close()
+
+    pack = SpritePack.open("totoro", RESOLUTION, options)
+    assert pack.manifest["sources"] == {}
+    assert {spec["source"] for spec in pack.manifest["animations"].values()} == {None}
+    assert pack.get_source_id("IDLE") != pack.get_source_id("SLEEP")
+    images, _ = pack.load_frames(AnimationStates.IDLE.name)
+    assert images[0].size == RESOLUTION
+    pack.close()
+
+
+def test_failed_compile_leaves_no_files(headless_frames, tmp_path):
+    animations = get_animations("totoro", RESOLUTION, False, frame_interner=FrameInterner(), use_sprite_pack=False)
+    # The frames are not at the resolution the pack is compiled for
+    with pytest.raises(Exception, match="not the target resolution"):
+        SpritePack.compile("totoro", animations.animations, (160, 160), Animation.get_preprocessing_options())
+    assert list(tmp_path.iterdir()) == []
+    animations.close()
+
+
+def test_ignores_an_atlas_of_another_compile(headless_frames):
+    _, manifest_path = compile_pack()
+    with open(manifest_path, encoding="utf-8") as f:
+        old_manifest = f.read()
+    # As if another process replaced the atlas, and opening came before it replaced the manifest
+    compile_pack()
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        f.write(old_manifest)
+    assert SpritePack.open("totoro", RESOLUTION, Animation.get_preprocessing_options()) is None
+
+
+def test_ignores_a_truncated_atlas(headless_frames):
+    pack_path, _ = compile_pack()
+    with open(pack_path, "r+b") as f:
+        f.truncate(os.path.getsize(pack_path) // 2)
+    assert SpritePack.open("totoro", RESOLUTION, Animation.get_preprocessing_options()) is None
+
+
+def test_ignores_an_unreadable_manifest(headless_frames):
+    _, manifest_path = compile_pack()
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        f.write('{"version": ')
+    assert SpritePack.open("totoro", RESOLUTION, Animation.get_preprocessing_options()) is None
+
+
+def test_compiles_in_the_background_while_loading_the_gifs(headless_frames):
+    animations = get_animations("totoro", RESOLUTION, False, compile_sprite_pack=True)
+    assert animations[AnimationStates.IDLE].pack is None
+    SpritePack.wait_for_compiles()
+    animations.close()
+    animations = get_animations("totoro", RESOLUTION, False, compile_sprite_pack=True)
+    assert animations[AnimationStates.IDLE].pack is not None
+    animations.close()
+
+
+def test_leaves_compiling_to_the_process_holding_the_lock(headless_frames):
+    pack_path, _ = SpritePack.get_paths("totoro")
+    with open(pack_path + SpritePack.LOCK_EXTENSION, "w"):
+        pass
+    load = lambda: get_animations("totoro", RESOLUTION, False).animations
+    assert not SpritePack.compile_in_background("totoro", RESOLUTION, Animation.get_preprocessing_options(), load)
+    os.utime(pack_path + SpritePack.LOCK_EXTENSION, (0, 0))
+    # Unless it is long gone
+    assert SpritePack.compile_in_background("totoro", RESOLUTION, Animation.get_preprocessing_options(), load)
+    SpritePack.wait_for_compiles()
+    assert not os.path.exists(pack_path + SpritePack.LOCK_EXTENSION)
+    pack = SpritePack.open("totoro", RESOLUTION, Animation.get_preprocessing_options())
+    assert pack is not None
+    pack.close()
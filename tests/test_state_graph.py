@@ -0,0 +1,67 @@
+import random
+from collections import Counter
+from types import SimpleNamespace
+import pytest
+from src.animation import AnimationStates, StateGraph
+
+IDLE, WALK, SLEEP = AnimationStates.IDLE, AnimationStates.WALK_POSITIVE, AnimationStates.SLEEP
+
+
+def animation(next_states: dict, repititions=(0, 0)):
+    """Just what the graph reads of an animation"""
+    return SimpleNamespace(transition_weights=next_states, repitition_range=repititions)
+
+
+def test_samples_follow_the_weights():
+    graph = StateGraph([IDLE, WALK, SLEEP], [{0: 1, 1: 3, 2: 6}, {0: 1}, {0: 1}], [(0, 0)] * 3)
+    random.seed(0)
+    draws = 100000
+    counts = Counter(graph.next_state(IDLE) for _ in range(draws))
+    for state, share in ((IDLE, 0.1), (WALK, 0.3), (SLEEP, 0.6)):
+        assert counts[state] / draws == pytest.approx(share, abs=0.01)
+
+
+def test_alias_table_keeps_the_probabilities():
+    probabilities = [0.5, 0.25, 0.125, 0.125]
+    alias_probabilities, aliases = StateGraph.build_alias_table(probabilities)
+    shares = [0.0] * len(probabilities)
+    for slot, (probability, alias) in enumerate(zip(alias_probabilities, aliases)):
+        shares[slot] += probability / len(probabilities)
+        shares[alias] += (1 - probability) / len(probabilities)
+    assert shares == pytest.approx(probabilities)
+
+
+def test_compiles_the_weights_of_the_animations():
+    graph = StateGraph.compile(
+        {IDLE: animation({WALK: 1, SLEEP: 3}, (1, 3)), WALK: animation({IDLE: 1}), SLEEP: animation({IDLE: 1})}
+    )
+    assert graph.get_successor_weights(IDLE) == [(SLEEP, 0.75), (WALK, 0.25)]
+    assert graph.get_expected_plays(IDLE) == 3
+    assert graph.states[graph.initial] == IDLE
+
+
+@pytest.mark.parametrize(
+    "animations, problem",
+    [
+        ({IDLE: animation({WALK: 1}), WALK: animation({})}, "WALK_POSITIVE has nothing to transition to"),
+        ({IDLE: animation({WALK: 1}), WALK: animation({IDLE: 0})}, "WALK_POSITIVE has nothing to transition to"),
+        ({IDLE: animation({SLEEP: 1})}, "IDLE transitions to SLEEP, which has no animation"),
+        ({IDLE: animation({WALK: 1}), WALK: animation({WALK: 1})}, "WALK_POSITIVE only transitions to itself"),
+        (
+            {IDLE: animation({AnimationStates.FALLING: 1}), AnimationStates.FALLING: animation({IDLE: 1})},
+            "FALLING has to end in LANDED",
+        ),
+        ({WALK: animation({WALK: 1})}, "no animation for the initial state IDLE"),
+    ],
+)
+def test_rejects_graphs_pets_get_stuck_in(animations, problem):
+    with pytest.raises(Exception, match=problem):
+        StateGraph.compile(animations)
+
+
+def test_stationary_distribution_of_a_cycle():
+    graph = StateGraph.compile(
+        {IDLE: animation({WALK: 1}), WALK: animation({SLEEP: 1}), SLEEP: animation({IDLE: 1})}
+    )
+    distribution = graph.get_stationary_distribution()
+    assert list(distribution.values()) == pytest.approx([1 / 3] * 3)
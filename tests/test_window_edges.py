@@ -0,0 +1,63 @@
+from src.window_utils import WindowEdgeIndex
+from src.window_utils.window_list import FakeWindowListBackend, WindowRect
+
+
+def get_index():
+    backend = FakeWindowListBackend()
+    backend.set_window(1, 100, 500, 400, 300)
+    return WindowEdgeIndex(backend), backend
+
+
+def test_starts_with_the_windows_already_shown():
+    index, _ = get_index()
+    assert len(index) == 1
+    assert index.get(1) == WindowRect(1, 100, 500, 400, 300)
+
+
+def test_lands_on_the_edge_fallen_through():
+    index, _ = get_index()
+    assert index.find_landing(300, 400, 600) == index.get(1)
+    assert index.find_landing(300, 500, 500) == index.get(1)
+    # Above or already under the edge
+    assert index.find_landing(300, 400, 499) is None
+    assert index.find_landing(300, 501, 900) is None
+    # Beside the window, in a column it crosses and in one it does not
+    assert index.find_landing(99, 400, 600) is None
+    assert index.find_landing(500, 400, 600) is None
+    assert index.find_landing(1000, 400, 600) is None
+
+
+def test_lands_on_the_highest_edge():
+    index, backend = get_index()
+    backend.set_window(2, 0, 700, 1000, 200)
+    backend.set_window(3, 200, 600, 100, 100)
+    assert index.find_landing(250, 0, 1000).handle == 1
+    assert index.find_landing(250, 550, 1000).handle == 3
+    assert index.find_landing(50, 0, 1000).handle == 2
+
+
+def test_follows_windows_moving():
+    index, backend = get_index()
+    backend.set_window(1, 1000, 200, 400, 300)
+    assert index.get(1) == WindowRect(1, 1000, 200, 400, 300)
+    assert index.find_landing(300, 400, 600) is None
+    assert index.find_landing(1200, 100, 300).handle == 1
+    assert len(index) == 1
+
+
+def test_forgets_windows_gone():
+    index, backend = get_index()
+    backend.remove_window(1)
+    assert len(index) == 0
+    assert index.get(1) is None
+    assert index.find_landing(300, 400, 600) is None
+    # Collapsed windows have no edge to stand on
+    backend.set_window(2, 100, 500, 0, 300)
+    assert index.find_landing(100, 400, 600) is None
+
+
+def test_close_stops_following_the_backend():
+    index, backend = get_index()
+    index.close()
+    backend.set_window(2, 0, 0, 100, 100)
+    assert index.get(2) is None